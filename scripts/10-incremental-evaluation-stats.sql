@@ -0,0 +1,22 @@
+-- Evaluación incremental: estadísticas suficientes por modelo y día
+
+-- Conteos, sumas, co-momentos e histogramas de confianza / error del día
+ALTER TABLE model_production_metrics ADD COLUMN IF NOT EXISTS sufficient_stats JSONB;
+ALTER TABLE model_production_metrics ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+
+-- Una fila por modelo y día, actualizada con upsert
+CREATE UNIQUE INDEX IF NOT EXISTS idx_model_production_metrics_model_day
+    ON model_production_metrics(model_id, evaluation_date);
+
+-- Marcas de agua por modelo: hasta dónde se han agregado predicciones y feedback
+CREATE TABLE IF NOT EXISTS model_evaluation_watermarks (
+    model_id UUID PRIMARY KEY REFERENCES specialized_ai_models(id),
+    predictions_watermark TIMESTAMP WITH TIME ZONE NOT NULL, -- ai_verifications.created_at
+    feedback_watermark TIMESTAMP WITH TIME ZONE NOT NULL, -- specialized_feedback.created_at (feedback tardío)
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_specialized_feedback_created_at ON specialized_feedback(created_at);
+
+COMMENT ON COLUMN model_production_metrics.sufficient_stats IS 'Estadísticas suficientes combinables del día (evaluation_stats.MetricAccumulator)';
+COMMENT ON TABLE model_evaluation_watermarks IS 'Marcas de agua de la evaluación incremental por modelo';
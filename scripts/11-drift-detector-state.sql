@@ -0,0 +1,13 @@
+-- Estado persistido de los detectores de drift en streaming por modelo
+
+CREATE TABLE IF NOT EXISTS model_drift_state (
+    model_id UUID PRIMARY KEY REFERENCES specialized_ai_models(id),
+    detector_state JSONB NOT NULL, -- Page-Hinkley, histogramas PSI/KS y marcas de agua (drift_detectors.DriftMonitor)
+    drift_detected BOOLEAN DEFAULT false,
+    drift_started_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_model_drift_state_detected ON model_drift_state(drift_detected) WHERE drift_detected;
+
+COMMENT ON TABLE model_drift_state IS 'Estado de los detectores de drift en streaming por modelo';
@@ -0,0 +1,47 @@
+-- Índices del evaluador y proyección estrecha de verificaciones
+
+-- Filtro del evaluador: verification_type = %s AND created_at >= NOW() - ventana
+CREATE INDEX IF NOT EXISTS idx_ai_verifications_type_created ON ai_verifications(verification_type, created_at);
+
+-- LEFT JOIN specialized_feedback ON av.id = sf.verification_id
+CREATE INDEX IF NOT EXISTS idx_specialized_feedback_verification ON specialized_feedback(verification_id);
+
+-- Solo las columnas que usan los agregados del evaluador, sin los JSONB content_data / ai_result.
+-- Una fila por (verificación, feedback), igual que el LEFT JOIN sobre las tablas base
+CREATE MATERIALIZED VIEW IF NOT EXISTS evaluation_verifications_mv AS
+SELECT COALESCE(sf.id, av.id) AS row_id,
+       av.id,
+       av.verification_type,
+       av.created_at,
+       COALESCE((av.ai_result->>'score')::float8, 0) AS ai_score,
+       av.confidence_score::float8 AS confidence,
+       sf.expert_score::float8 AS expert_score
+FROM ai_verifications av
+LEFT JOIN specialized_feedback sf ON av.id = sf.verification_id;
+
+-- Índice único necesario para REFRESH ... CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_evaluation_verifications_mv_row ON evaluation_verifications_mv(row_id);
+
+-- Cubre el filtro y las columnas agregadas: index-only scan por tipo y ventana
+CREATE INDEX IF NOT EXISTS idx_evaluation_verifications_mv_type_created
+    ON evaluation_verifications_mv(verification_type, created_at) INCLUDE (ai_score, confidence, expert_score);
+
+-- Momento del último refresco; el evaluador solo usa la vista si es suficientemente reciente
+CREATE TABLE IF NOT EXISTS evaluation_projection_state (
+    id BOOLEAN PRIMARY KEY DEFAULT true CHECK (id),
+    refreshed_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+INSERT INTO evaluation_projection_state (id, refreshed_at) VALUES (true, NOW())
+ON CONFLICT (id) DO NOTHING;
+
+-- Refresco sin bloquear lecturas (programar cada pocos minutos, p. ej. con pg_cron)
+CREATE OR REPLACE FUNCTION refresh_evaluation_projection() RETURNS void AS $$
+BEGIN
+    REFRESH MATERIALIZED VIEW CONCURRENTLY evaluation_verifications_mv;
+    UPDATE evaluation_projection_state SET refreshed_at = NOW() WHERE id;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON MATERIALIZED VIEW evaluation_verifications_mv IS 'Proyección estrecha de verificaciones con feedback para los agregados del evaluador';
+COMMENT ON TABLE evaluation_projection_state IS 'Último refresco de evaluation_verifications_mv';
@@ -0,0 +1,32 @@
+-- Notificaciones para el daemon de evaluación (evaluation_daemon.py, LISTEN evaluation_new_rows)
+
+-- Una notificación por sentencia y tipo de verificación, no por fila: las cargas masivas
+-- generan pocos mensajes y PostgreSQL descarta los duplicados dentro de la transacción
+CREATE OR REPLACE FUNCTION notify_evaluation_predictions() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('evaluation_new_rows', 'predictions:' || verification_type)
+    FROM (SELECT DISTINCT verification_type FROM new_rows) types;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION notify_evaluation_feedback() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('evaluation_new_rows', 'feedback');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_ai_verifications_evaluation_notify ON ai_verifications;
+CREATE TRIGGER trg_ai_verifications_evaluation_notify
+    AFTER INSERT ON ai_verifications
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_evaluation_predictions();
+
+DROP TRIGGER IF EXISTS trg_specialized_feedback_evaluation_notify ON specialized_feedback;
+CREATE TRIGGER trg_specialized_feedback_evaluation_notify
+    AFTER INSERT ON specialized_feedback
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_evaluation_feedback();
+
+COMMENT ON FUNCTION notify_evaluation_predictions() IS 'Avisa al daemon de evaluación de predicciones nuevas por tipo';
+COMMENT ON FUNCTION notify_evaluation_feedback() IS 'Avisa al daemon de evaluación de feedback experto nuevo';
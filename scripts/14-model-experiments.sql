@@ -0,0 +1,39 @@
+-- Experimentos A/B champion/challenger y asignación registrada con cada verificación
+
+CREATE TABLE IF NOT EXISTS model_experiments (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    verification_category VARCHAR(100) NOT NULL,
+    champion_model_id UUID NOT NULL REFERENCES specialized_ai_models(id),
+    challenger_model_id UUID NOT NULL REFERENCES specialized_ai_models(id),
+    traffic_split DECIMAL(4,3) NOT NULL CHECK (traffic_split > 0 AND traffic_split < 1),
+    status VARCHAR(20) NOT NULL DEFAULT 'running', -- 'running', 'stopped', 'superseded'
+    decision VARCHAR(20), -- 'challenger_wins', 'champion_wins', 'inconclusive'
+    test_config JSONB NOT NULL, -- alpha, tau, min_samples, max_samples (ab_testing.SequentialTest)
+    test_state JSONB, -- Conteos por brazo y p-valor siempre válido
+    feedback_watermark TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(), -- specialized_feedback.created_at
+    started_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    stopped_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Como mucho un experimento en curso por categoría
+CREATE UNIQUE INDEX IF NOT EXISTS idx_model_experiments_running
+    ON model_experiments(verification_category) WHERE status = 'running';
+
+-- Asignación de cada verificación (la escribe quien la sirve, con ab_testing.TrafficRouter)
+ALTER TABLE ai_verifications ADD COLUMN IF NOT EXISTS model_id UUID REFERENCES specialized_ai_models(id);
+ALTER TABLE ai_verifications ADD COLUMN IF NOT EXISTS experiment_id UUID REFERENCES model_experiments(id);
+ALTER TABLE ai_verifications ADD COLUMN IF NOT EXISTS experiment_arm VARCHAR(12); -- 'champion', 'challenger'
+
+CREATE INDEX IF NOT EXISTS idx_ai_verifications_experiment
+    ON ai_verifications(experiment_id) WHERE experiment_id IS NOT NULL;
+
+-- Mismo reparto que ab_testing.bucket(): primeros 60 bits de SHA-256('<experimento>:<verificación>').
+-- Para auditar asignaciones o repartir desde SQL sin reimplementar el hash
+CREATE OR REPLACE FUNCTION experiment_bucket(experiment_id UUID, verification_id UUID) RETURNS float8 AS $$
+    SELECT (('x' || substr(encode(sha256(convert_to(experiment_id::text || ':' || verification_id::text, 'UTF8')), 'hex'), 1, 15))::bit(60)::bigint
+            / 1152921504606846976.0)::float8
+$$ LANGUAGE sql IMMUTABLE;
+
+COMMENT ON TABLE model_experiments IS 'Experimentos A/B champion/challenger con test secuencial (mSPRT)';
+COMMENT ON COLUMN ai_verifications.experiment_arm IS 'Brazo asignado por hash del id de la verificación';
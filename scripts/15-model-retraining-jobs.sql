@@ -0,0 +1,36 @@
+-- Cola de reentrenamientos disparados por drift (retraining_pipeline.py)
+
+CREATE TABLE IF NOT EXISTS model_retraining_jobs (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    model_id UUID NOT NULL REFERENCES specialized_ai_models(id), -- Modelo desplegado con drift
+    status VARCHAR(20) NOT NULL DEFAULT 'queued', -- 'queued', 'running', 'completed', 'rejected', 'failed'
+    drift_magnitude DECIMAL(8,4) NOT NULL, -- Mayor razón magnitud/umbral de los cambios (>= 1)
+    drift_started_at TIMESTAMP WITH TIME ZONE, -- Evento de drift que originó el trabajo
+    trigger_report JSONB NOT NULL, -- Cambios significativos que superaron retraining_thresholds
+    parent_artifact_id VARCHAR(64), -- Artefacto desplegado desde el que se hace warm start
+    artifact_id VARCHAR(64), -- Artefacto reentrenado
+    new_model_id UUID REFERENCES specialized_ai_models(id),
+    training_run_id UUID REFERENCES model_training_runs(id),
+    training_samples JSONB, -- Filas de la ventana reciente y con correction_annotations
+    validation JSONB, -- Pérdida en la ventana de validación: reentrenado vs desplegado
+    compute JSONB, -- Tiempo de pared y CPU del reentrenamiento
+    baseline JSONB, -- Mismo dato de un entrenamiento desde cero, para comparar
+    error_log TEXT,
+    queued_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    started_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE
+);
+
+-- Como mucho un trabajo pendiente o en curso por modelo
+CREATE UNIQUE INDEX IF NOT EXISTS idx_model_retraining_jobs_active
+    ON model_retraining_jobs(model_id) WHERE status IN ('queued', 'running');
+
+CREATE INDEX IF NOT EXISTS idx_model_retraining_jobs_queue
+    ON model_retraining_jobs(queued_at) WHERE status = 'queued';
+
+-- Línea base de cómputo: entrenamientos desde cero de la categoría (hardware_config de save_training_run)
+CREATE INDEX IF NOT EXISTS idx_model_training_runs_end
+    ON model_training_runs(model_id, training_end DESC) WHERE status = 'completed';
+
+COMMENT ON TABLE model_retraining_jobs IS 'Reentrenamientos con warm start encolados al superar el umbral de drift';
+COMMENT ON COLUMN model_retraining_jobs.baseline IS 'Cómputo de un entrenamiento desde cero (medido o el último registrado)';
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Experimentos A/B champion/challenger para modelos en producción
+Reparto determinista por hash del id de la verificación (O(1), sin consultas por
+verificación) y test secuencial mSPRT sobre la precisión frente al experto, con
+p-valores siempre válidos: el experimento se detiene en cuanto hay significancia
+"""
+
+import math
+import time
+import hashlib
+import logging
+import argparse
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+
+from evaluation_stats import PASS_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+CHAMPION = 'champion'
+CHALLENGER = 'challenger'
+BUCKET_BITS = 60  # 15 dígitos hex de SHA-256; igual que experiment_bucket() en 14-model-experiments.sql
+
+# Experimento en curso por categoría de verificación (cargado por el router, no por verificación)
+RUNNING_EXPERIMENTS_SQL = """
+    SELECT id, verification_category, champion_model_id, challenger_model_id, traffic_split
+    FROM model_experiments
+    WHERE status = 'running'
+"""
+
+
+def bucket(experiment_id, verification_id) -> float:
+    """Posición uniforme en [0, 1) de una verificación dentro de un experimento"""
+    digest = hashlib.sha256(f"{experiment_id}:{verification_id}".encode('utf-8')).hexdigest()
+    return int(digest[:BUCKET_BITS // 4], 16) / float(1 << BUCKET_BITS)
+
+
+class TrafficRouter:
+    """Reparto determinista de un experimento: misma verificación, mismo brazo"""
+
+    def __init__(self, experiment_id, champion_model_id, challenger_model_id, traffic_split: float):
+        if not 0 < traffic_split < 1:
+            raise ValueError(f"traffic_split debe estar en (0, 1): {traffic_split}")
+        self.experiment_id = str(experiment_id)
+        self.models = {CHAMPION: str(champion_model_id), CHALLENGER: str(challenger_model_id)}
+        self.traffic_split = float(traffic_split)
+        self._prefix = f"{self.experiment_id}:".encode('utf-8')
+        self._cutoff = int(self.traffic_split * (1 << BUCKET_BITS))
+
+    def arm(self, verification_id) -> str:
+        digest = hashlib.sha256(self._prefix + str(verification_id).encode('utf-8')).hexdigest()
+        return CHALLENGER if int(digest[:BUCKET_BITS // 4], 16) < self._cutoff else CHAMPION
+
+    def assign(self, verification_id) -> Dict[str, str]:
+        """Columnas de ai_verifications que registran la asignación"""
+        arm = self.arm(verification_id)
+        return {'model_id': self.models[arm], 'experiment_id': self.experiment_id, 'experiment_arm': arm}
+
+
+class ExperimentRouter:
+    """Routers de los experimentos en curso, recargados como mucho cada `refresh_seconds`"""
+
+    def __init__(self, connection, refresh_seconds: float = 60.0):
+        self.connection = connection
+        self.refresh_seconds = refresh_seconds
+        self._routers: Dict[str, TrafficRouter] = {}
+        self._loaded_at = None
+
+    def refresh(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(RUNNING_EXPERIMENTS_SQL)
+            rows = cursor.fetchall()
+        self.connection.commit()
+        self._routers = {
+            row['verification_category']: TrafficRouter(
+                row['id'], row['champion_model_id'], row['challenger_model_id'], float(row['traffic_split'])
+            )
+            for row in rows
+        }
+        self._loaded_at = time.monotonic()
+
+    def route(self, verification_type: str, verification_id) -> Optional[Dict[str, str]]:
+        """Asignación de una verificación; None si su categoría no tiene experimento en curso"""
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds:
+            self.refresh()
+        router = self._routers.get(verification_type)
+        return router.assign(verification_id) if router else None
+
+
+class SequentialTest:
+    """mSPRT de dos muestras sobre la precisión (aproximación normal, mezcla N(0, tau^2))
+
+    Λ = sqrt(V / (V + τ²)) · exp(τ² θ² / (2 V (V + τ²))), con θ la diferencia de precisión
+    challenger - champion y V su varianza estimada. Se rechaza θ = 0 cuando Λ >= 1/α; el
+    p-valor min(1/Λ) es válido en cualquier momento de parada, por lo que puede consultarse
+    tras cada lote sin inflar el error de tipo I
+    """
+
+    def __init__(self, alpha: float = 0.05, tau: float = 0.05, min_samples: int = 200,
+                 max_samples: Optional[int] = None, state: Optional[Dict] = None):
+        self.alpha = alpha
+        self.tau = tau
+        self.min_samples = min_samples  # Por brazo, para que la aproximación normal sea razonable
+        self.max_samples = max_samples  # Por brazo; al alcanzarlo sin significancia: inconcluso
+        self.counts = {CHAMPION: 0, CHALLENGER: 0}
+        self.correct = {CHAMPION: 0, CHALLENGER: 0}
+        self.abs_error = {CHAMPION: 0.0, CHALLENGER: 0.0}
+        self.p_value = 1.0
+        self.decision = None
+        if state:
+            self.__dict__.update(state)
+
+    def update(self, arms: List[str], ai_scores: np.ndarray, expert_scores: np.ndarray) -> Optional[str]:
+        """Añadir pares (IA, experto) con su brazo; devuelve la decisión si el test se detiene"""
+        if self.decision is not None:
+            return self.decision
+
+        arms = np.asarray(arms)
+        ai_scores = np.asarray(ai_scores, dtype=np.float64)
+        expert_scores = np.asarray(expert_scores, dtype=np.float64)
+        correct = (ai_scores >= PASS_THRESHOLD) == (expert_scores >= PASS_THRESHOLD)
+        error = np.abs(ai_scores - expert_scores)
+        for arm in (CHAMPION, CHALLENGER):
+            selected = arms == arm
+            self.counts[arm] += int(np.count_nonzero(selected))
+            self.correct[arm] += int(np.count_nonzero(correct & selected))
+            self.abs_error[arm] += float(error[selected].sum())
+
+        return self._evaluate()
+
+    def _moments(self) -> Tuple[float, float]:
+        p = {arm: self.correct[arm] / self.counts[arm] for arm in self.counts}
+        theta = p[CHALLENGER] - p[CHAMPION]
+        # Piso en la varianza: con precisión 0 o 1 observada la estimación sería 0
+        variance = sum(
+            max(p[arm] * (1 - p[arm]), 1.0 / self.counts[arm]) / self.counts[arm] for arm in self.counts
+        )
+        return theta, variance
+
+    def log_likelihood_ratio(self) -> float:
+        theta, variance = self._moments()
+        tau2 = self.tau ** 2
+        return 0.5 * math.log(variance / (variance + tau2)) + tau2 * theta ** 2 / (2 * variance * (variance + tau2))
+
+    def _evaluate(self) -> Optional[str]:
+        if min(self.counts.values()) < self.min_samples:
+            return None
+
+        log_ratio = self.log_likelihood_ratio()
+        self.p_value = min(self.p_value, math.exp(-log_ratio) if log_ratio > 0 else 1.0)
+        if self.p_value <= self.alpha:
+            theta, _ = self._moments()
+            self.decision = 'challenger_wins' if theta > 0 else 'champion_wins'
+        elif self.max_samples and min(self.counts.values()) >= self.max_samples:
+            self.decision = 'inconclusive'
+        return self.decision
+
+    def confidence_interval(self) -> Optional[Dict[str, float]]:
+        """Secuencia de confianza (siempre válida) para la diferencia de precisión"""
+        if min(self.counts.values()) == 0:
+            return None
+        theta, variance = self._moments()
+        tau2 = self.tau ** 2
+        width = math.sqrt(
+            variance * (variance + tau2) / tau2 * (2 * math.log(1 / self.alpha) + math.log((variance + tau2) / variance))
+        )
+        return {'lower': theta - width, 'upper': theta + width}
+
+    def report(self) -> Dict[str, Any]:
+        arms = {
+            arm: {
+                'samples': self.counts[arm],
+                'accuracy': self.correct[arm] / self.counts[arm] if self.counts[arm] else None,
+                'mean_absolute_error': self.abs_error[arm] / self.counts[arm] if self.counts[arm] else None
+            }
+            for arm in (CHAMPION, CHALLENGER)
+        }
+        difference = None
+        if arms[CHAMPION]['accuracy'] is not None and arms[CHALLENGER]['accuracy'] is not None:
+            difference = arms[CHALLENGER]['accuracy'] - arms[CHAMPION]['accuracy']
+        return {
+            'arms': arms,
+            'accuracy_difference': difference,
+            'confidence_interval': self.confidence_interval(),
+            'p_value': self.p_value,
+            'decision': self.decision,
+            'method': {'test': 'mSPRT', 'alpha': self.alpha, 'tau': self.tau, 'min_samples': self.min_samples}
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+def benchmark_router(rows: int = 1_000_000, traffic_split: float = 0.1) -> Dict[str, Any]:
+    """Coste por asignación y fracción real enviada al challenger"""
+    router = TrafficRouter('00000000-0000-0000-0000-000000000001', 'champion-model', 'challenger-model', traffic_split)
+    start = time.perf_counter()
+    challenger = sum(router.arm(i) == CHALLENGER for i in range(rows))
+    seconds = time.perf_counter() - start
+    return {
+        'rows': rows, 'traffic_split': traffic_split, 'challenger_fraction': challenger / rows,
+        'microseconds_per_assignment': seconds / rows * 1e6
+    }
+
+
+def simulate_sequential(champion_accuracy: float, challenger_accuracy: float, traffic_split: float = 0.1,
+                        daily_feedback: int = 2000, days: int = 30, runs: int = 200,
+                        seed: int = 42, **test_options) -> Dict[str, Any]:
+    """Simular experimentos con feedback diario: tasa de parada, días hasta parar y decisiones"""
+    rng = np.random.default_rng(seed)
+    stop_days, decisions = [], {}
+    for _ in range(runs):
+        test = SequentialTest(**test_options)
+        for day in range(1, days + 1):
+            challenger = rng.random(daily_feedback) < traffic_split
+            accuracy = np.where(challenger, challenger_accuracy, champion_accuracy)
+            correct = rng.random(daily_feedback) < accuracy
+            # Pares (IA, experto) con el acierto simulado: ambos aprueban o IA aprueba y experto no
+            expert = np.full(daily_feedback, 90.0)
+            ai = np.where(correct, 90.0, 50.0)
+            arms = np.where(challenger, CHALLENGER, CHAMPION)
+            if test.update(arms, ai, expert):
+                stop_days.append(day)
+                break
+        decisions[test.decision or 'running'] = decisions.get(test.decision or 'running', 0) + 1
+    return {
+        'champion_accuracy': champion_accuracy, 'challenger_accuracy': challenger_accuracy,
+        'runs': runs, 'decisions': decisions,
+        'stopped_fraction': len(stop_days) / runs,
+        'median_stop_day': float(np.median(stop_days)) if stop_days else None
+    }
+
+
+def main():
+    """Benchmark del router y simulación del test secuencial"""
+
+    parser = argparse.ArgumentParser(description='Experimentos A/B de modelos')
+    parser.add_argument('--benchmark-rows', type=int, default=1_000_000, help='Asignaciones a medir')
+    parser.add_argument('--traffic-split', type=float, default=0.1, help='Fracción de tráfico al challenger')
+    parser.add_argument('--daily-feedback', type=int, default=2000, help='Pares con feedback experto por día')
+    parser.add_argument('--runs', type=int, default=200, help='Experimentos simulados por escenario')
+    args = parser.parse_args()
+
+    router = benchmark_router(args.benchmark_rows, args.traffic_split)
+    print("\n=== ROUTER ===")
+    print(f"{router['microseconds_per_assignment']:.2f} µs por asignación, "
+          f"{router['challenger_fraction']:.4f} al challenger (objetivo {router['traffic_split']})")
+
+    print(f"\n=== TEST SECUENCIAL ({args.daily_feedback} feedback/día, 30 días) ===")
+    for champion, challenger in ((0.80, 0.80), (0.80, 0.74), (0.80, 0.85)):
+        result = simulate_sequential(champion, challenger, args.traffic_split, args.daily_feedback, runs=args.runs)
+        median = f"{result['median_stop_day']:.0f}" if result['median_stop_day'] else '-'
+        print(f"champion {champion:.2f} vs challenger {challenger:.2f}: detenidos {result['stopped_fraction']:.1%}, "
+              f"día mediano {median}, decisiones {result['decisions']}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
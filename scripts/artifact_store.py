@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Almacén local de artefactos de modelos direccionado por contenido
+Los pesos y los árboles se guardan como arrays .npy para cargarlos con
+memory-mapping, de modo que varios procesos comparten una sola copia física
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+import warnings
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'manifest.json'
+PICKLE_FILE = 'model.joblib'
+
+
+def json_default(value):
+    """Serializar escalares NumPy y otros tipos no nativos en el manifiesto"""
+    if hasattr(value, 'item'):
+        return value.item()
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def pack_tree_ensemble(model) -> Dict[str, np.ndarray]:
+    """Aplanar los árboles de un GradientBoostingRegressor en arrays contiguos"""
+
+    trees = [estimator.tree_ for estimator in model.estimators_[:, 0]]
+    offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+
+    children_left = np.concatenate([tree.children_left for tree in trees]).astype(np.int64)
+    children_right = np.concatenate([tree.children_right for tree in trees]).astype(np.int64)
+    # Índices de hijos globales dentro del array concatenado (-1 = hoja)
+    for i, tree in enumerate(trees):
+        start, end = offsets[i], offsets[i + 1]
+        for children in (children_left, children_right):
+            segment = children[start:end]
+            segment[segment >= 0] += start
+
+    if model.init_ == 'zero':
+        init_value = 0.0
+    else:
+        init_value = float(model.init_.predict(np.zeros((1, model.n_features_in_)))[0])
+
+    return {
+        'tree_roots': offsets[:-1].astype(np.int64),
+        'children_left': children_left,
+        'children_right': children_right,
+        'feature': np.concatenate([tree.feature for tree in trees]).astype(np.int64),
+        'threshold': np.concatenate([tree.threshold for tree in trees]),
+        'value': np.concatenate([tree.value[:, 0, 0] for tree in trees]),
+        'params': np.array([init_value, model.learning_rate, model.max_depth or 0], dtype=np.float64)
+    }
+
+
+class PackedTreeEnsemble:
+    """Predictor de gradient boosting sobre arrays (posiblemente memory-mapped)"""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.arrays = arrays
+        self.init_value, self.learning_rate, _ = (float(v) for v in arrays['params'])
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predecir recorriendo todos los árboles a la vez, nivel por nivel"""
+        a = self.arrays
+        # sklearn compara las features en float32 contra umbrales float64
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(a['tree_roots'], (X.shape[0], len(a['tree_roots']))).copy()
+
+        while True:
+            left = a['children_left'][nodes]
+            active = left >= 0
+            if not active.any():
+                break
+            go_left = X[rows, np.where(active, a['feature'][nodes], 0)] <= a['threshold'][nodes]
+            nodes = np.where(active, np.where(go_left, left, a['children_right'][nodes]), nodes)
+
+        return self.init_value + self.learning_rate * a['value'][nodes].sum(axis=1)
+
+
+class ArtifactStore:
+    """Almacén de artefactos con clave = hash del contenido y manifiesto JSON"""
+
+    def __init__(self, root: Optional[str] = None):
+        default_root = os.path.join(os.getenv('MODELS_PATH', './models'), 'artifacts')
+        self.root = Path(root or os.getenv('ARTIFACT_STORE_PATH', default_root))
+        (self.root / 'objects').mkdir(parents=True, exist_ok=True)
+
+    def path(self, artifact_id: str) -> Path:
+        """Directorio de un artefacto"""
+        return self.root / 'objects' / artifact_id
+
+    def exists(self, artifact_id: str) -> bool:
+        return (self.path(artifact_id) / MANIFEST_FILE).exists()
+
+    def put(self, model, model_type: str, feature_names: Optional[List[str]] = None,
+            metrics: Optional[Dict] = None, parent_artifact: Optional[str] = None) -> str:
+        """Guardar un modelo (state_dict de PyTorch u objeto sklearn) y devolver su id"""
+
+        tmp_dir = Path(tempfile.mkdtemp(prefix='artifact_', dir=self.root))
+        try:
+            if isinstance(model, dict) and all(hasattr(v, 'detach') for v in model.values()):
+                artifact_format = 'torch_state_dict'
+                for name, tensor in model.items():
+                    np.save(tmp_dir / f"{name}.npy", tensor.detach().cpu().numpy())
+            else:
+                import joblib
+
+                artifact_format = 'sklearn'
+                # Sin compresión para poder cargar los arrays con mmap_mode
+                joblib.dump(model, tmp_dir / PICKLE_FILE)
+                if hasattr(model, 'estimators_') and hasattr(model, 'learning_rate'):
+                    artifact_format = 'sklearn_tree_ensemble'
+                    for name, array in pack_tree_ensemble(model).items():
+                        np.save(tmp_dir / f"tree.{name}.npy", array)
+
+            files = {
+                path.name: {'sha256': _file_sha256(path), 'bytes': path.stat().st_size}
+                for path in sorted(tmp_dir.iterdir())
+            }
+            content = json.dumps({name: info['sha256'] for name, info in files.items()}, sort_keys=True)
+            artifact_id = hashlib.sha256(content.encode()).hexdigest()
+
+            target = self.path(artifact_id)
+            if self.exists(artifact_id):
+                logger.info(f"Artifact {artifact_id[:12]} already stored")
+                return artifact_id
+
+            manifest = {
+                'artifact_id': artifact_id,
+                'model_type': model_type,
+                'format': artifact_format,
+                'feature_names': feature_names or [],
+                'metrics': metrics or {},
+                'parent_artifact': parent_artifact,
+                'files': files,
+                'size_bytes': sum(info['bytes'] for info in files.values()),
+                'created_at': datetime.now().isoformat()
+            }
+            with open(tmp_dir / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False, default=json_default)
+
+            os.replace(tmp_dir, target)
+            logger.info(f"Artifact {artifact_id[:12]} stored ({model_type}, {manifest['size_bytes']} bytes)")
+            return artifact_id
+        finally:
+            if tmp_dir.exists():
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def manifest(self, artifact_id: str) -> Dict[str, Any]:
+        """Leer el manifiesto de un artefacto"""
+        manifest_path = self.path(artifact_id) / MANIFEST_FILE
+        if not manifest_path.exists():
+            raise ValueError(f"Artifact {artifact_id} not found")
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Listar los manifiestos de todos los artefactos"""
+        return [
+            self.manifest(path.name) for path in sorted((self.root / 'objects').iterdir())
+            if (path / MANIFEST_FILE).exists()
+        ]
+
+    def lineage(self, artifact_id: str) -> List[str]:
+        """Cadena de artefactos padre, del más reciente al original"""
+        chain = []
+        while artifact_id:
+            chain.append(artifact_id)
+            artifact_id = self.manifest(artifact_id).get('parent_artifact')
+        return chain
+
+    def load_arrays(self, artifact_id: str, prefix: str = '') -> Dict[str, np.ndarray]:
+        """Cargar los arrays .npy del artefacto como memmaps de solo lectura"""
+        manifest = self.manifest(artifact_id)
+        arrays = {}
+        for name in manifest['files']:
+            if name.endswith('.npy') and name.startswith(prefix):
+                arrays[name[len(prefix):-len('.npy')]] = np.load(self.path(artifact_id) / name, mmap_mode='r')
+        return arrays
+
+    def load_predictor(self, artifact_id: str):
+        """Cargar el artefacto de la forma más barata para inferencia"""
+        manifest = self.manifest(artifact_id)
+        if manifest['format'] == 'sklearn_tree_ensemble':
+            return PackedTreeEnsemble(self.load_arrays(artifact_id, prefix='tree.'))
+        if manifest['format'] == 'torch_state_dict':
+            return self.load_state_dict(artifact_id)
+        return self.load_model(artifact_id)
+
+    def load_model(self, artifact_id: str, mmap: bool = True):
+        """Cargar el objeto sklearn completo (mmap=False para reentrenar con warm start sobre una copia)"""
+        import joblib
+
+        return joblib.load(self.path(artifact_id) / PICKLE_FILE, mmap_mode='r' if mmap else None)
+
+    def load_state_dict(self, artifact_id: str) -> Dict[str, Any]:
+        """Cargar un state_dict de PyTorch respaldado por memmaps compartidos"""
+        import torch
+
+        with warnings.catch_warnings():
+            # Los memmaps son de solo lectura; los tensores se usan solo para inferencia
+            warnings.simplefilter('ignore', UserWarning)
+            return {name: torch.from_numpy(array) for name, array in self.load_arrays(artifact_id).items()}
+
+    def load_torch_model(self, model, artifact_id: str):
+        """Asignar los pesos memory-mapped a un nn.Module sin copiarlos"""
+        model.load_state_dict(self.load_state_dict(artifact_id), assign=True)
+        return model.eval()
+
+
+class ArtifactCache:
+    """Caché LRU en proceso de modelos cargados, con presupuesto de bytes"""
+
+    def __init__(self, store: ArtifactStore, max_bytes: int = 512 * 1024 * 1024, max_items: int = 16):
+        self.store = store
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self._entries = OrderedDict()
+        self.total_bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, artifact_id: str):
+        """Obtener el predictor de un artefacto, cargándolo si no está en caché"""
+        if artifact_id in self._entries:
+            self._entries.move_to_end(artifact_id)
+            self.stats['hits'] += 1
+            return self._entries[artifact_id][0]
+
+        self.stats['misses'] += 1
+        predictor = self.store.load_predictor(artifact_id)
+        size = self.store.manifest(artifact_id)['size_bytes']
+
+        self._entries[artifact_id] = (predictor, size)
+        self.total_bytes += size
+        self._evict()
+        return predictor
+
+    def _evict(self):
+        """Expulsar los modelos menos usados hasta respetar el presupuesto"""
+        while self._entries and (self.total_bytes > self.max_bytes or len(self._entries) > self.max_items):
+            if len(self._entries) == 1:
+                break  # Un modelo mayor que el presupuesto se mantiene mientras sea el único
+            artifact_id, (_, size) = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            self.stats['evictions'] += 1
+            logger.info(f"Artifact {artifact_id[:12]} evicted from cache")
+
+    def clear(self):
+        self._entries.clear()
+        self.total_bytes = 0
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Caché local direccionada por contenido de transcripciones y sentimiento de audio de servicio
+Nivel 1: hash del audio + motor de ASR (transcripción y segmentos); nivel 2: hash de la
+transcripción + modelo de sentimiento. SQLite embebido con expulsión LRU por tamaño
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import argparse
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_MB = 512.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcriptions (
+    audio_sha256 TEXT NOT NULL,
+    asr_key TEXT NOT NULL,          -- Motor, idioma y recorte de silencios (asr_cache_key)
+    result TEXT NOT NULL,           -- JSON {'text', 'segments', 'language'}
+    vad_report TEXT,
+    bytes INTEGER NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (audio_sha256, asr_key)
+);
+CREATE TABLE IF NOT EXISTS sentiments (
+    transcript_sha256 TEXT NOT NULL,
+    sentiment_model TEXT NOT NULL,
+    result TEXT NOT NULL,           -- JSON {'label', 'score'}
+    bytes INTEGER NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (transcript_sha256, sentiment_model)
+);
+CREATE INDEX IF NOT EXISTS idx_transcriptions_access ON transcriptions(last_access);
+CREATE INDEX IF NOT EXISTS idx_sentiments_access ON sentiments(last_access);
+"""
+
+# Verificaciones de audio históricas con transcripción (migración 08); las más recientes primero
+PRESEED_SQL = """
+    SELECT id, content_data, ai_result
+    FROM ai_verifications
+    WHERE verification_type = 'audio'
+    AND created_at >= NOW() - %s * INTERVAL '1 day'
+    AND ai_result ? 'transcription'
+    ORDER BY created_at DESC
+    LIMIT %s
+"""
+
+
+def file_sha256(path: str) -> str:
+    """Hash del contenido del archivo de audio (independiente de su nombre o ruta)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def text_sha256(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def asr_cache_key(asr_name: str, language: str, vad_options: Optional[Dict[str, float]]) -> str:
+    """Clave del motor de ASR: el recorte de silencios cambia los segmentos, así que forma parte de ella"""
+    vad = json.dumps(vad_options, sort_keys=True) if vad_options is not None else 'full'
+    return f"{asr_name}|{language}|{vad}"
+
+
+class AudioResultCache:
+    """Caché persistente de dos niveles con LRU por tamaño total (transcripciones + sentimiento)"""
+
+    def __init__(self, path: Optional[str] = None, max_mb: float = DEFAULT_MAX_MB):
+        default_path = os.path.join(os.getenv('MODELS_PATH', './models'), 'audio_cache.sqlite')
+        self.path = path or os.getenv('AUDIO_CACHE_PATH', default_path)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # Varios procesos pueden compartir el archivo: WAL y espera ante bloqueos
+        self.connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.executescript(SCHEMA)
+        self.stats = {level: {'hits': 0, 'misses': 0} for level in ('transcription', 'sentiment')}
+        self.stats['evictions'] = 0
+
+    def get_transcription(self, audio_sha256: str, asr_key: str) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """(resultado de ASR, informe de recorte) guardados para este audio y motor"""
+        row = self._get('transcriptions', 'audio_sha256', audio_sha256, 'asr_key', asr_key, 'result, vad_report')
+        if row is None:
+            self.stats['transcription']['misses'] += 1
+            return None
+        self.stats['transcription']['hits'] += 1
+        return json.loads(row[0]), json.loads(row[1]) if row[1] else {}
+
+    def put_transcription(self, audio_sha256: str, asr_key: str, result: Dict[str, Any],
+                          vad_report: Optional[Dict[str, Any]] = None):
+        # Solo lo que usa el análisis: el resto de la salida de Whisper (tokens, logprobs) no se guarda
+        stored = {
+            'text': result['text'],
+            'segments': [{'start': seg['start'], 'end': seg['end'], 'text': seg['text']} for seg in result['segments']],
+            'language': result.get('language')
+        }
+        self._put('transcriptions', (audio_sha256, asr_key), json.dumps(stored),
+                  json.dumps(vad_report) if vad_report is not None else None)
+
+    def get_sentiment(self, transcript_sha256: str, sentiment_model: str) -> Optional[Dict[str, Any]]:
+        row = self._get('sentiments', 'transcript_sha256', transcript_sha256, 'sentiment_model', sentiment_model, 'result')
+        if row is None:
+            self.stats['sentiment']['misses'] += 1
+            return None
+        self.stats['sentiment']['hits'] += 1
+        return json.loads(row[0])
+
+    def put_sentiment(self, transcript_sha256: str, sentiment_model: str, sentiment: Dict[str, Any]):
+        self._put('sentiments', (transcript_sha256, sentiment_model), json.dumps(sentiment))
+
+    def _get(self, table: str, key_column: str, key: str, model_column: str, model: str, columns: str):
+        where = f"{key_column} = ? AND {model_column} = ?"
+        row = self.connection.execute(f"SELECT {columns} FROM {table} WHERE {where}", (key, model)).fetchone()
+        if row is not None:
+            self.connection.execute(f"UPDATE {table} SET last_access = ? WHERE {where}", (time.time(), key, model))
+        return row
+
+    def _put(self, table: str, key: Tuple[str, str], *values: Optional[str]):
+        size = sum(len(value) for value in (*key, *values) if value is not None)
+        placeholders = ', '.join('?' * (len(key) + len(values) + 2))
+        self.connection.execute(f"INSERT OR REPLACE INTO {table} VALUES ({placeholders})",
+                                (*key, *values, size, time.time()))
+        self._evict()
+
+    def size_bytes(self) -> int:
+        return self.connection.execute(
+            "SELECT (SELECT COALESCE(SUM(bytes), 0) FROM transcriptions) + (SELECT COALESCE(SUM(bytes), 0) FROM sentiments)"
+        ).fetchone()[0]
+
+    def _evict(self):
+        """Expulsar las entradas menos usadas recientemente (de ambos niveles) hasta caber en max_bytes"""
+        excess = self.size_bytes() - self.max_bytes
+        if excess <= 0:
+            return
+        candidates = self.connection.execute("""
+            SELECT 'transcriptions', rowid, bytes, last_access FROM transcriptions
+            UNION ALL
+            SELECT 'sentiments', rowid, bytes, last_access FROM sentiments
+            ORDER BY last_access
+        """)
+        evicted = []
+        for table, rowid, size, _ in candidates:
+            if excess <= 0:
+                break
+            evicted.append((table, rowid))
+            excess -= size
+        for table, rowid in evicted:
+            self.connection.execute(f"DELETE FROM {table} WHERE rowid = ?", (rowid,))
+        self.stats['evictions'] += len(evicted)
+
+    def report(self) -> Dict[str, Any]:
+        """Contadores de aciertos/fallos de esta instancia y ocupación del archivo"""
+        count = lambda table: self.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        return {
+            'stats': {key: dict(value) if isinstance(value, dict) else value for key, value in self.stats.items()},
+            'transcriptions': count('transcriptions'),
+            'sentiments': count('sentiments'),
+            'size_mb': self.size_bytes() / 1024 ** 2,
+            'max_mb': self.max_bytes / 1024 ** 2
+        }
+
+    def close(self):
+        self.connection.close()
+
+
+def preseed_from_verifications(cache: AudioResultCache, connection, default_asr_key: str, sentiment_model: str,
+                               audio_root: str = '', days_back: int = 365, limit: int = 100_000) -> Dict[str, int]:
+    """Cargar resultados de ai_verifications.ai_result de verificaciones de audio
+
+    El hash del audio sale de content_data.audio_sha256 o del archivo en content_data.audio_path
+    (relativo a audio_root); la clave del motor, de ai_result.asr_key o default_asr_key para
+    resultados anteriores a que se guardara. Sin segmentos solo se siembra el nivel de sentimiento
+    """
+
+    seeded = {'rows': 0, 'transcriptions': 0, 'sentiments': 0, 'missing_audio': 0}
+    with connection.cursor() as cursor:
+        cursor.execute(PRESEED_SQL, (days_back, limit))
+        rows = cursor.fetchall()
+
+    for row in rows:
+        seeded['rows'] += 1
+        content, result = row['content_data'] or {}, row['ai_result']
+        transcription = result['transcription']
+        if isinstance(result.get('sentiment'), dict):
+            cache.put_sentiment(text_sha256(transcription), sentiment_model, result['sentiment'])
+            seeded['sentiments'] += 1
+        if 'segments' not in result:
+            continue
+
+        audio_sha256 = content.get('audio_sha256')
+        audio_path = os.path.join(audio_root, content['audio_path']) if content.get('audio_path') else None
+        if audio_sha256 is None and audio_path and os.path.exists(audio_path):
+            audio_sha256 = file_sha256(audio_path)
+        if audio_sha256 is None:
+            seeded['missing_audio'] += 1
+            continue
+        asr_result = {'text': transcription, 'segments': result['segments'], 'language': result.get('language')}
+        cache.put_transcription(audio_sha256, result.get('asr_key', default_asr_key), asr_result, result.get('vad'))
+        seeded['transcriptions'] += 1
+
+    logger.info(f"Caché de audio sembrada desde {seeded['rows']} verificaciones: "
+                f"{seeded['transcriptions']} transcripciones, {seeded['sentiments']} sentimientos")
+    return seeded
+
+
+def main():
+    """Sembrar la caché desde ai_verifications (PostgreSQL con DB_*) o mostrar su estado"""
+
+    parser = argparse.ArgumentParser(description='Caché de transcripciones y sentimiento de audio')
+    parser.add_argument('--config-file', default=os.getenv('TRAINING_CONFIG_FILE', 'config/training_config.json'),
+                        help='Archivo de configuración (model_configs.service_audio)')
+    parser.add_argument('--preseed', action='store_true', help='Sembrar desde ai_verifications.ai_result')
+    parser.add_argument('--audio-root', default='', help='Directorio base de content_data.audio_path')
+    parser.add_argument('--days-back', type=int, default=365, help='Antigüedad máxima de las verificaciones')
+    args = parser.parse_args()
+
+    audio_config = {}
+    if os.path.exists(args.config_file):
+        with open(args.config_file, 'r') as f:
+            audio_config = json.load(f).get('model_configs', {}).get('service_audio', {})
+    cache_config = audio_config.get('cache', {})
+    cache = AudioResultCache(cache_config.get('path'), cache_config.get('max_mb', DEFAULT_MAX_MB))
+
+    if args.preseed:
+        import psycopg2
+        from model_evaluation import connection_params
+        from audio_models import DEFAULT_WHISPER_MODEL, DEFAULT_SENTIMENT_MODEL, VAD_DEFAULTS
+
+        # Resultados sin asr_key: los produjo el motor original (large-v3 fp32) con el recorte por defecto
+        default_key = asr_cache_key(DEFAULT_WHISPER_MODEL, audio_config.get('language', 'es'), VAD_DEFAULTS)
+        connection = psycopg2.connect(**connection_params())
+        try:
+            preseed_from_verifications(cache, connection, default_key,
+                                       audio_config.get('sentiment_model', DEFAULT_SENTIMENT_MODEL),
+                                       audio_root=args.audio_root, days_back=args.days_back)
+        finally:
+            connection.close()
+
+    print(json.dumps(cache.report(), indent=2))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Extracción de características de audio por bloques para grabaciones largas
+Lee el archivo en bloques de tamaño fijo, remuestrea en streaming y acumula los promedios
+de MFCC y centroide espectral sin mantener la forma de onda completa en memoria; el
+resultado coincide con librosa.load + librosa.feature.mfcc/spectral_centroid promediados
+"""
+
+import os
+import time
+import logging
+import argparse
+import tempfile
+from typing import Dict, List, Any, Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+N_MFCC = 13
+N_FFT = 2048  # Parámetros por defecto de librosa para mfcc y spectral_centroid
+HOP_LENGTH = 512
+N_MELS = 128
+TOP_DB = 80.0
+AMIN = 1e-10
+BLOCK_SIZE = 1 << 16  # Muestras leídas por bloque
+
+# Histograma por banda de los log-mel para aplicar top_db (relativo al máximo global) al final
+DB_MIN, DB_MAX, DB_RESOLUTION = -100.0, 200.0, 0.05
+
+
+class StreamingAudioFeatures:
+    """Acumula MFCC medio y centroide espectral medio sobre bloques consecutivos de muestras
+
+    El STFT reproduce center=True de librosa (medio frame de ceros a cada lado). El recorte
+    top_db de power_to_db depende del máximo global, que solo se conoce al final: por eso
+    cada banda mel guarda un histograma (conteo y suma) de sus valores en dB. Como la DCT
+    es lineal, el MFCC medio es la DCT de la media de los log-mel recortados.
+    Las varianzas por frame (Welford por bloques) recortan con el máximo acumulado hasta
+    cada bloque, así que son aproximadas antes de alcanzar el máximo global
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, n_mfcc: int = N_MFCC, n_fft: int = N_FFT,
+                 hop_length: int = HOP_LENGTH, n_mels: int = N_MELS, top_db: float = TOP_DB):
+        import librosa
+        import scipy.signal
+
+        self.sample_rate = sample_rate
+        self.n_mfcc = n_mfcc
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.top_db = top_db
+        self.window = scipy.signal.get_window('hann', n_fft, fftbins=True).astype(np.float32)
+        self.mel_basis = librosa.filters.mel(sr=sample_rate, n_fft=n_fft, n_mels=n_mels)
+        self.frequencies = np.fft.rfftfreq(n_fft, 1.0 / sample_rate)
+
+        self.n_bins = int(round((DB_MAX - DB_MIN) / DB_RESOLUTION)) + 1
+        self.db_counts = np.zeros((n_mels, self.n_bins), dtype=np.int64)
+        self.db_sums = np.zeros((n_mels, self.n_bins), dtype=np.float64)
+        self.db_max = -np.inf
+        self.centroid_sum = 0.0
+        self.frames = 0
+        self._moments = {'mfcc': (np.zeros(n_mfcc), np.zeros(n_mfcc)), 'spectral_centroid': (np.zeros(1), np.zeros(1))}
+        self.samples = 0
+        # Pendiente de enmarcar; empieza con el relleno izquierdo de center=True
+        self._buffer = np.zeros(n_fft // 2, dtype=np.float32)
+
+    def update(self, samples: np.ndarray):
+        """Añadir muestras mono ya remuestreadas a sample_rate"""
+        self.samples += len(samples)
+        self._buffer = np.concatenate([self._buffer, np.asarray(samples, dtype=np.float32)])
+        self._consume()
+
+    def _consume(self):
+        available = (len(self._buffer) - self.n_fft) // self.hop_length + 1
+        if available <= 0:
+            return
+        frames = np.lib.stride_tricks.sliding_window_view(self._buffer, self.n_fft)[::self.hop_length][:available]
+        spectrum = np.abs(np.fft.rfft(frames * self.window, axis=1)).astype(np.float32).T  # (bins, frames)
+        self._accumulate(spectrum)
+        self._buffer = self._buffer[available * self.hop_length:]
+
+    def _accumulate(self, magnitude: np.ndarray):
+        import scipy.fft
+
+        previous = self.frames
+        self.frames += magnitude.shape[1]
+
+        # Centroide: media de frecuencias ponderada por magnitud (frames sin energía cuentan 0)
+        norm = magnitude.sum(axis=0)
+        norm[norm < np.finfo(magnitude.dtype).tiny] = 1.0
+        centroids = self.frequencies @ magnitude / norm
+        self.centroid_sum += float(centroids.sum())
+
+        log_mel = 10.0 * np.log10(np.maximum(AMIN, self.mel_basis @ magnitude ** 2))
+        self.db_max = max(self.db_max, float(log_mel.max()))
+        mfcc = scipy.fft.dct(np.maximum(log_mel, self.db_max - self.top_db), type=2, norm='ortho', axis=0)[:self.n_mfcc]
+        self._merge_moments('mfcc', mfcc, previous)
+        self._merge_moments('spectral_centroid', centroids[None, :], previous)
+        bins = np.clip(((log_mel - DB_MIN) / DB_RESOLUTION).astype(np.int64), 0, self.n_bins - 1)
+        rows = np.broadcast_to(np.arange(log_mel.shape[0])[:, None], bins.shape)
+        np.add.at(self.db_counts, (rows, bins), 1)
+        np.add.at(self.db_sums, (rows, bins), log_mel)
+
+    def _merge_moments(self, name: str, values: np.ndarray, previous: int):
+        """Combinar media y suma de cuadrados centrados del bloque con las acumuladas (Chan et al.)"""
+        mean, m2 = self._moments[name]
+        count = values.shape[1]
+        block_mean = values.mean(axis=1)
+        block_m2 = ((values - block_mean[:, None]) ** 2).sum(axis=1)
+        delta = block_mean - mean
+        total = previous + count
+        self._moments[name] = (mean + delta * count / total, m2 + block_m2 + delta ** 2 * previous * count / total)
+
+    def statistics(self) -> Dict[str, Dict[str, List[float]]]:
+        """Media y varianza por frame acumuladas hasta ahora (MFCC y centroide espectral)"""
+        return {name: {'mean': mean.tolist(), 'variance': (m2 / max(self.frames, 1)).tolist()}
+                for name, (mean, m2) in self._moments.items()}
+
+    def finalize(self) -> np.ndarray:
+        """Vector [MFCC medio (n_mfcc), centroide medio] como el del dataset de audio"""
+        import scipy.fft
+
+        # Relleno derecho de center=True: completa los 1 + muestras // hop frames de librosa
+        self._buffer = np.concatenate([self._buffer, np.zeros(self.n_fft // 2, dtype=np.float32)])
+        self._consume()
+        if self.frames == 0:
+            return np.zeros(self.n_mfcc + 1)
+
+        # Media por banda de max(valor, máximo - top_db); el bin que contiene el umbral se
+        # aproxima con su media (error <= DB_RESOLUTION en ese bin)
+        threshold = self.db_max - self.top_db
+        means = np.where(self.db_counts > 0, self.db_sums / np.maximum(self.db_counts, 1), 0.0)
+        clipped = np.where(means >= threshold, self.db_sums, threshold * self.db_counts)
+        mean_log_mel = clipped.sum(axis=1) / self.frames
+
+        mfcc = scipy.fft.dct(mean_log_mel, type=2, norm='ortho')[:self.n_mfcc]
+        return np.concatenate([mfcc, [self.centroid_sum / self.frames]])
+
+
+def extract_features(audio_path: str, sample_rate: int = SAMPLE_RATE, block_size: int = BLOCK_SIZE) -> np.ndarray:
+    """Características de un archivo leyéndolo por bloques (mono, remuestreo soxr HQ en streaming)"""
+    import soundfile as sf
+
+    try:
+        info = sf.info(audio_path)
+    except (RuntimeError, sf.LibsndfileError):
+        # Formato sin soporte en libsndfile (p. ej. m4a): audioread vía librosa, en memoria
+        logger.warning(f"{audio_path} no se puede leer por bloques; se carga completo")
+        return extract_features_in_memory(audio_path, sample_rate)
+
+    extractor = StreamingAudioFeatures(sample_rate=sample_rate)
+    resampler = None
+    if info.samplerate != sample_rate:
+        import soxr
+        resampler = soxr.ResampleStream(info.samplerate, sample_rate, 1, dtype='float32', quality='HQ')
+    # Igual que librosa.resample(fix=True): la salida se ajusta a ceil(n * ratio) muestras
+    expected = int(np.ceil(info.frames * sample_rate / info.samplerate))
+    produced = 0
+
+    def feed(samples: np.ndarray):
+        nonlocal produced
+        samples = samples[:max(0, expected - produced)]
+        produced += len(samples)
+        extractor.update(samples)
+
+    for block in sf.blocks(audio_path, blocksize=block_size, dtype='float32', always_2d=True):
+        mono = block.mean(axis=1) if block.shape[1] > 1 else block[:, 0]
+        feed(resampler.resample_chunk(mono, last=False) if resampler else mono)
+    if resampler:
+        feed(resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True))
+    if produced < expected:
+        feed(np.zeros(expected - produced, dtype=np.float32))
+    return extractor.finalize()
+
+
+def extract_features_in_memory(audio_path: str, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Cálculo original (archivo completo en memoria), como referencia"""
+    import librosa
+
+    audio, sr = librosa.load(audio_path, sr=sample_rate)
+    mfccs = librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=N_MFCC)
+    spectral_centroids = librosa.feature.spectral_centroid(y=audio, sr=sr)
+    return np.concatenate([np.mean(mfccs, axis=1), np.mean(spectral_centroids, axis=1)])
+
+
+def write_synthetic_recording(path: str, seconds: float, sample_rate: int = 44100, seed: int = 42,
+                              block_seconds: float = 60.0):
+    """Grabación sintética de turno (voz simulada, pausas y ruido de fondo) escrita por bloques"""
+    import soundfile as sf
+
+    rng = np.random.default_rng(seed)
+    with sf.SoundFile(path, 'w', samplerate=sample_rate, channels=1, subtype='PCM_16') as f:
+        written = 0
+        while written < seconds * sample_rate:
+            n = int(min(block_seconds * sample_rate, seconds * sample_rate - written))
+            t = (written + np.arange(n)) / sample_rate
+            # Ráfagas de tono modulado con envolvente on/off de ~2 s, sobre ruido rosa aproximado
+            envelope = (np.sin(2 * np.pi * 0.23 * t) > 0.2).astype(np.float32)
+            voice = 0.3 * np.sin(2 * np.pi * (180 + 40 * np.sin(2 * np.pi * 4 * t)) * t) * envelope
+            noise = np.cumsum(rng.normal(0, 0.002, n)) * 0.05
+            f.write((voice + noise - noise.mean()).astype(np.float32))
+            written += n
+
+
+def _peak_rss_mb(function, *args) -> Dict[str, Any]:
+    """Ejecutar en un proceso hijo y medir su RSS máximo (ru_maxrss del hijo, en KB en Linux)"""
+    import resource
+    import multiprocessing
+
+    context = multiprocessing.get_context('fork')
+    parent, child = context.Pipe()
+
+    def target():
+        start = time.perf_counter()
+        features = function(*args)
+        child.send((features, time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+
+    process = context.Process(target=target)
+    process.start()
+    features, seconds, max_rss_kb = parent.recv()
+    process.join()
+    return {'features': features, 'seconds': seconds, 'peak_rss_mb': max_rss_kb / 1024}
+
+
+def benchmark_memory(seconds: float = 3600.0, sample_rate: int = 44100, path: Optional[str] = None) -> Dict[str, Any]:
+    """Memoria pico y tiempo de la extracción completa vs por bloques sobre una grabación sintética"""
+
+    directory = None
+    if path is None:
+        directory = tempfile.mkdtemp(prefix='audio_features_')
+        path = os.path.join(directory, 'shift.wav')
+    try:
+        write_synthetic_recording(path, seconds, sample_rate)
+        streaming = _peak_rss_mb(extract_features, path)
+        in_memory = _peak_rss_mb(extract_features_in_memory, path)
+        difference = np.abs(streaming['features'] - in_memory['features'])
+        return {
+            'recording_seconds': seconds,
+            'file_mb': os.path.getsize(path) / 1024 ** 2,
+            'in_memory': {k: v for k, v in in_memory.items() if k != 'features'},
+            'streaming': {k: v for k, v in streaming.items() if k != 'features'},
+            'max_abs_difference': float(difference.max()),
+            'max_rel_difference': float((difference / np.maximum(np.abs(in_memory['features']), 1e-6)).max())
+        }
+    finally:
+        if directory:
+            os.remove(path)
+            os.rmdir(directory)
+
+
+def main():
+    """Benchmark de memoria de la extracción por bloques"""
+
+    parser = argparse.ArgumentParser(description='Características de audio por bloques')
+    parser.add_argument('--seconds', type=float, default=3600.0, help='Duración de la grabación sintética')
+    parser.add_argument('--sample-rate', type=int, default=44100, help='Frecuencia de muestreo del archivo')
+    parser.add_argument('--audio', help='Extraer las características de este archivo y salir')
+    args = parser.parse_args()
+
+    if args.audio:
+        print(extract_features(args.audio).tolist())
+        return
+
+    result = benchmark_memory(args.seconds, args.sample_rate)
+    print(f"\n=== CARACTERÍSTICAS DE AUDIO ({result['recording_seconds'] / 60:.0f} min, {result['file_mb']:.0f} MB) ===")
+    for name in ('in_memory', 'streaming'):
+        print(f"{name}: RSS pico {result[name]['peak_rss_mb']:.0f} MB, {result[name]['seconds']:.1f}s")
+    print(f"Diferencia máxima: {result['max_abs_difference']:.2e} (relativa {result['max_rel_difference']:.2e})")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
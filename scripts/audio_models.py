@@ -0,0 +1,591 @@
+#!/usr/bin/env python3
+"""
+Analizador de audio de servicio al cliente (Whisper + análisis de sentimiento)
+Se importa solo cuando se entrena o se infiere con la familia de audio
+"""
+
+import os
+import re
+import json
+import time
+import logging
+import unicodedata
+from abc import ABC, abstractmethod
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+
+from transformers import pipeline
+
+from audio_cache import AudioResultCache, asr_cache_key, file_sha256, text_sha256
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000  # whisper.load_audio remuestrea a 16 kHz mono
+WHISPER_WINDOW_SECONDS = 30  # Whisper decodifica ventanas de 30 s
+
+# Detector de voz por energía (parámetros de detect_speech_regions)
+VAD_DEFAULTS = {
+    'frame_seconds': 0.03,
+    'threshold_db': 12.0,  # Sobre el ruido de fondo (percentil 10 de la energía por frame)
+    'min_speech': 0.25,  # Regiones más cortas se descartan (clics, golpes)
+    'min_silence': 0.3,  # Silencios más cortos no separan regiones (< 0.5 s, que _analyze_timing no cuenta)
+    'padding': 0.2  # Margen a cada lado para no cortar inicios y finales de palabra
+}
+VAD_GAP_SECONDS = 0.2  # Silencio entre regiones al concatenarlas para Whisper
+VAD_MAX_SPEECH_FRACTION = 0.9  # Con más voz que esto se transcribe el audio completo
+VAD_ABSOLUTE_FLOOR_DB = -60.0  # Energía por debajo de esto es silencio digital
+
+DEFAULT_WHISPER_MODEL = 'large-v3'
+DEFAULT_SENTIMENT_MODEL = 'nlptown/bert-base-multilingual-uncased-sentiment'
+FASTER_WHISPER_PREFIX = 'faster-whisper/'
+
+def detect_speech_regions(audio: np.ndarray, sample_rate: int = SAMPLE_RATE,
+                          frame_seconds: float = VAD_DEFAULTS['frame_seconds'],
+                          threshold_db: float = VAD_DEFAULTS['threshold_db'],
+                          min_speech: float = VAD_DEFAULTS['min_speech'],
+                          min_silence: float = VAD_DEFAULTS['min_silence'],
+                          padding: float = VAD_DEFAULTS['padding']) -> List[Tuple[float, float]]:
+    """Regiones con voz (inicio, fin) en segundos, por energía sobre el ruido de fondo"""
+    
+    frame = int(sample_rate * frame_seconds)
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return []
+    frames = np.asarray(audio[:n_frames * frame], dtype=np.float64).reshape(n_frames, frame)
+    energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+    duration = len(audio) / sample_rate
+    # Rango dinámico con un percentil alto: en grabaciones casi en silencio la mediana también es
+    # ruido, pero el p95 sigue cayendo en la voz
+    floor, peak = np.percentile(energy_db, [10, 95])
+    if peak - floor < threshold_db:
+        # Sin rango útil (voz continua o nivel constante) el percentil 10 no es ruido de fondo:
+        # todo es voz salvo que sea silencio digital (mismo piso absoluto)
+        return [(0.0, float(duration))] if peak > VAD_ABSOLUTE_FLOOR_DB else []
+    # Piso absoluto: en grabaciones casi sin ruido el percentil sería silencio digital
+    threshold = max(floor + threshold_db, VAD_ABSOLUTE_FLOOR_DB)
+    
+    edges = np.diff(np.concatenate([[0], (energy_db > threshold).astype(np.int8), [0]]))
+    starts = np.flatnonzero(edges == 1) * frame_seconds
+    ends = np.flatnonzero(edges == -1) * frame_seconds
+    
+    regions = []
+    for start, end in zip(starts, ends):
+        if regions and start - regions[-1][1] < min_silence:
+            regions[-1][1] = end
+        else:
+            regions.append([start, end])
+    
+    padded = []
+    for start, end in regions:
+        if end - start < min_speech:
+            continue
+        start, end = max(0.0, start - padding), min(duration, end + padding)
+        if padded and start <= padded[-1][1]:
+            padded[-1][1] = end
+        else:
+            padded.append([start, end])
+    return [(float(start), float(end)) for start, end in padded]
+
+def transcription_mode(regions: List[Tuple[float, float]], total_seconds: float) -> str:
+    """'full' si no hay regiones (el detector pudo fallar) o casi todo es voz; si no, 'trimmed'"""
+    speech_seconds = sum(end - start for start, end in regions)
+    if not regions or not total_seconds or speech_seconds / total_seconds > VAD_MAX_SPEECH_FRACTION:
+        return 'full'
+    return 'trimmed'
+
+def compact_audio(audio: np.ndarray, regions: List[Tuple[float, float]], sample_rate: int = SAMPLE_RATE,
+                  gap: float = VAD_GAP_SECONDS) -> Tuple[np.ndarray, List[Tuple[float, float, float]]]:
+    """Concatenar las regiones con un silencio corto entre ellas; devuelve el audio y
+    el mapa (inicio compacto, fin compacto, inicio original) de cada región"""
+    
+    spacer = np.zeros(int(gap * sample_rate), dtype=audio.dtype)
+    pieces, mapping, position = [], [], 0.0
+    for i, (start, end) in enumerate(regions):
+        if i:
+            pieces.append(spacer)
+            position += len(spacer) / sample_rate
+        piece = audio[int(start * sample_rate):int(end * sample_rate)]
+        pieces.append(piece)
+        mapping.append((position, position + len(piece) / sample_rate, start))
+        position += len(piece) / sample_rate
+    return (np.concatenate(pieces) if pieces else audio[:0]), mapping
+
+def _to_original(t: float, mapping: List[Tuple[float, float, float]], is_end: bool) -> float:
+    """Instante del audio compacto en la línea de tiempo original; los instantes que caen en
+    un separador se llevan al final de la región anterior (fin) o al inicio de la siguiente (inicio)"""
+    
+    for i, (compact_start, compact_end, original_start) in enumerate(mapping):
+        if t <= compact_end or i == len(mapping) - 1:
+            if t < compact_start:
+                # En el separador anterior a esta región
+                if is_end and i > 0:
+                    previous_start, previous_end, previous_original = mapping[i - 1]
+                    return previous_original + previous_end - previous_start
+                return original_start
+            return original_start + min(t, compact_end) - compact_start
+    return 0.0
+
+def remap_segments(segments: List[Dict], mapping: List[Tuple[float, float, float]]) -> List[Dict]:
+    """Llevar los segmentos de Whisper a la línea de tiempo original
+    
+    Un segmento que abarca varias regiones se divide en sus tramos de voz (con las palabras
+    repartidas según la duración de cada tramo), de modo que los silencios eliminados vuelven
+    a aparecer como pausas entre segmentos para _analyze_timing
+    """
+    
+    regions = [(original, original + end - start) for start, end, original in mapping]
+    remapped = []
+    for segment in segments:
+        start = _to_original(segment['start'], mapping, is_end=False)
+        end = max(start, _to_original(segment['end'], mapping, is_end=True))
+        spans = [(max(start, r_start), min(end, r_end)) for r_start, r_end in regions
+                 if r_start < end and r_end > start]
+        if len(spans) <= 1:
+            remapped.append(dict(segment, start=start, end=end))
+            continue
+        
+        words = segment['text'].split()
+        total = sum(span_end - span_start for span_start, span_end in spans)
+        # Reparto acumulado redondeado: la suma de palabras se conserva
+        cuts = np.round(np.cumsum([span_end - span_start for span_start, span_end in spans]) / total * len(words))
+        first = 0
+        for (span_start, span_end), cut in zip(spans, cuts.astype(int)):
+            remapped.append(dict(segment, start=span_start, end=span_end,
+                                 text=' ' + ' '.join(words[first:cut]), split=True))
+            first = cut
+    return remapped
+
+def load_audio(audio_path: str) -> np.ndarray:
+    """Audio mono float32 a 16 kHz (ffmpeg vía el paquete de ASR instalado)"""
+    try:
+        import whisper
+        return whisper.load_audio(audio_path)
+    except ImportError:
+        from faster_whisper import decode_audio
+        return decode_audio(audio_path, sampling_rate=SAMPLE_RATE)
+
+class ASRBackend(ABC):
+    """Motor de transcripción: recibe audio a 16 kHz y devuelve {'text', 'segments', 'language'}
+    con segmentos {'start', 'end', 'text'} en segundos, como whisper.transcribe"""
+    
+    name = 'asr'
+    
+    @abstractmethod
+    def transcribe(self, audio: np.ndarray, language: str = 'es') -> Dict[str, Any]:
+        """Transcribir audio mono float32 a SAMPLE_RATE"""
+
+class WhisperBackend(ASRBackend):
+    """openai-whisper en CPU (fp32), con cualquier tamaño de modelo (tiny ... large-v3)"""
+    
+    def __init__(self, model_size: str = DEFAULT_WHISPER_MODEL, device: str = 'cpu'):
+        import whisper
+        
+        self.name = model_size
+        self.model = whisper.load_model(model_size, device=device)
+        
+    def transcribe(self, audio: np.ndarray, language: str = 'es') -> Dict[str, Any]:
+        return self.model.transcribe(audio, language=language, fp16=False)
+
+class QuantizedWhisperBackend(WhisperBackend):
+    """openai-whisper con las capas lineales cuantizadas a int8 (cuantización dinámica de PyTorch)
+    
+    Pesos int8 y activaciones cuantizadas al vuelo; las convoluciones y embeddings siguen en fp32
+    """
+    
+    def __init__(self, model_size: str = DEFAULT_WHISPER_MODEL):
+        import torch
+        import torch.nn as nn
+        import whisper.model
+        
+        super().__init__(model_size, device='cpu')
+        self.name = f"{model_size}:int8"
+        # whisper.model.Linear solo convierte el dtype en forward; quantize_dynamic exige nn.Linear
+        for module in self.model.modules():
+            if type(module) is whisper.model.Linear:
+                module.__class__ = nn.Linear
+        self.model = torch.ao.quantization.quantize_dynamic(self.model, {nn.Linear}, dtype=torch.qint8)
+
+class FasterWhisperBackend(ASRBackend):
+    """faster-whisper (CTranslate2) en CPU, int8 por defecto"""
+    
+    def __init__(self, model_size: str = DEFAULT_WHISPER_MODEL, compute_type: str = 'int8',
+                 cpu_threads: int = 0):
+        from faster_whisper import WhisperModel
+        
+        self.name = f"{FASTER_WHISPER_PREFIX}{model_size}:{compute_type}"
+        self.model = WhisperModel(model_size, device='cpu', compute_type=compute_type, cpu_threads=cpu_threads)
+        
+    def transcribe(self, audio: np.ndarray, language: str = 'es') -> Dict[str, Any]:
+        # Decodificado voraz, como whisper.transcribe por defecto (faster-whisper usa beam 5)
+        segments, info = self.model.transcribe(audio, language=language, beam_size=1)
+        segments = [{'id': i, 'start': seg.start, 'end': seg.end, 'text': seg.text}
+                    for i, seg in enumerate(segments)]
+        return {'text': ''.join(seg['text'] for seg in segments), 'segments': segments, 'language': info.language}
+
+def create_asr_backend(whisper_model: str = DEFAULT_WHISPER_MODEL) -> ASRBackend:
+    """Motor según service_audio.whisper_model
+    
+    '<tamaño>' usa openai-whisper fp32 (p. ej. 'large-v3', 'small'); '<tamaño>:int8' el mismo
+    modelo cuantizado con PyTorch; 'faster-whisper/<tamaño>[:<compute_type>]' CTranslate2 (int8
+    si no se indica)
+    """
+    
+    if whisper_model.startswith(FASTER_WHISPER_PREFIX):
+        model_size, _, compute_type = whisper_model[len(FASTER_WHISPER_PREFIX):].partition(':')
+        return FasterWhisperBackend(model_size, compute_type or 'int8')
+    model_size, _, precision = whisper_model.partition(':')
+    if precision == 'int8':
+        return QuantizedWhisperBackend(model_size)
+    if precision not in ('', 'fp32'):
+        raise ValueError(f"Precisión no soportada para openai-whisper: {whisper_model}")
+    return WhisperBackend(model_size)
+
+def normalize_transcript(text: str) -> List[str]:
+    """Palabras en minúsculas, sin puntuación ni tildes, para comparar transcripciones"""
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r"[^\w\s']", ' ', text).split()
+
+def word_errors(reference: List[str], hypothesis: List[str]) -> int:
+    """Distancia de edición por palabras (sustituciones + inserciones + borrados)"""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1]
+
+class ServiceAudioAnalyzer:
+    """Analizador de audio para servicio al cliente"""
+    
+    def __init__(self, vad: bool = True, vad_options: Optional[Dict[str, float]] = None,
+                 whisper_model: str = DEFAULT_WHISPER_MODEL, sentiment_model: str = DEFAULT_SENTIMENT_MODEL,
+                 language: str = 'es', cache: Optional[AudioResultCache] = None):
+        # Cargar modelos pre-entrenados; el motor de ASR según whisper_model (create_asr_backend)
+        self.asr = create_asr_backend(whisper_model)
+        self.language = language
+        self.sentiment_model = sentiment_model
+        # Resultados ya calculados por hash del audio / de la transcripción (opcional)
+        self.cache = cache
+        self.sentiment_pipeline = pipeline(
+            "sentiment-analysis", 
+            model=sentiment_model
+        )
+        # Pre-paso de detección de voz: Whisper solo transcribe las regiones con voz
+        self.vad = vad
+        self.vad_options = dict(VAD_DEFAULTS, **(vad_options or {}))
+    
+    @classmethod
+    def from_config(cls, audio_config: Dict[str, Any], **kwargs) -> 'ServiceAudioAnalyzer':
+        """Analizador con model_configs.service_audio (whisper_model, sentiment_model, language, cache)"""
+        cache_config = audio_config.get('cache', {})
+        if cache_config.get('enabled', False) and 'cache' not in kwargs:
+            kwargs['cache'] = AudioResultCache(cache_config.get('path'), cache_config.get('max_mb', 512.0))
+        return cls(whisper_model=audio_config.get('whisper_model', DEFAULT_WHISPER_MODEL),
+                   sentiment_model=audio_config.get('sentiment_model', DEFAULT_SENTIMENT_MODEL),
+                   language=audio_config.get('language', 'es'), **kwargs)
+    
+    def asr_key(self, vad: Optional[bool] = None) -> str:
+        """Clave de caché del motor, idioma y recorte con que se transcribe"""
+        vad_options = self.vad_options if (self.vad if vad is None else vad) else None
+        return asr_cache_key(self.asr.name, self.language, vad_options)
+        
+    def transcribe(self, audio_path: str, vad: Optional[bool] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Transcribir con recorte de silencios; segmentos en la línea de tiempo original"""
+        
+        start = time.perf_counter()
+        audio = load_audio(audio_path)
+        if not (self.vad if vad is None else vad):
+            result = self.asr.transcribe(audio, language=self.language)
+            return result, {'enabled': False, 'transcribe_seconds': time.perf_counter() - start}
+        
+        total_seconds = len(audio) / SAMPLE_RATE
+        regions = detect_speech_regions(audio, SAMPLE_RATE, **self.vad_options)
+        speech_seconds = sum(end - region_start for region_start, end in regions)
+        report = {
+            'enabled': True,
+            'total_seconds': total_seconds,
+            'speech_seconds': speech_seconds,
+            'regions': len(regions),
+            'skipped_fraction': 1 - speech_seconds / total_seconds if total_seconds else 0.0
+        }
+        
+        if transcription_mode(regions, total_seconds) == 'full':
+            # Sin regiones o casi todo es voz: se transcribe completo (recortar no compensa o no es fiable)
+            result = self.asr.transcribe(audio, language=self.language)
+            report.update({'transcribed_seconds': total_seconds, 'skipped_fraction': 0.0})
+        else:
+            # Regiones concatenadas: Whisper las decodifica juntas en ventanas de 30 s
+            compact, mapping = compact_audio(audio, regions)
+            result = self.asr.transcribe(compact, language=self.language)
+            result['segments'] = remap_segments(result['segments'], mapping)
+            report['transcribed_seconds'] = len(compact) / SAMPLE_RATE
+        
+        # Coste de Whisper ~ ventanas de 30 s decodificadas
+        full_windows = int(np.ceil(total_seconds / WHISPER_WINDOW_SECONDS))
+        trimmed_windows = int(np.ceil(report['transcribed_seconds'] / WHISPER_WINDOW_SECONDS))
+        report.update({
+            'whisper_windows': trimmed_windows,
+            'estimated_speedup': full_windows / trimmed_windows if trimmed_windows else None,
+            'transcribe_seconds': time.perf_counter() - start
+        })
+        return result, report
+        
+    def cached_transcribe(self, audio_path: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """transcribe() consultando antes la caché por hash del contenido del audio"""
+        
+        if self.cache is None:
+            return self.transcribe(audio_path)
+        audio_sha256 = file_sha256(audio_path)
+        cached = self.cache.get_transcription(audio_sha256, self.asr_key())
+        if cached is not None:
+            result, vad_report = cached
+            return result, dict(vad_report, cached=True)
+        result, vad_report = self.transcribe(audio_path)
+        self.cache.put_transcription(audio_sha256, self.asr_key(), result, vad_report)
+        return result, vad_report
+    
+    def sentiment(self, transcription: str) -> Dict[str, Any]:
+        """Sentimiento de la transcripción, reutilizado si el mismo texto ya se analizó"""
+        
+        if self.cache is None:
+            return self.sentiment_pipeline(transcription)[0]
+        transcript_sha256 = text_sha256(transcription)
+        sentiment = self.cache.get_sentiment(transcript_sha256, self.sentiment_model)
+        if sentiment is None:
+            sentiment = self.sentiment_pipeline(transcription)[0]
+            self.cache.put_sentiment(transcript_sha256, self.sentiment_model, sentiment)
+        return sentiment
+    
+    def analyze_service_audio(self, audio_path: str) -> Dict[str, Any]:
+        """Analizar audio de servicio al cliente"""
+        
+        # Transcribir audio (solo las regiones con voz)
+        result, vad_report = self.cached_transcribe(audio_path)
+        transcription = result['text']
+        
+        # Análisis de sentimiento
+        sentiment = self.sentiment(transcription)
+        
+        # Métricas de calidad de servicio
+        service_metrics = self._analyze_service_quality(transcription)
+        
+        # Análisis temporal
+        timing_analysis = self._analyze_timing(result['segments'])
+        
+        return {
+            'transcription': transcription,
+            'sentiment': sentiment,
+            'service_metrics': service_metrics,
+            'timing_analysis': timing_analysis,
+            'overall_score': self._calculate_overall_score(service_metrics, sentiment, timing_analysis),
+            'vad': vad_report,
+            # Segmentos y clave del motor: permiten sembrar la caché desde ai_verifications.ai_result
+            'segments': [{'start': seg['start'], 'end': seg['end'], 'text': seg['text']} for seg in result['segments']],
+            'asr_key': self.asr_key()
+        }
+    
+    def _analyze_service_quality(self, text: str) -> Dict[str, float]:
+        """Analizar calidad del servicio basado en el texto"""
+        
+        # Palabras clave positivas y negativas
+        positive_keywords = [
+            'gracias', 'por favor', 'disculpe', 'con gusto', 
+            'excelente', 'perfecto', 'claro', 'enseguida'
+        ]
+        negative_keywords = [
+            'no puedo', 'imposible', 'no tenemos', 'espere', 
+            'problema', 'error', 'mal', 'tarde'
+        ]
+        
+        text_lower = text.lower()
+        
+        positive_count = sum(1 for word in positive_keywords if word in text_lower)
+        negative_count = sum(1 for word in negative_keywords if word in text_lower)
+        
+        # Calcular métricas
+        politeness_score = min(100, (positive_count / max(1, len(text.split()) / 10)) * 100)
+        clarity_score = 100 - (negative_count / max(1, len(text.split()) / 10)) * 50
+        
+        return {
+            'politeness': max(0, min(100, politeness_score)),
+            'clarity': max(0, min(100, clarity_score)),
+            'positive_keywords': positive_count,
+            'negative_keywords': negative_count
+        }
+    
+    @staticmethod
+    def _analyze_timing(segments: List[Dict]) -> Dict[str, float]:
+        """Analizar timing del servicio (mismas claves aunque no haya segmentos)"""
+        
+        if not segments:
+            return {'total_duration': 0, 'speech_rate': 0, 'average_pause': 0, 'long_pauses': 0}
+        
+        # Calcular velocidad de habla
+        total_duration = segments[-1]['end'] - segments[0]['start']
+        total_words = sum(len(seg['text'].split()) for seg in segments)
+        speech_rate = total_words / total_duration * 60 if total_duration > 0 else 0  # palabras por minuto
+        
+        # Analizar pausas
+        pauses = []
+        for i in range(1, len(segments)):
+            pause = segments[i]['start'] - segments[i-1]['end']
+            if pause > 0.5:  # Pausas mayores a 0.5 segundos
+                pauses.append(pause)
+        
+        avg_pause = np.mean(pauses) if pauses else 0
+        
+        return {
+            'total_duration': total_duration,
+            'speech_rate': speech_rate,
+            'average_pause': avg_pause,
+            'long_pauses': len([p for p in pauses if p > 2.0])
+        }
+    
+    @staticmethod
+    def _calculate_overall_score(service_metrics: Dict, sentiment: Dict, timing: Dict) -> float:
+        """Calcular puntuación general del servicio"""
+        
+        # Pesos para diferentes aspectos
+        weights = {
+            'politeness': 0.3,
+            'clarity': 0.25,
+            'sentiment': 0.25,
+            'timing': 0.2
+        }
+        
+        # Normalizar sentiment score (1-5 stars to 0-100)
+        sentiment_score = (float(sentiment['label'].split()[0]) - 1) * 25
+        
+        # Normalizar timing score
+        timing_score = min(100, max(0, 100 - (timing['average_pause'] * 10)))
+        
+        overall_score = (
+            service_metrics['politeness'] * weights['politeness'] +
+            service_metrics['clarity'] * weights['clarity'] +
+            sentiment_score * weights['sentiment'] +
+            timing_score * weights['timing']
+        )
+        
+        return round(overall_score, 2)
+
+def benchmark_vad(analyzer: ServiceAudioAnalyzer, audio_paths: List[str]) -> Dict[str, Any]:
+    """Transcripción completa vs recortada: fracción omitida, aceleración y métricas de timing de ambas"""
+    
+    results = []
+    for audio_path in audio_paths:
+        full, full_report = analyzer.transcribe(audio_path, vad=False)
+        trimmed, trimmed_report = analyzer.transcribe(audio_path, vad=True)
+        results.append({
+            'audio_path': audio_path,
+            'skipped_fraction': trimmed_report['skipped_fraction'],
+            'full_seconds': full_report['transcribe_seconds'],
+            'trimmed_seconds': trimmed_report['transcribe_seconds'],
+            'speedup': full_report['transcribe_seconds'] / trimmed_report['transcribe_seconds'],
+            'timing_full': analyzer._analyze_timing(full['segments']),
+            'timing_trimmed': analyzer._analyze_timing(trimmed['segments'])
+        })
+        logger.info(f"{audio_path}: {results[-1]['skipped_fraction']:.0%} omitido, {results[-1]['speedup']:.2f}x")
+    
+    full_total = sum(r['full_seconds'] for r in results)
+    trimmed_total = sum(r['trimmed_seconds'] for r in results)
+    return {
+        'files': results,
+        'mean_skipped_fraction': float(np.mean([r['skipped_fraction'] for r in results])) if results else 0.0,
+        'speedup': full_total / trimmed_total if trimmed_total else None
+    }
+
+def check_vad(seconds: float = 60.0) -> bool:
+    """Comprobar el recorte con audio sintético: tono continuo y voz sin pausas se transcriben
+    completos, ráfagas y grabaciones casi en silencio se recortan, y el análisis temporal sin
+    segmentos puntúa"""
+    
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    rng = np.random.default_rng(0)
+    tone = 0.3 * np.sin(2 * np.pi * 220 * t)
+    # Voz simulada sin silencios: portadora con modulación silábica (~4 Hz) sobre ruido
+    speech = (0.2 + 0.15 * np.sin(2 * np.pi * 4 * t)) * np.sin(2 * np.pi * (150 + 30 * np.sin(2 * np.pi * 3 * t)) * t)
+    speech = speech + rng.normal(0, 0.01, len(t))
+    bursts = tone * (np.sin(2 * np.pi * 0.3 * t) > 0) + rng.normal(0, 0.001, len(t))
+    # Caso de drive-thru/teléfono: 20 % de voz (2 s cada 10 s) sobre ruido de fondo
+    mostly_silent = speech * ((t % 10) < 2) + rng.normal(0, 0.005, len(t))
+    cases = {
+        'continuous_tone': (tone, 'full'),
+        'continuous_speech': (speech, 'full'),
+        'bursts_with_silence': (bursts, 'trimmed'),
+        'mostly_silent': (mostly_silent, 'trimmed'),
+        'digital_silence': (np.zeros_like(t), 'full')
+    }
+    
+    ok = True
+    for name, (audio, expected) in cases.items():
+        regions = detect_speech_regions(audio.astype(np.float32), SAMPLE_RATE, **VAD_DEFAULTS)
+        mode = transcription_mode(regions, seconds)
+        speech_fraction = sum(end - start for start, end in regions) / seconds
+        logger.info(f"VAD {name}: {len(regions)} regiones ({speech_fraction:.0%} del audio), "
+                    f"modo {mode} (esperado {expected})")
+        ok = ok and mode == expected
+    
+    # Sin segmentos (p. ej. transcripción vacía) la puntuación no debe fallar
+    timing = ServiceAudioAnalyzer._analyze_timing([])
+    metrics = {'politeness': 50.0, 'clarity': 50.0}
+    score = ServiceAudioAnalyzer._calculate_overall_score(metrics, {'label': '3 stars', 'score': 1.0}, timing)
+    logger.info(f"Puntuación sin segmentos: {score}")
+    return ok
+
+def load_labelled_sample(manifest_path: str) -> List[Dict[str, str]]:
+    """Muestra etiquetada local: JSONL con audio_path y transcription (rutas relativas al manifiesto)"""
+    
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    sample = []
+    with open(manifest_path, 'r') as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                item['audio_path'] = os.path.join(base, item['audio_path'])
+                sample.append(item)
+    return sample
+
+def benchmark_asr(whisper_models: List[str], manifest_path: str, language: str = 'es') -> Dict[str, Any]:
+    """Factor de tiempo real (segundos de cómputo / segundos de audio) y WER de cada motor
+    sobre una muestra etiquetada, para elegir el compromiso velocidad/precisión por sede"""
+    
+    sample = load_labelled_sample(manifest_path)
+    audios = [load_audio(item['audio_path']) for item in sample]
+    audio_seconds = sum(len(audio) for audio in audios) / SAMPLE_RATE
+    references = [normalize_transcript(item['transcription']) for item in sample]
+    
+    results = []
+    for whisper_model in whisper_models:
+        start = time.perf_counter()
+        backend = create_asr_backend(whisper_model)
+        load_seconds = time.perf_counter() - start
+        
+        errors, transcribe_seconds, files = 0, 0.0, []
+        for item, audio, reference in zip(sample, audios, references):
+            start = time.perf_counter()
+            text = backend.transcribe(audio, language=language)['text']
+            seconds = time.perf_counter() - start
+            file_errors = word_errors(reference, normalize_transcript(text))
+            errors += file_errors
+            transcribe_seconds += seconds
+            files.append({
+                'audio_path': item['audio_path'],
+                'rtf': seconds / (len(audio) / SAMPLE_RATE),
+                'wer': file_errors / max(1, len(reference)),
+                'transcription': text
+            })
+        
+        results.append({
+            'whisper_model': whisper_model,
+            'backend': backend.name,
+            'load_seconds': load_seconds,
+            'rtf': transcribe_seconds / audio_seconds,
+            'wer': errors / max(1, sum(len(reference) for reference in references)),
+            'files': files
+        })
+        logger.info(f"{whisper_model}: RTF {results[-1]['rtf']:.3f}, WER {results[-1]['wer']:.1%}")
+        del backend
+    
+    return {'audio_seconds': audio_seconds, 'files': len(sample), 'models': results}
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Benchmark de las consultas del evaluador antes y después de 12-evaluator-projection.sql
+Crea un esquema desechable con ai_verifications / specialized_feedback sintéticas
+(10M verificaciones por defecto) y mide los agregados del evaluador sobre las tablas
+base sin índices, con los índices nuevos y sobre la vista materializada
+"""
+
+import os
+import json
+import time
+import logging
+import argparse
+import statistics
+from typing import Dict, Any
+
+import psycopg2
+from model_evaluation import (
+    ModelEvaluator, AGGREGATE_METRICS_SQL, SCORE_CELLS_SQL, FLEET_VERIFICATIONS_SQL,
+    BASE_VERIFICATIONS_SQL, PROJECTION_VERIFICATIONS_SQL
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MIGRATION_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '12-evaluator-projection.sql')
+
+VERIFICATION_TYPES = [
+    'kitchen_hygiene', 'food_temperature', 'equipment_safety', 'storage_conditions', 'service_audio', 'hotel_room'
+]
+
+# Tablas con las columnas que lee el evaluador y JSONB de tamaño realista; solo los índices de 08
+SCHEMA_SQL = """
+    CREATE TABLE ai_verifications (
+        id UUID PRIMARY KEY,
+        empleado_id UUID,
+        verification_type VARCHAR(50) NOT NULL,
+        content_data JSONB NOT NULL,
+        ai_result JSONB NOT NULL,
+        confidence_score DECIMAL(3,2) NOT NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'pending',
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    );
+    CREATE INDEX idx_ai_verifications_created_at ON ai_verifications(created_at);
+
+    CREATE TABLE specialized_feedback (
+        id UUID PRIMARY KEY,
+        verification_id UUID,
+        expert_score INTEGER,
+        detailed_feedback JSONB NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    );
+"""
+
+INSERT_VERIFICATIONS_SQL = """
+    INSERT INTO ai_verifications (id, verification_type, content_data, ai_result, confidence_score, created_at)
+    SELECT gen_random_uuid(),
+           (%(types)s::text[])[1 + g %% %(type_count)s],
+           jsonb_build_object(
+               'restaurant_type', (ARRAY['fast_food', 'casual', 'fine_dining'])[1 + g %% 3],
+               'area', (ARRAY['prep', 'cooking', 'storage', 'cleaning'])[1 + g %% 4],
+               'shift', (ARRAY['morning', 'afternoon', 'evening'])[1 + g %% 3],
+               'image_url', 'https://storage.example.com/verifications/' || g || '.jpg',
+               'notes', repeat('x', %(padding)s)
+           ),
+           jsonb_build_object(
+               'score', round(60 + random() * 40),
+               'issues', jsonb_build_array('limpieza', 'temperatura'),
+               'model_version', '1.0.0'
+           ),
+           round((0.5 + random() * 0.5)::numeric, 2),
+           NOW() - random() * INTERVAL '180 days'
+    FROM generate_series(%(start)s, %(end)s) g
+"""
+
+INSERT_FEEDBACK_SQL = """
+    INSERT INTO specialized_feedback (id, verification_id, expert_score, detailed_feedback, created_at)
+    SELECT gen_random_uuid(), av.id,
+           least(100, greatest(0, (av.ai_result->>'score')::int + round(random() * 16 - 8)::int)),
+           jsonb_build_object('comment', 'Revisión experta'),
+           av.created_at + random() * INTERVAL '2 days'
+    FROM ai_verifications av
+    WHERE random() < %s
+"""
+
+
+def _timed(cursor, sql: str, params, repeat: int) -> Dict[str, Any]:
+    """Mediana de `repeat` ejecuciones (tras una de calentamiento) leyendo todas las filas"""
+    cursor.execute(sql, params)
+    rows = len(cursor.fetchall())
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cursor.execute(sql, params)
+        cursor.fetchall()
+        seconds.append(time.perf_counter() - start)
+    return {'median_seconds': statistics.median(seconds), 'rows': rows}
+
+
+def _run_queries(cursor, source: str, verification_type: str, days_back: int, repeat: int,
+                 explain: bool) -> Dict[str, Any]:
+    queries = {
+        'aggregate_metrics': (AGGREGATE_METRICS_SQL, (verification_type, days_back)),
+        'score_cells': (SCORE_CELLS_SQL, (verification_type, days_back)),
+        'fleet_fetch': (FLEET_VERIFICATIONS_SQL, ([verification_type], days_back))
+    }
+    results = {}
+    for name, (template, params) in queries.items():
+        sql = template.replace('{source}', source)
+        results[name] = _timed(cursor, sql, params, repeat)
+        if explain:
+            cursor.execute('EXPLAIN (ANALYZE, BUFFERS) ' + sql, params)
+            results[name]['plan'] = [row[0] for row in cursor.fetchall()]
+    return results
+
+
+def run_benchmark(rows: int = 10_000_000, feedback_ratio: float = 0.6, padding: int = 400,
+                  days_back: int = 30, repeat: int = 3, schema: str = 'evaluator_benchmark',
+                  keep: bool = False, explain: bool = False) -> Dict[str, Any]:
+    """Poblar el esquema de prueba y medir las consultas en los tres escenarios"""
+
+    connection = ModelEvaluator().db_connection
+    connection.autocommit = True
+    report = {'rows': rows, 'feedback_ratio': feedback_ratio, 'days_back': days_back, 'scenarios': {}}
+
+    with connection.cursor(cursor_factory=psycopg2.extensions.cursor) as cursor:
+        cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        cursor.execute(f"CREATE SCHEMA {schema}")
+        cursor.execute(f"SET search_path TO {schema}, public")
+        cursor.execute(SCHEMA_SQL)
+
+        start = time.perf_counter()
+        batch = 1_000_000
+        for first in range(0, rows, batch):
+            cursor.execute(INSERT_VERIFICATIONS_SQL, {
+                'types': VERIFICATION_TYPES, 'type_count': len(VERIFICATION_TYPES), 'padding': padding,
+                'start': first, 'end': min(first + batch, rows) - 1
+            })
+            logger.info(f"Verificaciones insertadas: {min(first + batch, rows)}/{rows}")
+        cursor.execute(INSERT_FEEDBACK_SQL, (feedback_ratio,))
+        cursor.execute("VACUUM ANALYZE ai_verifications")
+        cursor.execute("VACUUM ANALYZE specialized_feedback")
+        report['load_seconds'] = time.perf_counter() - start
+
+        cursor.execute("SELECT pg_total_relation_size('ai_verifications') + pg_total_relation_size('specialized_feedback')")
+        report['base_tables_bytes'] = cursor.fetchone()[0]
+
+        verification_type = VERIFICATION_TYPES[0]
+        logger.info("Escenario sin índices del evaluador...")
+        report['scenarios']['before'] = _run_queries(
+            cursor, BASE_VERIFICATIONS_SQL, verification_type, days_back, repeat, explain
+        )
+
+        start = time.perf_counter()
+        with open(MIGRATION_FILE, encoding='utf-8') as f:
+            cursor.execute(f.read())
+        cursor.execute("ANALYZE evaluation_verifications_mv")
+        report['migration_seconds'] = time.perf_counter() - start
+
+        cursor.execute("SELECT pg_total_relation_size('evaluation_verifications_mv')")
+        report['projection_bytes'] = cursor.fetchone()[0]
+
+        logger.info("Escenario con índices sobre las tablas base...")
+        report['scenarios']['indexed'] = _run_queries(
+            cursor, BASE_VERIFICATIONS_SQL, verification_type, days_back, repeat, explain
+        )
+
+        logger.info("Escenario sobre la vista materializada...")
+        report['scenarios']['projection'] = _run_queries(
+            cursor, PROJECTION_VERIFICATIONS_SQL, verification_type, days_back, repeat, explain
+        )
+
+        start = time.perf_counter()
+        cursor.execute("SELECT refresh_evaluation_projection()")
+        report['refresh_seconds'] = time.perf_counter() - start
+
+        if not keep:
+            cursor.execute(f"DROP SCHEMA {schema} CASCADE")
+
+    connection.close()
+    return report
+
+
+def main():
+    """Benchmark local de las consultas del evaluador (requiere PostgreSQL con DB_* configurado)"""
+
+    parser = argparse.ArgumentParser(description='Benchmark de índices y proyección del evaluador')
+    parser.add_argument('--rows', type=int, default=10_000_000, help='Verificaciones sintéticas')
+    parser.add_argument('--feedback-ratio', type=float, default=0.6, help='Fracción con feedback experto')
+    parser.add_argument('--padding', type=int, default=400, help='Bytes de relleno en content_data')
+    parser.add_argument('--days-back', type=int, default=30, help='Ventana de las consultas')
+    parser.add_argument('--repeat', type=int, default=3, help='Repeticiones por consulta (mediana)')
+    parser.add_argument('--schema', default='evaluator_benchmark', help='Esquema desechable de prueba')
+    parser.add_argument('--keep', action='store_true', help='No borrar el esquema al terminar')
+    parser.add_argument('--explain', action='store_true', help='Guardar EXPLAIN ANALYZE de cada consulta')
+    parser.add_argument('--output', help='Ruta para guardar el resultado en JSON')
+
+    args = parser.parse_args()
+    report = run_benchmark(
+        args.rows, args.feedback_ratio, args.padding, args.days_back, args.repeat,
+        args.schema, args.keep, args.explain
+    )
+
+    print(f"\n=== CONSULTAS DEL EVALUADOR ({report['rows']} verificaciones, {report['days_back']} días) ===")
+    print(f"Carga: {report['load_seconds']:.1f}s, migración: {report['migration_seconds']:.1f}s, "
+          f"refresco concurrente: {report['refresh_seconds']:.1f}s")
+    print(f"Tablas base: {report['base_tables_bytes'] / 1e6:.0f} MB, proyección: {report['projection_bytes'] / 1e6:.0f} MB")
+    scenarios = report['scenarios']
+    for query in scenarios['before']:
+        before = scenarios['before'][query]['median_seconds']
+        timings = ', '.join(
+            f"{name} {scenarios[name][query]['median_seconds'] * 1000:.0f} ms "
+            f"(x{before / max(scenarios[name][query]['median_seconds'], 1e-9):.1f})"
+            for name in ('indexed', 'projection')
+        )
+        print(f"{query}: sin índices {before * 1000:.0f} ms; {timings}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False, default=str)
+        print(f"\nResultado guardado en: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Snapshots columnares (Parquet) de los datasets de entrenamiento
+Evitan reconstruir el dataset desde PostgreSQL en cada ejecución mientras
+la fila de ai_training_datasets no cambie
+"""
+
+import os
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+
+from synthetic_data import write_parquet, load_batch
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_KEY = 'horeca_snapshot'
+
+
+class DatasetSnapshotStore:
+    """Snapshots Parquet por versión de dataset, invalidados por updated_at / labeled_samples"""
+
+    def __init__(self, root: Optional[str] = None):
+        default_root = os.path.join(os.getenv('DATA_PATH', './data'), 'snapshots')
+        self.root = Path(root or os.getenv('DATASET_SNAPSHOT_PATH', default_root))
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, dataset_info: Dict) -> Path:
+        """Archivo del snapshot de una versión de dataset"""
+        return self.root / f"{dataset_info['id']}_{dataset_info['dataset_version']}.parquet"
+
+    def fingerprint(self, dataset_info: Dict) -> Dict[str, Any]:
+        """Campos de la fila del dataset que invalidan el snapshot al cambiar"""
+        return {
+            'dataset_id': str(dataset_info['id']),
+            'dataset_version': dataset_info['dataset_version'],
+            'updated_at': str(dataset_info.get('updated_at')),
+            'labeled_samples': dataset_info['labeled_samples']
+        }
+
+    def is_fresh(self, dataset_info: Dict) -> bool:
+        """Comprobar si existe un snapshot vigente leyendo solo el esquema"""
+        import pyarrow.parquet as pq
+
+        path = self.path(dataset_info)
+        if not path.exists():
+            return False
+
+        metadata = pq.read_schema(path).metadata or {}
+        stored = metadata.get(FINGERPRINT_KEY.encode())
+        return stored is not None and json.loads(stored) == self.fingerprint(dataset_info)
+
+    def write(self, dataset_info: Dict, kind: str, batch: Dict[str, np.ndarray]) -> Path:
+        """Exportar un lote columnar como snapshot (un solo row group para lectura sin copia)"""
+        path = self.path(dataset_info)
+        tmp_path = path.with_suffix('.parquet.tmp')
+        rows = write_parquet(
+            iter([batch]), str(tmp_path), kind,
+            metadata={FINGERPRINT_KEY: json.dumps(self.fingerprint(dataset_info))}
+        )
+        os.replace(tmp_path, path)
+        logger.info(f"Snapshot de dataset {dataset_info['id']} escrito: {rows} filas en {path}")
+        return path
+
+    def read(self, dataset_info: Dict, columns: Optional[List[str]] = None) -> Tuple[str, Dict[str, np.ndarray]]:
+        """Leer el snapshot con proyección de columnas"""
+        logger.info(f"Usando snapshot de dataset {dataset_info['id']} ({self.path(dataset_info)})")
+        return load_batch(str(self.path(dataset_info)), columns)
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Detectores de drift en streaming para modelos en producción
+Page-Hinkley sobre error y tasa de fallos, y PSI/KS sobre histogramas de
+score y confianza; el estado es de tamaño fijo y se persiste entre ejecuciones
+"""
+
+from typing import Dict, List, Any, Optional, Sequence
+import numpy as np
+
+from evaluation_stats import PASS_THRESHOLD
+
+
+def _timestamp(value) -> Optional[str]:
+    """Normalizar marcas de tiempo a texto ISO para persistirlas"""
+    if value is None:
+        return None
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+class PageHinkley:
+    """Test de Page-Hinkley para aumentos en la media de una señal (O(1) por observación)"""
+
+    def __init__(self, delta: float, threshold: float, min_samples: int = 30, state: Optional[Dict] = None):
+        self.delta = delta
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.reset()
+        self.last_drift = None
+        if state:
+            self.__dict__.update(state)
+
+    def reset(self):
+        """Reiniciar las estadísticas tras una detección para aprender el nuevo régimen"""
+        self.n = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.cumulative = 0.0
+        self.minimum = None
+        self.n_at_minimum = 0
+        self.total_at_minimum = 0.0
+        self.minimum_at = None
+
+    def update(self, value: float, timestamp=None) -> bool:
+        """Añadir una observación; devuelve True si se detecta drift"""
+        self.n += 1
+        self.total += value
+        self.mean += (value - self.mean) / self.n
+        self.cumulative += value - self.mean - self.delta
+
+        if self.minimum is None or self.cumulative < self.minimum:
+            self.minimum = self.cumulative
+            self.n_at_minimum = self.n
+            self.total_at_minimum = self.total
+            self.minimum_at = _timestamp(timestamp)
+
+        statistic = self.cumulative - self.minimum
+        if self.n >= self.min_samples and statistic > self.threshold and self.n > self.n_at_minimum:
+            mean_before = self.total_at_minimum / self.n_at_minimum
+            mean_after = (self.total - self.total_at_minimum) / (self.n - self.n_at_minimum)
+            self.last_drift = {
+                # El punto de cambio estimado es el último mínimo de la suma acumulada
+                'started_at': self.minimum_at,
+                'detected_at': _timestamp(timestamp),
+                'statistic': statistic,
+                'mean_before': mean_before,
+                'mean_after': mean_after,
+                'observations': self.n
+            }
+            self.reset()
+            return True
+        return False
+
+    def update_many(self, values: np.ndarray, timestamps: List) -> bool:
+        """Añadir observaciones en orden; equivalente a update() en bucle, vectorizado entre detecciones"""
+        values = np.asarray(values, dtype=np.float64)
+        detected = False
+        start = 0
+        while start < len(values):
+            segment = values[start:]
+            n = self.n + np.arange(1, len(segment) + 1)
+            totals = self.total + np.cumsum(segment)
+            cumulative = self.cumulative + np.cumsum(segment - totals / n - self.delta)
+            initial_minimum = cumulative[0] if self.minimum is None else min(self.minimum, cumulative[0])
+            minimum = np.minimum.accumulate(np.concatenate(([initial_minimum], cumulative)))[1:]
+            alarms = np.flatnonzero((n >= self.min_samples) & (cumulative - minimum > self.threshold))
+
+            end = alarms[0] + 1 if len(alarms) else len(segment)
+            # Aplicar el prefijo hasta la alarma (o todo el segmento) al estado escalar
+            previous_minimum = np.concatenate(([np.inf if self.minimum is None else self.minimum], minimum[:-1]))
+            new_minimum = np.flatnonzero(cumulative[:end] < previous_minimum[:end])
+            if len(new_minimum):
+                i = new_minimum[-1]
+                self.minimum = float(cumulative[i])
+                self.n_at_minimum = int(n[i])
+                self.total_at_minimum = float(totals[i])
+                self.minimum_at = _timestamp(timestamps[start + i])
+            self.n = int(n[end - 1])
+            self.total = float(totals[end - 1])
+            self.mean = self.total / self.n
+            self.cumulative = float(cumulative[end - 1])
+
+            if len(alarms) and self.n > self.n_at_minimum:
+                self.last_drift = {
+                    'started_at': self.minimum_at,
+                    'detected_at': _timestamp(timestamps[start + end - 1]),
+                    'statistic': self.cumulative - self.minimum,
+                    'mean_before': self.total_at_minimum / self.n_at_minimum,
+                    'mean_after': (self.total - self.total_at_minimum) / (self.n - self.n_at_minimum),
+                    'observations': self.n
+                }
+                self.reset()
+                detected = True
+            start += end
+        return detected
+
+    def statistic(self) -> float:
+        return self.cumulative - self.minimum if self.minimum is not None else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+class BinnedDistributionMonitor:
+    """PSI y KS entre un histograma de referencia fijo y uno reciente con decaimiento exponencial"""
+
+    def __init__(self, edges: Sequence[float], reference_size: int = 1000, decay: float = 0.999,
+                 psi_threshold: float = 0.2, ks_alpha: float = 0.01, check_every: int = 100,
+                 state: Optional[Dict] = None):
+        self.edges = [float(edge) for edge in edges]
+        self.reference_size = reference_size
+        self.decay = decay
+        self.psi_threshold = psi_threshold
+        self.ks_alpha = ks_alpha
+        self.check_every = check_every
+        bins = len(self.edges) - 1
+        self.reference = [0] * bins
+        self.current = [0.0] * bins
+        self.current_weight = 0.0
+        self.current_weight_sq = 0.0
+        self.exceeded_since = None
+        self.last_drift = None
+        self.last_check = {}
+        if state:
+            self.__dict__.update(state)
+
+    @property
+    def reference_n(self) -> int:
+        return int(sum(self.reference))
+
+    def _bins(self, values: np.ndarray) -> np.ndarray:
+        inner_edges = np.asarray(self.edges[1:-1])
+        return np.searchsorted(inner_edges, values, side='right')
+
+    def update(self, values: np.ndarray, timestamps: List) -> bool:
+        """Añadir observaciones en orden temporal, comprobando cada `check_every`; True si se detecta drift"""
+        values = np.asarray(values, dtype=np.float64)
+        bins = self._bins(values)
+        n_bins = len(self.reference)
+
+        # Completar primero la referencia con las primeras observaciones
+        missing = self.reference_size - self.reference_n
+        if missing > 0:
+            filled = np.bincount(bins[:missing], minlength=n_bins)
+            self.reference = (np.asarray(self.reference) + filled).tolist()
+            bins, timestamps = bins[missing:], timestamps[missing:]
+        if len(bins) == 0:
+            return False
+
+        # Histograma de cada bloque con pesos de decaimiento (la observación más reciente pesa 1)
+        chunk_ids = np.arange(len(bins)) // self.check_every
+        n_chunks = int(chunk_ids[-1]) + 1
+        sizes = np.bincount(chunk_ids)
+        positions = np.arange(len(bins)) - chunk_ids * self.check_every
+        weights = self.decay ** (sizes[chunk_ids] - 1 - positions)
+        per_chunk = np.bincount(
+            chunk_ids * n_bins + bins, weights=weights, minlength=n_chunks * n_bins
+        ).reshape(n_chunks, n_bins)
+        chunk_weight = np.bincount(chunk_ids, weights=weights)
+        chunk_weight_sq = np.bincount(chunk_ids, weights=weights ** 2)
+
+        # Recurrencia del histograma reciente al final de cada bloque
+        histograms = np.empty((n_chunks, n_bins))
+        totals = np.empty(n_chunks)
+        totals_sq = np.empty(n_chunks)
+        current = np.asarray(self.current, dtype=np.float64)
+        weight, weight_sq = self.current_weight, self.current_weight_sq
+        factors = self.decay ** sizes
+        for c in range(n_chunks):
+            current = current * factors[c] + per_chunk[c]
+            weight = weight * factors[c] + chunk_weight[c]
+            weight_sq = weight_sq * factors[c] ** 2 + chunk_weight_sq[c]
+            histograms[c], totals[c], totals_sq[c] = current, weight, weight_sq
+        self.current = current.tolist()
+        self.current_weight = float(weight)
+        self.current_weight_sq = float(weight_sq)
+
+        psi = self._psi(histograms / totals[:, None])
+        alarm = psi > self.psi_threshold
+        ks_statistic = np.zeros(n_chunks)
+        ks_p_value = np.ones(n_chunks)
+        if alarm.any():
+            # El p-valor KS solo se calcula donde el PSI ya supera su umbral
+            ks_statistic[alarm], ks_p_value[alarm] = self._ks(histograms[alarm], totals[alarm], totals_sq[alarm])
+        alarm &= ks_p_value < self.ks_alpha
+
+        def chunk_bounds(c: int):
+            first = c * self.check_every
+            return _timestamp(timestamps[first]), _timestamp(timestamps[first + sizes[c] - 1])
+
+        # Un evento empieza en cada bloque donde se activa la alarma
+        previous = np.concatenate(([self.exceeded_since is not None], alarm[:-1]))
+        starts = np.flatnonzero(alarm & ~previous)
+        if len(starts):
+            c = int(starts[-1])
+            started_at, detected_at = chunk_bounds(c)
+            self.last_drift = {
+                'started_at': started_at,
+                'detected_at': detected_at,
+                'psi': float(psi[c]),
+                'ks_statistic': float(ks_statistic[c]),
+                'ks_p_value': float(ks_p_value[c])
+            }
+        if not alarm[-1]:
+            self.exceeded_since = None
+        elif len(starts):
+            self.exceeded_since = self.last_drift['started_at']
+
+        self.last_check = {'psi': float(psi[-1])}
+        if psi[-1] > self.psi_threshold:
+            self.last_check.update({'ks_statistic': float(ks_statistic[-1]), 'ks_p_value': float(ks_p_value[-1])})
+        return len(starts) > 0
+
+    def _psi(self, proportions: np.ndarray) -> np.ndarray:
+        eps = 1e-4
+        expected = np.maximum(np.asarray(self.reference) / self.reference_n, eps)
+        actual = np.maximum(proportions, eps)
+        return np.sum((actual - expected) * np.log(actual / expected), axis=-1)
+
+    def _ks(self, histograms: np.ndarray, totals: np.ndarray, totals_sq: np.ndarray):
+        from scipy import stats
+
+        reference_cdf = np.cumsum(self.reference) / self.reference_n
+        current_cdf = np.cumsum(histograms, axis=-1) / totals[..., None]
+        statistic = np.max(np.abs(current_cdf - reference_cdf), axis=-1)
+        # Tamaño efectivo de la ventana con decaimiento y del contraste de dos muestras
+        n_current = totals ** 2 / totals_sq
+        n_effective = np.maximum(1, np.round(self.reference_n * n_current / (self.reference_n + n_current)))
+        return statistic, stats.kstwo.sf(statistic, n_effective.astype(np.int64))
+
+    def psi(self) -> float:
+        """Population Stability Index entre referencia y ventana reciente"""
+        if self.reference_n == 0 or self.current_weight == 0:
+            return 0.0
+        return float(self._psi(np.asarray(self.current) / self.current_weight))
+
+    def ks(self) -> Dict[str, float]:
+        """Estadístico KS sobre las CDF binned y su p-valor con el tamaño efectivo de la ventana"""
+        if self.reference_n == 0 or self.current_weight == 0:
+            return {'statistic': 0.0, 'p_value': 1.0}
+        statistic, p_value = self._ks(
+            np.asarray(self.current)[None, :], np.array([self.current_weight]), np.array([self.current_weight_sq])
+        )
+        return {'statistic': float(statistic[0]), 'p_value': float(p_value[0])}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+class DriftMonitor:
+    """Conjunto de detectores por modelo: error y fallos (feedback) y distribuciones (predicciones)"""
+
+    def __init__(self, state: Optional[Dict] = None):
+        state = state or {}
+        detectors = state.get('detectors', {})
+        # Error absoluto en puntos y tasa de fallos pass/fail (0/1); umbrales con falsa alarma ~exp(-2·delta·threshold/varianza)
+        self.error = PageHinkley(delta=1.0, threshold=250.0, state=detectors.get('error'))
+        self.misclassification = PageHinkley(delta=0.02, threshold=50.0, state=detectors.get('misclassification'))
+        self.score_distribution = BinnedDistributionMonitor(
+            np.linspace(0, 100, 21), state=detectors.get('score_distribution')
+        )
+        self.confidence_distribution = BinnedDistributionMonitor(
+            np.linspace(0, 1, 21), state=detectors.get('confidence_distribution')
+        )
+        self.predictions_watermark = state.get('predictions_watermark')
+        self.feedback_watermark = state.get('feedback_watermark')
+
+    @property
+    def detectors(self) -> Dict[str, Any]:
+        return {
+            'error': self.error,
+            'misclassification': self.misclassification,
+            'score_distribution': self.score_distribution,
+            'confidence_distribution': self.confidence_distribution
+        }
+
+    def update_predictions(self, timestamps: List, ai_scores: np.ndarray, confidences: np.ndarray):
+        """Predicciones nuevas en orden de created_at"""
+        if len(timestamps) == 0:
+            return
+        self.score_distribution.update(ai_scores, timestamps)
+        self.confidence_distribution.update(confidences, timestamps)
+        self.predictions_watermark = _timestamp(timestamps[-1])
+
+    def update_feedback(self, timestamps: List, ai_scores: np.ndarray, expert_scores: np.ndarray,
+                        watermark=None):
+        """Feedback experto nuevo en orden de llegada (timestamps = created_at de la predicción)"""
+        if len(timestamps) == 0:
+            return
+        ai_scores = np.asarray(ai_scores, dtype=np.float64)
+        expert_scores = np.asarray(expert_scores, dtype=np.float64)
+        errors = np.abs(ai_scores - expert_scores)
+        misclassified = ((ai_scores >= PASS_THRESHOLD) != (expert_scores >= PASS_THRESHOLD)).astype(np.float64)
+        self.error.update_many(errors, timestamps)
+        self.misclassification.update_many(misclassified, timestamps)
+        self.feedback_watermark = _timestamp(watermark if watermark is not None else timestamps[-1])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'detectors': {name: detector.to_dict() for name, detector in self.detectors.items()},
+            'predictions_watermark': self.predictions_watermark,
+            'feedback_watermark': self.feedback_watermark
+        }
+
+    def report(self, since: Optional[str] = None) -> Dict[str, Any]:
+        """Resumen de drift con el formato de drift_analysis (eventos detectados desde `since`)"""
+        significant_changes = []
+        for name, detector in self.detectors.items():
+            event = detector.last_drift
+            if not event or (since is not None and (event['detected_at'] or '') < since):
+                continue
+            if isinstance(detector, PageHinkley):
+                if name == 'misclassification':
+                    metric, before, after = 'accuracy', 1 - event['mean_before'], 1 - event['mean_after']
+                    magnitude = abs(after - before)
+                else:
+                    metric, before, after = 'mean_absolute_error', event['mean_before'], event['mean_after']
+                    magnitude = abs(after - before) / 100  # Escala de score 0-100 a 0-1
+                significant_changes.append({
+                    'metric': metric,
+                    'detector': 'page_hinkley',
+                    'early_value': before,
+                    'recent_value': after,
+                    'change': after - before,
+                    'change_percentage': ((after - before) / before * 100) if before != 0 else 0,
+                    'magnitude': magnitude,
+                    'started_at': event['started_at'],
+                    'detected_at': event['detected_at']
+                })
+            else:
+                significant_changes.append({
+                    'metric': name,
+                    'detector': 'binned_psi_ks',
+                    'psi': event['psi'],
+                    'ks_statistic': event['ks_statistic'],
+                    'ks_p_value': event['ks_p_value'],
+                    'magnitude': event['psi'],
+                    'started_at': event['started_at'],
+                    'detected_at': event['detected_at']
+                })
+
+        started = [c['started_at'] for c in significant_changes if c['started_at']]
+        return {
+            'drift_detected': bool(significant_changes),
+            'method': 'streaming',
+            'drift_started_at': min(started) if started else None,
+            'significant_changes': significant_changes,
+            'drift_magnitude': max((c['magnitude'] for c in significant_changes), default=0),
+            'detectors': {
+                'error': {'statistic': self.error.statistic(), 'observations': self.error.n},
+                'misclassification': {
+                    'statistic': self.misclassification.statistic(), 'observations': self.misclassification.n
+                },
+                'score_distribution': self.score_distribution.last_check,
+                'confidence_distribution': self.confidence_distribution.last_check
+            },
+            'watermarks': {
+                'predictions': self.predictions_watermark,
+                'feedback': self.feedback_watermark
+            }
+        }
@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+"""
+Daemon de evaluación continua de modelos en producción
+Mantiene conexiones en un pool, lee por lotes las predicciones y el feedback nuevos desde
+las marcas de agua de cada modelo (LISTEN evaluation_new_rows o sondeo periódico), actualiza
+acumuladores diarios en memoria y guarda instantáneas en model_production_metrics junto
+con las marcas de agua, de modo que un reinicio continúa exactamente donde quedó
+"""
+
+import time
+import select
+import signal
+import logging
+import argparse
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any, Optional, Tuple
+
+import psycopg2
+import psycopg2.pool
+
+from evaluation_stats import MetricAccumulator
+from model_evaluation import ModelEvaluator, MODEL_INFO_SQL, UPPER_BOUND_SQL, connection_params
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = 'evaluation_new_rows'  # Triggers de 13-evaluation-daemon.sql
+
+# Predicciones nuevas en (marca, límite] con el feedback que ya cubre la marca de feedback.
+# Un par (predicción, feedback) cuenta cuando ambas marcas lo cubren: lo que se añade al avanzar
+# son las predicciones nuevas con feedback <= marca de feedback y el feedback nuevo de
+# predicciones ya agregadas (DAEMON_FEEDBACK_SQL), sin dobles conteos aunque avancen por separado
+DAEMON_PREDICTIONS_SQL = """
+    SELECT av.id, av.created_at, av.created_at::date AS day,
+           COALESCE((av.ai_result->>'score')::float8, 0) AS ai_score,
+           sf.expert_score::float8 AS expert_score,
+           av.confidence_score::float8 AS confidence,
+           sf.detailed_feedback
+    FROM ai_verifications av
+    LEFT JOIN specialized_feedback sf ON av.id = sf.verification_id AND sf.created_at <= %s
+    WHERE av.verification_type = %s
+    AND av.created_at > %s AND av.created_at <= %s
+    ORDER BY av.created_at
+    LIMIT %s
+"""
+
+DAEMON_FEEDBACK_SQL = """
+    SELECT av.id, av.created_at, av.created_at::date AS day, sf.created_at AS feedback_at,
+           COALESCE((av.ai_result->>'score')::float8, 0) AS ai_score,
+           sf.expert_score::float8 AS expert_score,
+           av.confidence_score::float8 AS confidence,
+           sf.detailed_feedback
+    FROM specialized_feedback sf
+    JOIN ai_verifications av ON av.id = sf.verification_id
+    WHERE av.verification_type = %s
+    AND sf.created_at > %s AND sf.created_at <= %s
+    AND av.created_at <= %s
+    AND sf.expert_score IS NOT NULL
+    ORDER BY sf.created_at
+    LIMIT %s
+"""
+
+WATERMARKS_SQL = """
+    SELECT predictions_watermark, feedback_watermark
+    FROM model_evaluation_watermarks
+    WHERE model_id = %s
+"""
+
+WINDOW_STATS_SQL = """
+    SELECT evaluation_date, sufficient_stats
+    FROM model_production_metrics
+    WHERE model_id = %s
+    AND evaluation_date >= CURRENT_DATE - %s
+    AND sufficient_stats IS NOT NULL
+"""
+
+
+def complete_batch(rows: List[Dict], key: str, limit: int, upper_bound) -> Tuple[List[Dict], Any, bool]:
+    """Filas de un lote ordenado por `key` que se pueden consumir, la nueva marca de agua y si quedan más
+
+    Con el lote lleno, las filas del último instante pueden continuar tras el LIMIT: se dejan para
+    el siguiente lote y la marca queda en el instante anterior. Sin lote lleno se llega al límite
+    """
+    if len(rows) < limit:
+        return rows, upper_bound, False
+    boundary = rows[-1][key]
+    complete = [row for row in rows if row[key] < boundary]
+    return complete, (complete[-1][key] if complete else None), True
+
+
+class ModelStream:
+    """Estado en memoria de un modelo: ventana de acumuladores diarios y deltas sin persistir"""
+
+    def __init__(self, model_info: Dict[str, Any], predictions_watermark, feedback_watermark,
+                 persisted: Optional[Tuple], days: Dict[Any, MetricAccumulator]):
+        self.model_info = model_info
+        self.model_id = str(model_info['id'])
+        self.verification_type = model_info['verification_category']
+        self.predictions_watermark = predictions_watermark
+        self.feedback_watermark = feedback_watermark
+        self.persisted = persisted  # Marcas guardadas en model_evaluation_watermarks (None = ninguna)
+        self.days = days  # Ventana completa en memoria, incluye lo pendiente
+        self.pending = {}  # Día -> acumulador aún no guardado
+        self.pending_rows = 0
+        self.drift_analysis = {'drift_detected': False, 'method': 'streaming'}
+        self.behind = False  # El último ciclo terminó con lotes llenos
+        self.dirty = True  # Hay (o puede haber) filas nuevas
+
+    def apply(self, evaluator: ModelEvaluator, rows: List[Dict], count_predictions: bool):
+        """Agregar filas nuevas a la ventana y a los deltas pendientes"""
+        if not rows:
+            return
+        delta = {}
+        evaluator._accumulate_by_day(delta, rows, count_predictions)
+        for day, accumulator in delta.items():
+            self.pending.setdefault(day, MetricAccumulator()).merge(accumulator)
+            self.days.setdefault(day, MetricAccumulator()).merge(accumulator)
+        self.pending_rows += len(rows)
+
+    def prune(self, oldest_day):
+        """Descartar de la ventana en memoria los días ya fuera de ella (siguen en la base de datos)"""
+        for day in [day for day in self.days if day < oldest_day]:
+            del self.days[day]
+
+    def watermarks(self) -> Tuple:
+        return (self.predictions_watermark, self.feedback_watermark)
+
+
+class EvaluationDaemon:
+    """Evaluación incremental continua de los modelos desplegados"""
+
+    def __init__(self, evaluator: Optional[ModelEvaluator] = None, model_ids: Optional[List[str]] = None,
+                 days_back: int = 30, poll_interval: float = 5.0, snapshot_interval: float = 60.0,
+                 batch_size: int = 5000, max_batches_per_cycle: int = 10, max_pending_rows: int = 200_000,
+                 commit_lag: float = 5.0, backfill_days: int = 90, listen: bool = True, pool_size: int = 2):
+        self.evaluator = evaluator or ModelEvaluator(connect=False)
+        self.model_ids = [str(model_id) for model_id in model_ids] if model_ids else None
+        self.days_back = days_back
+        self.poll_interval = poll_interval
+        self.snapshot_interval = snapshot_interval
+        self.batch_size = batch_size
+        self.max_batches_per_cycle = max_batches_per_cycle  # Reparto justo entre modelos atrasados
+        self.max_pending_rows = max_pending_rows  # Memoria acotada: se fuerza una instantánea al superarlo
+        self.commit_lag = commit_lag
+        self.backfill_days = backfill_days
+        self.listen = listen
+        self.pool_size = pool_size
+
+        self.pool = None
+        self._listen_connection = None
+        self.streams: Dict[str, ModelStream] = {}
+        self._last_snapshot = time.monotonic()
+        self._stopping = False
+        self.stats = {
+            'cycles': 0, 'predictions': 0, 'feedback': 0, 'snapshots': 0,
+            'forced_snapshots': 0, 'conflicts': 0, 'reconnects': 0, 'notifications': 0
+        }
+
+    # Conexiones
+
+    def _open_pool(self):
+        if self.pool is None:
+            self.pool = psycopg2.pool.SimpleConnectionPool(1, self.pool_size, **connection_params())
+
+    @contextmanager
+    def _connection(self):
+        """Conexión del pool; si falla se descarta para que la siguiente sea nueva"""
+        self._open_pool()
+        connection = self.pool.getconn()
+        try:
+            yield connection
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            self.pool.putconn(connection, close=True)
+            raise
+        except Exception:
+            connection.rollback()
+            self.pool.putconn(connection)
+            raise
+        else:
+            self.pool.putconn(connection)
+
+    def _open_listener(self):
+        if not self.listen or self._listen_connection is not None:
+            return
+        connection = psycopg2.connect(**connection_params())
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+        self._listen_connection = connection
+
+    def close(self):
+        if self._listen_connection is not None:
+            self._listen_connection.close()
+            self._listen_connection = None
+        if self.pool is not None:
+            self.pool.closeall()
+            self.pool = None
+
+    # Estado de los modelos
+
+    def load_models(self):
+        """Cargar los modelos a seguir con sus marcas de agua y la ventana persistida"""
+
+        with self._connection() as connection:
+            with connection.cursor() as cursor:
+                if self.model_ids:
+                    cursor.execute(MODEL_INFO_SQL + " WHERE sam.id = ANY(%s::uuid[])", (self.model_ids,))
+                else:
+                    cursor.execute(MODEL_INFO_SQL + " WHERE sam.deployment_status = 'deployed'")
+                models = [dict(row) for row in cursor.fetchall()]
+
+                current = {str(model['id']) for model in models}
+                for model_id in [model_id for model_id in self.streams if model_id not in current]:
+                    if self.streams[model_id].pending:
+                        continue  # Se retira tras guardar lo pendiente
+                    logger.info(f"Modelo {model_id} ya no está desplegado: se deja de seguir")
+                    del self.streams[model_id]
+
+                for model_info in models:
+                    if str(model_info['id']) not in self.streams:
+                        stream = self._load_stream(cursor, model_info)
+                        self.streams[stream.model_id] = stream
+            connection.commit()
+
+        logger.info(f"Daemon de evaluación siguiendo {len(self.streams)} modelos")
+
+    def _load_stream(self, cursor, model_info: Dict[str, Any]) -> ModelStream:
+        model_id = str(model_info['id'])
+        cursor.execute(WATERMARKS_SQL, (model_id,))
+        row = cursor.fetchone()
+        if row:
+            predictions_from, feedback_from = row['predictions_watermark'], row['feedback_watermark']
+            persisted = (predictions_from, feedback_from)
+        else:
+            # Igual que update_daily_statistics: backfill; el feedback existente entra con sus predicciones
+            cursor.execute(UPPER_BOUND_SQL, (self.commit_lag,))
+            upper_bound = cursor.fetchone()['upper_bound']
+            predictions_from, feedback_from = upper_bound - timedelta(days=self.backfill_days), upper_bound
+            persisted = None
+
+        cursor.execute(WINDOW_STATS_SQL, (model_id, self.days_back))
+        days = {r['evaluation_date']: MetricAccumulator.from_dict(r['sufficient_stats']) for r in cursor.fetchall()}
+        return ModelStream(model_info, predictions_from, feedback_from, persisted, days)
+
+    # Lectura incremental
+
+    def _fetch_batch(self, cursor, sql: str, params: Tuple, key: str, upper_bound) -> Tuple[List[Dict], Any, bool]:
+        """Lote acotado; si todo el lote comparte instante se amplía hasta poder cortarlo"""
+        limit = self.batch_size
+        while True:
+            cursor.execute(sql, params + (limit,))
+            rows, watermark, more = complete_batch(cursor.fetchall(), key, limit, upper_bound)
+            if watermark is not None:
+                return rows, watermark, more
+            limit *= 2
+
+    def poll_stream(self, cursor, stream: ModelStream, upper_bound) -> Tuple[int, bool]:
+        """Un lote de feedback tardío y uno de predicciones; devuelve filas leídas y si quedan más"""
+
+        rows_read = 0
+        more_feedback = more_predictions = False
+
+        # Primero el feedback (predicciones <= marca de predicciones), luego las predicciones nuevas
+        # con el feedback que cubre la marca de feedback ya avanzada
+        if stream.feedback_watermark < upper_bound:
+            rows, watermark, more_feedback = self._fetch_batch(cursor, DAEMON_FEEDBACK_SQL, (
+                stream.verification_type, stream.feedback_watermark, upper_bound, stream.predictions_watermark
+            ), 'feedback_at', upper_bound)
+            stream.apply(self.evaluator, rows, count_predictions=False)
+            stream.feedback_watermark = watermark
+            self.stats['feedback'] += len(rows)
+            rows_read += len(rows)
+
+        if stream.predictions_watermark < upper_bound:
+            rows, watermark, more_predictions = self._fetch_batch(cursor, DAEMON_PREDICTIONS_SQL, (
+                stream.feedback_watermark, stream.verification_type, stream.predictions_watermark, upper_bound
+            ), 'created_at', upper_bound)
+            stream.apply(self.evaluator, rows, count_predictions=True)
+            stream.predictions_watermark = watermark
+            self.stats['predictions'] += len(rows)
+            rows_read += len(rows)
+
+        return rows_read, more_feedback or more_predictions
+
+    def poll_once(self) -> int:
+        """Un ciclo: hasta max_batches_per_cycle lotes por modelo con filas nuevas"""
+
+        rows_read = 0
+        with self._connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(UPPER_BOUND_SQL, (self.commit_lag,))
+                upper_bound = cursor.fetchone()['upper_bound']
+                connection.commit()
+
+                for stream in list(self.streams.values()):
+                    if not (stream.dirty or stream.behind):
+                        continue
+                    more = False
+                    for _ in range(self.max_batches_per_cycle):
+                        if self.pending_rows() >= self.max_pending_rows:
+                            self.stats['forced_snapshots'] += 1
+                            self.snapshot()
+                        read, more = self.poll_stream(cursor, stream, upper_bound)
+                        connection.commit()  # Sin transacciones de lectura largas
+                        rows_read += read
+                        if not more:
+                            break
+                    stream.behind = more
+                    stream.dirty = False
+
+        self.stats['cycles'] += 1
+        return rows_read
+
+    def pending_rows(self) -> int:
+        return sum(stream.pending_rows for stream in self.streams.values())
+
+    def wait_for_rows(self, timeout: float):
+        """Esperar una notificación o el intervalo de sondeo; sin notificaciones se revisan todos"""
+
+        if self._listen_connection is None:
+            time.sleep(timeout)
+            for stream in self.streams.values():
+                stream.dirty = True
+            return
+
+        connection = self._listen_connection
+        if select.select([connection], [], [], timeout) == ([], [], []):
+            for stream in self.streams.values():
+                stream.dirty = True
+            return
+
+        connection.poll()
+        for notify in connection.notifies:
+            self.stats['notifications'] += 1
+            kind, _, verification_type = notify.payload.partition(':')
+            for stream in self.streams.values():
+                if kind == 'feedback' or stream.verification_type == verification_type:
+                    stream.dirty = True
+        connection.notifies.clear()
+
+    # Instantáneas
+
+    def snapshot(self):
+        """Guardar deltas, marcas de agua y detectores de drift de cada modelo en una transacción"""
+
+        written, conflicts = [], []
+        with self._connection() as connection:
+            with connection.cursor() as cursor:
+                for stream in list(self.streams.values()):
+                    if not stream.pending and stream.watermarks() == stream.persisted:
+                        continue
+
+                    cursor.execute(WATERMARKS_SQL + " FOR UPDATE", (stream.model_id,))
+                    row = cursor.fetchone()
+                    current = (row['predictions_watermark'], row['feedback_watermark']) if row else None
+                    if current != stream.persisted:
+                        # Otro proceso (p. ej. --incremental por cron) avanzó las marcas: recargar
+                        conflicts.append(stream.model_id)
+                        continue
+
+                    self.evaluator._merge_daily_metrics(cursor, stream.model_id, stream.pending)
+                    self.evaluator._upsert_watermarks(cursor, stream.model_id, *stream.watermarks())
+                    stream.drift_analysis = self.evaluator.update_drift_monitor(
+                        cursor, stream.model_id, stream.verification_type, self.days_back
+                    )
+                    written.append(stream)
+                self.evaluator.update_experiments(cursor)
+            connection.commit()
+
+        for stream in written:
+            stream.persisted = stream.watermarks()
+            stream.pending = {}
+            stream.pending_rows = 0
+            stream.prune(stream.predictions_watermark.date() - timedelta(days=self.days_back))
+
+        if conflicts:
+            self.stats['conflicts'] += len(conflicts)
+            logger.warning(f"Marcas de agua cambiadas por otro proceso en {len(conflicts)} modelos: se recargan")
+            for model_id in conflicts:
+                del self.streams[model_id]
+            self.load_models()
+
+        self.stats['snapshots'] += 1
+        self._last_snapshot = time.monotonic()
+        if written:
+            now = datetime.now(timezone.utc)
+            lag = max((now - min(stream.watermarks())).total_seconds() for stream in written)
+            logger.info(f"Instantánea de {len(written)} modelos guardada (retraso máximo {lag:.0f}s)")
+
+    def evaluation(self, model_id: str) -> Dict[str, Any]:
+        """Evaluación actual de un modelo desde la ventana en memoria, sin consultar la base de datos"""
+
+        stream = self.streams[str(model_id)]
+        oldest_day = stream.predictions_watermark.date() - timedelta(days=self.days_back)
+        days = sorted((day, accumulator) for day, accumulator in stream.days.items() if day >= oldest_day)
+        return self.evaluator.evaluate_daily_statistics(
+            dict(stream.model_info), days, self.days_back, stream.drift_analysis
+        )
+
+    # Bucle principal
+
+    def stop(self, *_):
+        logger.info("Parada solicitada: se guarda lo pendiente antes de salir")
+        self._stopping = True
+
+    def run(self, once: bool = False) -> Dict[str, Any]:
+        """Bucle del daemon; con once se pone al día, guarda una instantánea y termina"""
+
+        if not once:
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        failures = 0
+        try:
+            self.load_models()
+            while not self._stopping:
+                try:
+                    self._open_listener()
+                    self.poll_once()
+                    behind = any(stream.behind for stream in self.streams.values())
+                    if once and not behind:
+                        break
+                    if time.monotonic() - self._last_snapshot >= self.snapshot_interval:
+                        self.snapshot()
+                        self.load_models()
+                    if not behind:
+                        self.wait_for_rows(self.poll_interval)
+                    failures = 0
+                except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                    # Lo pendiente sigue en memoria: se guarda cuando vuelva la conexión
+                    failures += 1
+                    self.stats['reconnects'] += 1
+                    if self._listen_connection is not None:
+                        self._listen_connection.close()
+                        self._listen_connection = None
+                    backoff = min(2 ** failures, 60)
+                    logger.error(f"Conexión perdida ({e}); reintento en {backoff}s")
+                    time.sleep(backoff)
+
+            self.snapshot()
+        finally:
+            self.close()
+
+        return self.summary()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'stats': dict(self.stats),
+            'models': {
+                model_id: {
+                    'verification_type': stream.verification_type,
+                    'predictions_watermark': stream.predictions_watermark,
+                    'feedback_watermark': stream.feedback_watermark,
+                    'days_in_memory': len(stream.days)
+                }
+                for model_id, stream in self.streams.items()
+            }
+        }
+
+
+def main():
+    """Daemon de evaluación (requiere PostgreSQL con DB_* configurado y las migraciones 10, 11, 13, 14 y 15)"""
+
+    parser = argparse.ArgumentParser(description='Evaluación continua de modelos desplegados')
+    parser.add_argument('--model-id', action='append', help='Modelo a seguir (repetible; por defecto, los desplegados)')
+    parser.add_argument('--days-back', type=int, default=30, help='Ventana de evaluación en días')
+    parser.add_argument('--poll-interval', type=float, default=5.0, help='Segundos máximos entre sondeos')
+    parser.add_argument('--snapshot-interval', type=float, default=60.0, help='Segundos entre instantáneas')
+    parser.add_argument('--batch-size', type=int, default=5000, help='Filas por lote de lectura')
+    parser.add_argument('--max-batches-per-cycle', type=int, default=10, help='Lotes por modelo y ciclo')
+    parser.add_argument('--max-pending-rows', type=int, default=200_000,
+                        help='Filas sin guardar que fuerzan una instantánea')
+    parser.add_argument('--commit-lag', type=float, default=5.0,
+                        help='Segundos de margen para transacciones en curso')
+    parser.add_argument('--backfill-days', type=int, default=90, help='Backfill de modelos sin marcas de agua')
+    parser.add_argument('--no-listen', action='store_true', help='Solo sondeo periódico, sin LISTEN')
+    parser.add_argument('--once', action='store_true', help='Ponerse al día, guardar una instantánea y salir')
+    args = parser.parse_args()
+
+    daemon = EvaluationDaemon(
+        model_ids=args.model_id, days_back=args.days_back, poll_interval=args.poll_interval,
+        snapshot_interval=args.snapshot_interval, batch_size=args.batch_size,
+        max_batches_per_cycle=args.max_batches_per_cycle, max_pending_rows=args.max_pending_rows,
+        commit_lag=args.commit_lag, backfill_days=args.backfill_days, listen=not args.no_listen
+    )
+    summary = daemon.run(once=args.once)
+
+    stats = summary['stats']
+    print("\n=== DAEMON DE EVALUACIÓN ===")
+    print(f"Ciclos: {stats['cycles']}, predicciones: {stats['predictions']}, feedback: {stats['feedback']}")
+    print(f"Instantáneas: {stats['snapshots']} ({stats['forced_snapshots']} forzadas), "
+          f"conflictos: {stats['conflicts']}, reconexiones: {stats['reconnects']}")
+    for model_id, model in summary['models'].items():
+        print(f"{model_id} ({model['verification_type']}): predicciones hasta {model['predictions_watermark']}, "
+              f"feedback hasta {model['feedback_watermark']}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,631 @@
+#!/usr/bin/env python3
+"""
+Estadísticas suficientes para métricas de evaluación de modelos
+Permiten calcular accuracy, P/R/F1, correlación y análisis de confianza y
+errores a partir de conteos, sumas y co-momentos, sin conservar las filas
+"""
+
+import math
+import time
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+import numpy as np
+
+from quantile_sketch import KLLSketch, OutlierReservoir, json_value
+
+logger = logging.getLogger(__name__)
+
+PASS_THRESHOLD = 80  # Score >= 80 se considera aprobado
+LARGE_ERROR_THRESHOLD = 20  # Errores > 20 puntos
+CONFIDENCE_BINS = 20  # Histograma de confianza en [0, 1]
+OUTLIER_CANDIDATE_THRESHOLD = 15  # Solo filas con error > 15 puntos entran al reservorio; mínimo del umbral de outliers
+BOOTSTRAP_RESAMPLES = 2000  # Remuestreos para los intervalos de confianza
+BOOTSTRAP_MIN_RESAMPLES = 500  # Mínimo aunque se agote el presupuesto de tiempo
+BOOTSTRAP_TIME_BUDGET = 2.0  # Segundos por evaluación en el camino secuencial
+BOOTSTRAP_CHUNK_ELEMENTS = 2_500_000  # Pesos por bloque (remuestreos x celdas), ~20 MB
+
+# Dimensiones de segmentación: las tres primeras vienen de content_data/metadata
+SLICE_DIMENSIONS = ['restaurant_type', 'area', 'shift', 'empleado_id']
+
+# Sumas por segmento de las que se derivan todas las métricas de un segmento
+SLICE_FIELDS = [
+    'n', 'tp', 'fp', 'fn', 'tn',
+    'sum_ai', 'sum_expert', 'sum_ai2', 'sum_expert2', 'sum_ai_expert',
+    'sum_conf', 'sum_err',
+    'high_count', 'high_correct', 'medium_count', 'medium_correct', 'low_count', 'low_correct'
+]
+
+# Campos que se combinan sumando
+ADDITIVE_FIELDS = [
+    'total_predictions', 'n',
+    'tp', 'fp', 'fn', 'tn',
+    'sum_ai', 'sum_expert', 'sum_ai2', 'sum_expert2', 'sum_ai_expert',
+    'sum_conf',
+    'high_count', 'high_correct', 'medium_count', 'medium_correct', 'low_count', 'low_correct',
+    'sum_err', 'sum_err2',
+    'large_count', 'large_high_conf_count', 'large_high_conf_sum_err', 'large_high_conf_sum_conf',
+    'over_count', 'over_sum', 'under_count', 'under_sum'
+]
+
+
+def correlation_from_moments(n: int, sx: float, sy: float, sxx: float, syy: float, sxy: float) -> float:
+    """Correlación de Pearson a partir de sumas y co-momentos (NaN si una varianza es 0, como np.corrcoef)"""
+    if n <= 1:
+        return 0
+    cov = sxy - sx * sy / n
+    var_x = sxx - sx * sx / n
+    var_y = syy - sy * sy / n
+    if var_x <= 0 or var_y <= 0:
+        return float('nan')
+    return max(-1.0, min(1.0, cov / math.sqrt(var_x * var_y)))
+
+
+def outlier_threshold(q25: float, q75: float) -> float:
+    """Umbral de outliers (Q3 + 1.5·IQR) acotado por debajo al de los candidatos del reservorio
+
+    Con errores pequeños el IQR daría un umbral < OUTLIER_CANDIDATE_THRESHOLD y se contarían outliers
+    que el reservorio no guarda; así el conteo y los ejemplos se refieren a las mismas filas
+    """
+    return max(q75 + 1.5 * (q75 - q25), float(OUTLIER_CANDIDATE_THRESHOLD))
+
+
+def confusion_from_counts(tp: int, fp: int, fn: int, tn: int) -> List[List[int]]:
+    """Matriz de confusión con las etiquetas presentes, como sklearn.metrics.confusion_matrix"""
+    has_negative = tn + fp + fn > 0
+    has_positive = tp + fp + fn > 0
+    if has_negative and has_positive:
+        return [[tn, fp], [fn, tp]]
+    if has_positive:
+        return [[tp]]
+    return [[tn]]
+
+
+class MetricAccumulator:
+    """Acumulador combinable de estadísticas suficientes de una ventana de verificaciones"""
+
+    def __init__(self, values: Optional[Dict[str, Any]] = None):
+        values = values or {}
+        self.values = {field: values.get(field) or 0 for field in ADDITIVE_FIELDS}
+        self.values['max_err'] = values.get('max_err')
+        self.conf_hist = np.zeros(CONFIDENCE_BINS, dtype=np.int64)
+        if values.get('conf_hist') is not None:
+            self.conf_hist += np.asarray(values['conf_hist'], dtype=np.int64)
+        self.err_sketch = KLLSketch(state=values.get('err_sketch'))
+        self.outliers = OutlierReservoir(state=values.get('outliers'))
+
+    @classmethod
+    def from_dict(cls, values: Dict[str, Any]) -> 'MetricAccumulator':
+        return cls(values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        values = dict(self.values)
+        values['conf_hist'] = self.conf_hist.tolist()
+        values['err_sketch'] = self.err_sketch.to_dict()
+        values['outliers'] = self.outliers.to_dict()
+        return values
+
+    def add_predictions(self, count: int) -> 'MetricAccumulator':
+        """Contar predicciones (con o sin feedback experto)"""
+        self.values['total_predictions'] += int(count)
+        return self
+
+    def update(self, ai_scores: np.ndarray, expert_scores: np.ndarray, confidences: np.ndarray,
+               ids: Optional[Sequence] = None, created_at: Optional[Sequence] = None,
+               feedback: Optional[Sequence] = None) -> 'MetricAccumulator':
+        """Añadir filas con feedback experto (arrays alineados); con ids se muestrean ejemplos de outliers"""
+        ai = np.asarray(ai_scores, dtype=np.float64)
+        expert = np.asarray(expert_scores, dtype=np.float64)
+        conf = np.asarray(confidences, dtype=np.float64)
+        if len(ai) == 0:
+            return self
+
+        ai_pass = ai >= PASS_THRESHOLD
+        expert_pass = expert >= PASS_THRESHOLD
+        correct = ai_pass == expert_pass
+        error = np.abs(ai - expert)
+        large = error > LARGE_ERROR_THRESHOLD
+        large_high_conf = large & (conf > 0.8)
+        over = large & (ai > expert)
+        under = large & (ai < expert)
+
+        high = conf >= 0.9
+        medium = (conf >= 0.7) & (conf < 0.9)
+        low = conf < 0.7
+
+        v = self.values
+        v['n'] += len(ai)
+        v['tp'] += int(np.sum(ai_pass & expert_pass))
+        v['fp'] += int(np.sum(ai_pass & ~expert_pass))
+        v['fn'] += int(np.sum(~ai_pass & expert_pass))
+        v['tn'] += int(np.sum(~ai_pass & ~expert_pass))
+        v['sum_ai'] += float(ai.sum())
+        v['sum_expert'] += float(expert.sum())
+        v['sum_ai2'] += float(np.dot(ai, ai))
+        v['sum_expert2'] += float(np.dot(expert, expert))
+        v['sum_ai_expert'] += float(np.dot(ai, expert))
+        v['sum_conf'] += float(conf.sum())
+        for band, mask in (('high', high), ('medium', medium), ('low', low)):
+            v[f'{band}_count'] += int(mask.sum())
+            v[f'{band}_correct'] += int((mask & correct).sum())
+        v['sum_err'] += float(error.sum())
+        v['sum_err2'] += float(np.dot(error, error))
+        batch_max = float(error.max())
+        v['max_err'] = batch_max if v['max_err'] is None else max(v['max_err'], batch_max)
+        v['large_count'] += int(large.sum())
+        v['large_high_conf_count'] += int(large_high_conf.sum())
+        v['large_high_conf_sum_err'] += float(error[large_high_conf].sum())
+        v['large_high_conf_sum_conf'] += float(conf[large_high_conf].sum())
+        v['over_count'] += int(over.sum())
+        v['over_sum'] += float((ai - expert)[over].sum())
+        v['under_count'] += int(under.sum())
+        v['under_sum'] += float((expert - ai)[under].sum())
+        conf_bins = np.clip((conf * CONFIDENCE_BINS).astype(np.int64), 0, CONFIDENCE_BINS - 1)
+        self.conf_hist += np.bincount(conf_bins, minlength=CONFIDENCE_BINS)
+        self.err_sketch.update(error)
+        if ids is not None:
+            candidates = np.flatnonzero(error > OUTLIER_CANDIDATE_THRESHOLD)
+            self.outliers.add(
+                [ids[i] for i in candidates], ai[candidates], expert[candidates], error[candidates],
+                conf[candidates], [created_at[i] for i in candidates],
+                [feedback[i] for i in candidates] if feedback is not None else None
+            )
+        return self
+
+    def merge(self, other: 'MetricAccumulator') -> 'MetricAccumulator':
+        """Combinar con otro acumulador (p. ej. de otro día o partición)"""
+        for field in ADDITIVE_FIELDS:
+            self.values[field] += other.values[field]
+        if other.values['max_err'] is not None:
+            current = self.values['max_err']
+            self.values['max_err'] = other.values['max_err'] if current is None else max(current, other.values['max_err'])
+        self.conf_hist += other.conf_hist
+        self.err_sketch.merge(other.err_sketch)
+        self.outliers.merge(other.outliers)
+        return self
+
+    def correlation(self) -> float:
+        v = self.values
+        return correlation_from_moments(
+            v['n'], v['sum_ai'], v['sum_expert'], v['sum_ai2'], v['sum_expert2'], v['sum_ai_expert']
+        )
+
+    def performance_metrics(self) -> Dict[str, Any]:
+        """Métricas de rendimiento con el mismo formato que ModelEvaluator"""
+        v = self.values
+        n = v['n']
+        if n == 0:
+            return {'error': 'No expert feedback available for metric calculation'}
+
+        tp, fp, fn, tn = v['tp'], v['fp'], v['fn'], v['tn']
+        accuracy = (tp + tn) / n
+        precision = tp / (tp + fp) if tp + fp > 0 else 0.0
+        recall = tp / (tp + fn) if tp + fn > 0 else 0.0
+        f1 = 2 * tp / (2 * tp + fp + fn) if 2 * tp + fp + fn > 0 else 0.0
+
+        def band(name: str) -> Dict[str, Any]:
+            count = v[f'{name}_count']
+            return {
+                'count': count,
+                'accuracy': v[f'{name}_correct'] / count if count > 0 else 0
+            }
+
+        return {
+            'accuracy': round(accuracy, 4),
+            'precision': round(precision, 4),
+            'recall': round(recall, 4),
+            'f1_score': round(f1, 4),
+            'score_correlation': round(self.correlation(), 4),
+            'average_confidence': round(v['sum_conf'] / n, 4),
+            'confidence_analysis': {
+                'high_confidence': band('high'),
+                'medium_confidence': band('medium'),
+                'low_confidence': band('low')
+            },
+            'confusion_matrix': confusion_from_counts(tp, fp, fn, tn),
+            'sample_size': n
+        }
+
+    def error_patterns(self) -> List[Dict]:
+        """Patrones comunes en errores grandes"""
+        v = self.values
+        patterns = []
+        if v['large_count'] == 0:
+            return patterns
+
+        if v['large_high_conf_count'] > 0:
+            patterns.append({
+                'pattern': 'high_confidence_errors',
+                'description': 'Errores grandes con alta confianza del modelo',
+                'count': v['large_high_conf_count'],
+                'avg_error': v['large_high_conf_sum_err'] / v['large_high_conf_count'],
+                'avg_confidence': v['large_high_conf_sum_conf'] / v['large_high_conf_count']
+            })
+
+        if v['over_count'] > v['large_count'] * 0.6:
+            patterns.append({
+                'pattern': 'systematic_overestimation',
+                'description': 'El modelo tiende a sobreestimar la calidad',
+                'count': v['over_count'],
+                'avg_overestimation': v['over_sum'] / v['over_count']
+            })
+
+        if v['under_count'] > v['large_count'] * 0.6:
+            patterns.append({
+                'pattern': 'systematic_underestimation',
+                'description': 'El modelo tiende a subestimar la calidad',
+                'count': v['under_count'],
+                'avg_underestimation': v['under_sum'] / v['under_count']
+            })
+
+        return patterns
+
+    def error_quantiles(self) -> Dict[str, float]:
+        """Cuartiles y p90 del error desde el sketch KLL (ver cota en quantile_sketch)"""
+        qs = (0.25, 0.5, 0.75, 0.9)
+        return {f'q{int(q * 100)}': value for q, value in zip(qs, self.err_sketch.quantiles(qs))}
+
+    def count_errors_above(self, threshold: float) -> int:
+        """Número estimado de errores mayores que el umbral"""
+        return self.err_sketch.count_above(threshold)
+
+    def error_summary(self) -> Dict[str, Any]:
+        """Momentos de la distribución de errores absolutos y errores grandes"""
+        v = self.values
+        n = v['n']
+        mean = v['sum_err'] / n
+        return {
+            'total_errors': n,
+            'mean_absolute_error': mean,
+            'std_error': math.sqrt(max(0.0, v['sum_err2'] / n - mean * mean)),
+            'max_error': v['max_err'],
+            'large_errors': {
+                'count': v['large_count'],
+                'percentage': v['large_count'] / n * 100,
+                'common_patterns': self.error_patterns()
+            }
+        }
+
+    def error_analysis(self, examples: int = 3) -> Dict[str, Any]:
+        """Análisis de errores completo: momentos exactos, cuantiles del sketch y ejemplos del reservorio"""
+        quantiles = self.error_quantiles()
+        threshold = outlier_threshold(quantiles['q25'], quantiles['q75'])
+        summary = self.error_summary()
+        return {
+            'total_errors': summary['total_errors'],
+            'mean_absolute_error': summary['mean_absolute_error'],
+            'median_absolute_error': quantiles['q50'],
+            'std_error': summary['std_error'],
+            'max_error': summary['max_error'],
+            'outliers': {
+                'count': self.count_errors_above(threshold),
+                'threshold': threshold,
+                'examples': self.outliers.examples(threshold, examples)
+            },
+            'large_errors': summary['large_errors'],
+            'error_distribution': quantiles
+        }
+
+
+class EvaluationFrame:
+    """Columnas tipadas de una ventana de verificaciones, construidas una sola vez por evaluación"""
+
+    def __init__(self, ai_score: np.ndarray, expert_score: np.ndarray, confidence: np.ndarray,
+                 created_at: np.ndarray, ids: Optional[np.ndarray] = None, feedback: Optional[np.ndarray] = None,
+                 dimensions: Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]] = None):
+        self.ai_score = np.asarray(ai_score, dtype=np.float64)
+        self.expert_score = np.asarray(expert_score, dtype=np.float64)  # NaN = sin feedback experto
+        self.confidence = np.asarray(confidence, dtype=np.float64)
+        self.created_at = np.asarray(created_at)
+        self.has_feedback = ~np.isnan(self.expert_score)
+        self.ids = ids if ids is not None else np.arange(len(self.ai_score))
+        self.feedback = feedback
+        self.dimensions = dimensions or {}  # nombre -> (códigos, etiquetas); código -1 = sin valor
+
+    @classmethod
+    def from_records(cls, verifications: List[Dict]) -> 'EvaluationFrame':
+        """Construir el frame desde filas de ai_verifications (dicts)"""
+        n = len(verifications)
+        ai_score = np.fromiter(
+            (v['ai_result']['score'] if v['ai_result'] and 'score' in v['ai_result'] else 0 for v in verifications),
+            dtype=np.float64, count=n
+        )
+        expert_score = np.fromiter(
+            (np.nan if v['expert_score'] is None else v['expert_score'] for v in verifications),
+            dtype=np.float64, count=n
+        )
+        confidence = np.fromiter((v['confidence_score'] for v in verifications), dtype=np.float64, count=n)
+
+        created_at = np.empty(n, dtype=object)
+        ids = np.empty(n, dtype=object)
+        feedback = np.empty(n, dtype=object)
+        for i, v in enumerate(verifications):
+            created_at[i] = v['created_at']
+            ids[i] = v['id']
+            feedback[i] = v.get('detailed_feedback', {})
+
+        dimensions = {}
+        for name in SLICE_DIMENSIONS:
+            values = [_dimension_value(v, name) for v in verifications]
+            labels = sorted({value for value in values if value is not None})
+            if labels:
+                index = {label: code for code, label in enumerate(labels)}
+                codes = np.fromiter((index.get(value, -1) for value in values), dtype=np.int64, count=n)
+                dimensions[name] = (codes, np.asarray(labels, dtype=object))
+
+        return cls(ai_score, expert_score, confidence, created_at, ids, feedback, dimensions)
+
+    @classmethod
+    def from_batch(cls, batch: Dict[str, np.ndarray]) -> 'EvaluationFrame':
+        """Construir el frame desde un lote columnar de synthetic_data, sin pasar por dicts"""
+        from synthetic_data import CATEGORIES
+
+        dimensions = {}
+        for name in SLICE_DIMENSIONS:
+            if name not in batch:
+                continue
+            if name in CATEGORIES['verification']:
+                dimensions[name] = (batch[name].astype(np.int64), np.asarray(CATEGORIES['verification'][name], dtype=object))
+            else:
+                labels, codes = np.unique(batch[name], return_inverse=True)
+                dimensions[name] = (codes.astype(np.int64), labels.astype(object))
+
+        return cls(batch['ai_score'], batch['expert_score'], batch['confidence'],
+                   batch['created_at'], batch.get('sample_id'), dimensions=dimensions)
+
+    def __len__(self) -> int:
+        return len(self.ai_score)
+
+    def take(self, indices: np.ndarray) -> 'EvaluationFrame':
+        """Subconjunto de filas en el orden indicado"""
+        return EvaluationFrame(
+            self.ai_score[indices], self.expert_score[indices], self.confidence[indices],
+            self.created_at[indices], self.ids[indices],
+            self.feedback[indices] if self.feedback is not None else None,
+            {name: (codes[indices], labels) for name, (codes, labels) in self.dimensions.items()}
+        )
+
+    def with_feedback(self) -> 'EvaluationFrame':
+        """Filas con feedback experto, en el orden original"""
+        return self.take(np.flatnonzero(self.has_feedback))
+
+    def chronological_order(self) -> np.ndarray:
+        """Índices ordenados por created_at (estable, como sorted())"""
+        return np.argsort(self.created_at, kind='stable')
+
+    def example(self, i: int) -> Dict[str, Any]:
+        """Fila i como dict para ejemplos en reportes"""
+        ai_score = self.ai_score[i].item()
+        expert_score = self.expert_score[i].item()
+        return {
+            'verification_id': self.ids[i].item() if hasattr(self.ids[i], 'item') else self.ids[i],
+            'ai_score': ai_score,
+            'expert_score': expert_score,
+            'error': abs(ai_score - expert_score),
+            'confidence': self.confidence[i].item(),
+            'created_at': self.created_at[i:i + 1].tolist()[0],
+            'feedback': self.feedback[i] if self.feedback is not None else {}
+        }
+
+
+def _dimension_value(verification: Dict, name: str):
+    """Valor de una dimensión en la fila, en la columna, en metadata o en content_data"""
+    if verification.get(name) is not None:
+        return verification[name]
+    for container in ('metadata', 'content_data'):
+        nested = verification.get(container) or {}
+        if nested.get(name) is not None:
+            return nested[name]
+    return None
+
+
+def slice_sums(frame: 'EvaluationFrame', dimensions: Optional[List[str]] = None) -> Tuple[List[Tuple[str, Any]], np.ndarray]:
+    """Sumas de todos los segmentos de todas las dimensiones en una pasada agrupada (filas con feedback)"""
+    names = [name for name in (dimensions or SLICE_DIMENSIONS) if name in frame.dimensions]
+    rows = np.flatnonzero(frame.has_feedback)
+    if not names or len(rows) == 0:
+        return [], np.zeros((0, len(SLICE_FIELDS)))
+
+    ai = frame.ai_score[rows]
+    expert = frame.expert_score[rows]
+    conf = frame.confidence[rows]
+    ai_pass = ai >= PASS_THRESHOLD
+    expert_pass = expert >= PASS_THRESHOLD
+    correct = ai_pass == expert_pass
+    high = conf >= 0.9
+    medium = (conf >= 0.7) & (conf < 0.9)
+    low = conf < 0.7
+    columns = [
+        np.ones(len(rows)), ai_pass & expert_pass, ai_pass & ~expert_pass, ~ai_pass & expert_pass,
+        ~ai_pass & ~expert_pass,
+        ai, expert, ai * ai, expert * expert, ai * expert,
+        conf, np.abs(ai - expert),
+        high, high & correct, medium, medium & correct, low, low & correct
+    ]
+
+    # Ids de grupo globales: cada dimensión ocupa un rango propio, así un bincount cubre todas
+    segments, group_ids, row_index = [], [], []
+    for name in names:
+        codes, labels = frame.dimensions[name]
+        codes = codes[rows]
+        valid = np.flatnonzero(codes >= 0)
+        group_ids.append(codes[valid] + len(segments))
+        row_index.append(valid)
+        segments.extend((name, label) for label in labels)
+    group_ids = np.concatenate(group_ids)
+    row_index = np.concatenate(row_index)
+
+    sums = np.column_stack([
+        np.bincount(group_ids, weights=np.asarray(column, dtype=np.float64)[row_index], minlength=len(segments))
+        for column in columns
+    ])
+    return segments, sums
+
+
+def slice_report(segments: List[Tuple[str, Any]], sums: np.ndarray, min_support: int = 30,
+                 top_k: int = 10, rank_by: str = 'accuracy') -> Dict[str, Any]:
+    """Métricas completas por segmento desde sus sumas, con soporte mínimo y los k peores segmentos"""
+    s = dict(zip(SLICE_FIELDS, np.asarray(sums, dtype=np.float64).T))
+    n = s['n']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        derived = {
+            'accuracy': (s['tp'] + s['tn']) / n,
+            'precision': np.where(s['tp'] + s['fp'] > 0, s['tp'] / (s['tp'] + s['fp']), 0.0),
+            'recall': np.where(s['tp'] + s['fn'] > 0, s['tp'] / (s['tp'] + s['fn']), 0.0),
+            'f1_score': np.where(2 * s['tp'] + s['fp'] + s['fn'] > 0,
+                                 2 * s['tp'] / (2 * s['tp'] + s['fp'] + s['fn']), 0.0),
+            'mean_absolute_error': s['sum_err'] / n,
+            'score_correlation': np.clip(
+                (s['sum_ai_expert'] - s['sum_ai'] * s['sum_expert'] / n)
+                / np.sqrt((s['sum_ai2'] - s['sum_ai'] ** 2 / n) * (s['sum_expert2'] - s['sum_expert'] ** 2 / n)),
+                -1.0, 1.0
+            ),
+            'average_confidence': s['sum_conf'] / n
+        }
+        bands = {
+            band: np.where(s[f'{band}_count'] > 0, s[f'{band}_correct'] / s[f'{band}_count'], 0.0)
+            for band in ('high', 'medium', 'low')
+        }
+
+    def segment(i: int) -> Dict[str, Any]:
+        dimension, value = segments[i]
+        result = {'dimension': dimension, 'value': json_value(value), 'sample_size': int(n[i])}
+        for metric, values in derived.items():
+            result[metric] = round(float(values[i]), 4) if np.isfinite(values[i]) else None
+        result['confidence_analysis'] = {
+            f'{band}_confidence': {'count': int(s[f'{band}_count'][i]), 'accuracy': round(float(bands[band][i]), 4)}
+            for band in bands
+        }
+        return result
+
+    # Orden por (dimensión, valor) para que el reporte no dependa del origen de los códigos
+    supported = sorted(np.flatnonzero(n >= min_support), key=lambda i: (segments[i][0], segments[i][1]))
+    by_dimension = {}
+    for i in supported:
+        by_dimension.setdefault(segments[i][0], []).append(segment(i))
+
+    # Peores segmentos: menor accuracy/correlación o mayor MAE
+    score = derived[rank_by]
+    if rank_by == 'mean_absolute_error':
+        score = -score
+    score = np.where(np.isfinite(score), score, np.inf)
+    worst = sorted(supported, key=lambda i: score[i])[:top_k]
+
+    return {
+        'min_support': min_support,
+        'rank_by': rank_by,
+        'dimensions': by_dimension,
+        'worst_slices': [segment(i) for i in worst],
+        'segments_below_support': int(len(segments) - len(supported))
+    }
+
+
+def _bootstrap_chunk(features: np.ndarray, counts: np.ndarray, n_resamples: int, seed) -> np.ndarray:
+    """Sumas remuestreadas (n_resamples x features) con pesos de Poisson por celda"""
+    rng = np.random.default_rng(seed)
+    weights = rng.poisson(counts, size=(n_resamples, len(counts))).astype(np.float64)
+    return weights @ features
+
+
+class ScoreCells:
+    """Tabla de celdas (score IA, score experto) con conteos, suficiente para remuestrear métricas de acuerdo"""
+
+    # Columnas de features: indicadores de la matriz de confusión y momentos medios por celda
+    FEATURES = ['tp', 'fp', 'fn', 'tn', 'ai', 'expert', 'ai2', 'expert2', 'ai_expert']
+
+    def __init__(self, features: np.ndarray, counts: np.ndarray):
+        self.features = np.asarray(features, dtype=np.float64)
+        self.counts = np.asarray(counts, dtype=np.int64)
+
+    @classmethod
+    def from_counts(cls, ai_scores: np.ndarray, expert_scores: np.ndarray, counts: np.ndarray,
+                    ai2: Optional[np.ndarray] = None, expert2: Optional[np.ndarray] = None,
+                    ai_expert: Optional[np.ndarray] = None) -> 'ScoreCells':
+        """Construir desde celdas ya agrupadas (p. ej. GROUP BY en PostgreSQL); los momentos son medias por celda"""
+        ai = np.asarray(ai_scores, dtype=np.float64)
+        expert = np.asarray(expert_scores, dtype=np.float64)
+        ai_pass = ai >= PASS_THRESHOLD
+        expert_pass = expert >= PASS_THRESHOLD
+        features = np.column_stack([
+            ai_pass & expert_pass, ai_pass & ~expert_pass, ~ai_pass & expert_pass, ~ai_pass & ~expert_pass,
+            ai, expert,
+            ai * ai if ai2 is None else ai2,
+            expert * expert if expert2 is None else expert2,
+            ai * expert if ai_expert is None else ai_expert
+        ])
+        return cls(features, counts)
+
+    @classmethod
+    def from_scores(cls, ai_scores: np.ndarray, expert_scores: np.ndarray) -> 'ScoreCells':
+        """Agrupar filas en celdas de 1 punto; los momentos por celda son medias exactas de sus filas"""
+        ai = np.asarray(ai_scores, dtype=np.float64)
+        expert = np.asarray(expert_scores, dtype=np.float64)
+        ai_cell = np.floor(ai).astype(np.int64)
+        expert_cell = np.floor(expert).astype(np.int64)
+        ai_cell -= ai_cell.min()
+        expert_cell -= expert_cell.min()
+        # El aprobado entra en la clave para que la celda no mezcle filas a ambos lados del umbral
+        key = ((ai_cell * (expert_cell.max() + 1) + expert_cell) * 2 + (ai >= PASS_THRESHOLD)) * 2 \
+            + (expert >= PASS_THRESHOLD)
+        _, inverse, counts = np.unique(key, return_inverse=True, return_counts=True)
+
+        def cell_mean(values: np.ndarray) -> np.ndarray:
+            return np.bincount(inverse, weights=values, minlength=len(counts)) / counts
+
+        return cls.from_counts(
+            cell_mean(ai), cell_mean(expert), counts,
+            cell_mean(ai * ai), cell_mean(expert * expert), cell_mean(ai * expert)
+        )
+
+    def bootstrap(self, n_resamples: int = BOOTSTRAP_RESAMPLES, confidence: float = 0.95, seed: int = 42,
+                  time_budget: Optional[float] = BOOTSTRAP_TIME_BUDGET, processes: Optional[int] = None) -> Dict[str, Any]:
+        """Intervalos bootstrap por percentiles de accuracy, precision, recall, F1 y correlación"""
+        chunk = max(1, min(n_resamples, BOOTSTRAP_CHUNK_ELEMENTS // max(len(self.counts), 1)))
+        sizes = [min(chunk, n_resamples - start) for start in range(0, n_resamples, chunk)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        started = time.perf_counter()
+
+        if processes and processes > 1 and len(sizes) > 1:
+            with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn')) as pool:
+                sums = list(pool.map(
+                    _bootstrap_chunk, [self.features] * len(sizes), [self.counts] * len(sizes), sizes, seeds
+                ))
+        else:
+            sums = []
+            for size, chunk_seed in zip(sizes, seeds):
+                sums.append(_bootstrap_chunk(self.features, self.counts, size, chunk_seed))
+                # Con presupuesto de tiempo se corta entre bloques, nunca por debajo del mínimo de remuestreos
+                done = sum(len(s) for s in sums)
+                if time_budget and done >= BOOTSTRAP_MIN_RESAMPLES and time.perf_counter() - started > time_budget:
+                    logger.info(f"Bootstrap cortado por presupuesto de tiempo tras {done} remuestreos")
+                    break
+
+        sums = np.concatenate(sums)
+        tp, fp, fn, tn, s_ai, s_expert, s_ai2, s_expert2, s_ai_expert = sums.T
+        n = tp + fp + fn + tn
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = s_ai_expert - s_ai * s_expert / n
+            var_ai = s_ai2 - s_ai * s_ai / n
+            var_expert = s_expert2 - s_expert * s_expert / n
+            samples = {
+                'accuracy': (tp + tn) / n,
+                'precision': np.where(tp + fp > 0, tp / (tp + fp), 0.0),
+                'recall': np.where(tp + fn > 0, tp / (tp + fn), 0.0),
+                'f1_score': np.where(2 * tp + fp + fn > 0, 2 * tp / (2 * tp + fp + fn), 0.0),
+                'score_correlation': np.clip(cov / np.sqrt(var_ai * var_expert), -1.0, 1.0)
+            }
+
+        tail = (1 - confidence) / 2 * 100
+        intervals = {}
+        for metric, values in samples.items():
+            values = values[np.isfinite(values)]
+            if len(values) == 0:
+                continue
+            lower, upper = np.percentile(values, [tail, 100 - tail])
+            intervals[metric] = {'lower': round(float(lower), 4), 'upper': round(float(upper), 4)}
+
+        intervals['method'] = {'confidence': confidence, 'resamples': len(sums), 'cells': len(self.counts)}
+        logger.info(f"Bootstrap: {len(sums)} remuestreos sobre {len(self.counts)} celdas "
+                    f"en {time.perf_counter() - started:.2f}s")
+        return intervals
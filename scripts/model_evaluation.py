@@ -5,57 +5,480 @@ Incluye detección de drift, análisis de rendimiento y recomendaciones
 """
 
 import os
+import sys
+import copy
 import json
+import time
 import logging
+import subprocess
+import multiprocessing
 import numpy as np
-import pandas as pd
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Tuple
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.metrics import accuracy_score, precision_recall_fscore_support, confusion_matrix, roc_auc_score
-from scipy import stats
+from typing import Dict, List, Any, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 import psycopg2
 from psycopg2.extras import RealDictCursor
 
+from evaluation_stats import (
+    MetricAccumulator, EvaluationFrame, ScoreCells, confusion_from_counts, outlier_threshold, slice_sums, slice_report,
+    PASS_THRESHOLD, LARGE_ERROR_THRESHOLD, SLICE_FIELDS
+)
+from drift_detectors import DriftMonitor
+from ab_testing import SequentialTest
+from report_writer import write_report
+from retraining_pipeline import load_training_config, retraining_thresholds, queue_retraining
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+ERROR_ANALYSIS_CHUNK = 100_000  # Filas por bloque al alimentar el sketch de errores
+
+# El camino JSON no debe cargar los stacks de gráficos ni de ML (solo el reporte HTML los usa)
+HEAVY_MODULES = ('matplotlib', 'seaborn', 'pandas', 'scipy', 'sklearn', 'torch')
+STARTUP_BUDGET_SECONDS = 1.0
+
+# Información del modelo con su categoría de verificación
+MODEL_INFO_SQL = """
+    SELECT sam.*, vc.category_name, vc.evaluation_criteria
+    FROM specialized_ai_models sam
+    LEFT JOIN verification_categories vc ON sam.verification_category = vc.category_name
+"""
+
+# Proyección estrecha de verificaciones ({source} en las consultas de agregados): tablas base
+# o la vista materializada de 12-evaluator-projection.sql cuando existe y está reciente
+BASE_VERIFICATIONS_SQL = """
+    SELECT av.id, av.verification_type, av.created_at,
+           COALESCE((av.ai_result->>'score')::float8, 0) AS ai_score,
+           av.confidence_score::float8 AS confidence,
+           sf.expert_score::float8 AS expert_score
+    FROM ai_verifications av
+    LEFT JOIN specialized_feedback sf ON av.id = sf.verification_id
+"""
+
+PROJECTION_VERIFICATIONS_SQL = """
+    SELECT id, verification_type, created_at, ai_score, confidence, expert_score
+    FROM evaluation_verifications_mv
+"""
+
+PROJECTION_AVAILABLE_SQL = """
+    SELECT to_regclass('evaluation_verifications_mv') IS NOT NULL
+           AND to_regclass('evaluation_projection_state') IS NOT NULL AS available
+"""
+
+PROJECTION_FRESH_SQL = """
+    SELECT NOW() - refreshed_at <= %s * INTERVAL '1 second' AS fresh
+    FROM evaluation_projection_state
+"""
+
+PROJECTION_CHECK_SECONDS = 60  # Cada cuánto se revisa si la vista existe y está reciente
+
+# Verificaciones de varios tipos en una sola consulta, agrupadas por tipo (modo flota)
+FLEET_VERIFICATIONS_SQL = """
+    SELECT nv.verification_type, nv.id, nv.created_at, nv.confidence, nv.ai_score, nv.expert_score
+    FROM ({source}) nv
+    WHERE nv.verification_type = ANY(%s)
+    AND nv.created_at >= NOW() - INTERVAL '%s days'
+    ORDER BY nv.verification_type
+"""
+
+# Agregados de evaluación calculados en PostgreSQL: solo se proyectan las columnas
+# necesarias y se devuelven conteos, sumas y co-momentos de la ventana
+AGGREGATE_METRICS_SQL = """
+    WITH v AS (
+        SELECT nv.created_at, nv.confidence, nv.ai_score, nv.expert_score
+        FROM ({source}) nv
+        WHERE nv.verification_type = %s
+        AND nv.created_at >= NOW() - INTERVAL '%s days'
+    ), f AS (
+        SELECT ai_score, expert_score, confidence,
+               abs(ai_score - expert_score) AS error,
+               ai_score >= {threshold} AS ai_pass,
+               expert_score >= {threshold} AS expert_pass
+        FROM v
+        WHERE expert_score IS NOT NULL
+    )
+    SELECT
+        (SELECT count(*) FROM v) AS total_predictions,
+        count(*) AS n,
+        count(*) FILTER (WHERE ai_pass AND expert_pass) AS tp,
+        count(*) FILTER (WHERE ai_pass AND NOT expert_pass) AS fp,
+        count(*) FILTER (WHERE NOT ai_pass AND expert_pass) AS fn,
+        count(*) FILTER (WHERE NOT ai_pass AND NOT expert_pass) AS tn,
+        sum(ai_score) AS sum_ai,
+        sum(expert_score) AS sum_expert,
+        sum(ai_score * ai_score) AS sum_ai2,
+        sum(expert_score * expert_score) AS sum_expert2,
+        sum(ai_score * expert_score) AS sum_ai_expert,
+        sum(confidence) AS sum_conf,
+        count(*) FILTER (WHERE confidence >= 0.9) AS high_count,
+        count(*) FILTER (WHERE confidence >= 0.9 AND ai_pass = expert_pass) AS high_correct,
+        count(*) FILTER (WHERE confidence >= 0.7 AND confidence < 0.9) AS medium_count,
+        count(*) FILTER (WHERE confidence >= 0.7 AND confidence < 0.9 AND ai_pass = expert_pass) AS medium_correct,
+        count(*) FILTER (WHERE confidence < 0.7) AS low_count,
+        count(*) FILTER (WHERE confidence < 0.7 AND ai_pass = expert_pass) AS low_correct,
+        sum(error) AS sum_err,
+        sum(error * error) AS sum_err2,
+        max(error) AS max_err,
+        count(*) FILTER (WHERE error > {large_error}) AS large_count,
+        count(*) FILTER (WHERE error > {large_error} AND confidence > 0.8) AS large_high_conf_count,
+        sum(error) FILTER (WHERE error > {large_error} AND confidence > 0.8) AS large_high_conf_sum_err,
+        sum(confidence) FILTER (WHERE error > {large_error} AND confidence > 0.8) AS large_high_conf_sum_conf,
+        count(*) FILTER (WHERE error > {large_error} AND ai_score > expert_score) AS over_count,
+        sum(ai_score - expert_score) FILTER (WHERE error > {large_error} AND ai_score > expert_score) AS over_sum,
+        count(*) FILTER (WHERE error > {large_error} AND ai_score < expert_score) AS under_count,
+        sum(expert_score - ai_score) FILTER (WHERE error > {large_error} AND ai_score < expert_score) AS under_sum,
+        percentile_cont(ARRAY[0.25, 0.5, 0.75, 0.9]) WITHIN GROUP (ORDER BY error) AS error_quantiles
+    FROM f
+""".replace('{threshold}', str(PASS_THRESHOLD)).replace('{large_error}', str(LARGE_ERROR_THRESHOLD))
+
+# Solo las filas necesarias para los ejemplos de outliers
+OUTLIER_EXAMPLES_SQL = """
+    SELECT count(*) OVER () AS outlier_count,
+           av.id, av.created_at,
+           av.confidence_score::float8 AS confidence,
+           COALESCE((av.ai_result->>'score')::float8, 0) AS ai_score,
+           sf.expert_score, sf.detailed_feedback
+    FROM ai_verifications av
+    JOIN specialized_feedback sf ON av.id = sf.verification_id
+    WHERE av.verification_type = %s
+    AND av.created_at >= NOW() - INTERVAL '%s days'
+    AND abs(COALESCE((av.ai_result->>'score')::float8, 0) - sf.expert_score) > %s
+    ORDER BY av.created_at DESC
+    LIMIT %s
+"""
+
+# Celdas de 1 punto (score IA, score experto) con sus momentos medios, para los intervalos bootstrap
+SCORE_CELLS_SQL = """
+    WITH scored AS (
+        SELECT nv.ai_score AS ai, nv.expert_score AS expert
+        FROM ({source}) nv
+        WHERE nv.verification_type = %s
+        AND nv.created_at >= NOW() - INTERVAL '%s days'
+        AND nv.expert_score IS NOT NULL
+    )
+    SELECT avg(ai) AS ai_score, avg(expert) AS expert_score, count(*) AS n,
+           avg(ai * ai) AS ai2, avg(expert * expert) AS expert2, avg(ai * expert) AS ai_expert
+    FROM scored
+    GROUP BY floor(ai), floor(expert), ai >= {threshold}, expert >= {threshold}
+""".replace('{threshold}', str(PASS_THRESHOLD))
+
+# Sumas por segmento de cada dimensión en una sola consulta (mismas columnas que SLICE_FIELDS).
+# Sin filtro de soporte: slice_report aplica min_support y cuenta los segmentos por debajo, como con el frame
+SLICE_METRICS_SQL = """
+    WITH v AS (
+        SELECT COALESCE(av.content_data->>'restaurant_type', av.content_data->'metadata'->>'restaurant_type') AS restaurant_type,
+               COALESCE(av.content_data->>'area', av.content_data->'metadata'->>'area') AS area,
+               COALESCE(av.content_data->>'shift', av.content_data->'metadata'->>'shift') AS shift,
+               av.empleado_id::text AS empleado_id,
+               COALESCE((av.ai_result->>'score')::float8, 0) AS ai,
+               sf.expert_score::float8 AS expert,
+               av.confidence_score::float8 AS conf
+        FROM ai_verifications av
+        JOIN specialized_feedback sf ON av.id = sf.verification_id
+        WHERE av.verification_type = %s
+        AND av.created_at >= NOW() - INTERVAL '%s days'
+        AND sf.expert_score IS NOT NULL
+    )
+    SELECT CASE WHEN GROUPING(restaurant_type) = 0 THEN 'restaurant_type'
+                WHEN GROUPING(area) = 0 THEN 'area'
+                WHEN GROUPING(shift) = 0 THEN 'shift'
+                ELSE 'empleado_id' END AS dimension,
+           COALESCE(restaurant_type, area, shift, empleado_id) AS value,
+           count(*) AS n,
+           count(*) FILTER (WHERE ai >= {threshold} AND expert >= {threshold}) AS tp,
+           count(*) FILTER (WHERE ai >= {threshold} AND expert < {threshold}) AS fp,
+           count(*) FILTER (WHERE ai < {threshold} AND expert >= {threshold}) AS fn,
+           count(*) FILTER (WHERE ai < {threshold} AND expert < {threshold}) AS tn,
+           sum(ai) AS sum_ai, sum(expert) AS sum_expert,
+           sum(ai * ai) AS sum_ai2, sum(expert * expert) AS sum_expert2, sum(ai * expert) AS sum_ai_expert,
+           sum(conf) AS sum_conf, sum(abs(ai - expert)) AS sum_err,
+           count(*) FILTER (WHERE conf >= 0.9) AS high_count,
+           count(*) FILTER (WHERE conf >= 0.9 AND (ai >= {threshold}) = (expert >= {threshold})) AS high_correct,
+           count(*) FILTER (WHERE conf >= 0.7 AND conf < 0.9) AS medium_count,
+           count(*) FILTER (WHERE conf >= 0.7 AND conf < 0.9 AND (ai >= {threshold}) = (expert >= {threshold})) AS medium_correct,
+           count(*) FILTER (WHERE conf < 0.7) AS low_count,
+           count(*) FILTER (WHERE conf < 0.7 AND (ai >= {threshold}) = (expert >= {threshold})) AS low_correct
+    FROM v
+    GROUP BY GROUPING SETS ((restaurant_type), (area), (shift), (empleado_id))
+""".replace('{threshold}', str(PASS_THRESHOLD))
+
+# Evaluación incremental: predicciones nuevas desde la marca de agua, con el feedback que ya
+# cubre el mismo límite; el posterior entra una sola vez en la siguiente ejecución (LATE_FEEDBACK_SQL)
+NEW_PREDICTIONS_SQL = """
+    SELECT av.id, av.created_at, av.created_at::date AS day,
+           COALESCE((av.ai_result->>'score')::float8, 0) AS ai_score,
+           sf.expert_score::float8 AS expert_score,
+           av.confidence_score::float8 AS confidence,
+           sf.detailed_feedback
+    FROM ai_verifications av
+    LEFT JOIN specialized_feedback sf ON av.id = sf.verification_id AND sf.created_at <= %s
+    WHERE av.verification_type = %s
+    AND av.created_at > %s AND av.created_at <= %s
+"""
+
+# Margen para transacciones en curso: created_at es el inicio de la transacción, no el commit
+UPPER_BOUND_SQL = "SELECT NOW() - make_interval(secs => %s) AS upper_bound"
+
+# Feedback tardío sobre predicciones ya agregadas en ejecuciones anteriores
+LATE_FEEDBACK_SQL = """
+    SELECT av.id, av.created_at, av.created_at::date AS day,
+           COALESCE((av.ai_result->>'score')::float8, 0) AS ai_score,
+           sf.expert_score::float8 AS expert_score,
+           av.confidence_score::float8 AS confidence,
+           sf.detailed_feedback
+    FROM specialized_feedback sf
+    JOIN ai_verifications av ON av.id = sf.verification_id
+    WHERE av.verification_type = %s
+    AND sf.created_at > %s AND sf.created_at <= %s
+    AND av.created_at <= %s
+    AND sf.expert_score IS NOT NULL
+"""
+
+# Flujos para los detectores de drift: predicciones por created_at y feedback por orden de llegada
+PREDICTION_STREAM_SQL = """
+    SELECT av.created_at,
+           COALESCE((av.ai_result->>'score')::float8, 0) AS ai_score,
+           av.confidence_score::float8 AS confidence
+    FROM ai_verifications av
+    WHERE av.verification_type = %s
+    AND av.created_at > %s::timestamptz AND av.created_at <= %s
+    ORDER BY av.created_at
+"""
+
+FEEDBACK_STREAM_SQL = """
+    SELECT av.created_at, sf.created_at AS feedback_at,
+           COALESCE((av.ai_result->>'score')::float8, 0) AS ai_score,
+           sf.expert_score::float8 AS expert_score
+    FROM specialized_feedback sf
+    JOIN ai_verifications av ON av.id = sf.verification_id
+    WHERE av.verification_type = %s
+    AND sf.created_at > %s::timestamptz AND sf.created_at <= %s
+    AND sf.expert_score IS NOT NULL
+    ORDER BY sf.created_at
+"""
+
+# Feedback nuevo de las verificaciones de un experimento, en orden de llegada
+EXPERIMENT_FEEDBACK_SQL = """
+    SELECT av.experiment_arm, sf.created_at AS feedback_at,
+           COALESCE((av.ai_result->>'score')::float8, 0) AS ai_score,
+           sf.expert_score::float8 AS expert_score
+    FROM specialized_feedback sf
+    JOIN ai_verifications av ON av.id = sf.verification_id
+    WHERE av.experiment_id = %s
+    AND sf.created_at > %s AND sf.created_at <= %s
+    AND sf.expert_score IS NOT NULL
+    ORDER BY sf.created_at
+"""
+
+UPSERT_DAILY_METRICS_SQL = """
+    INSERT INTO model_production_metrics (
+        model_id, evaluation_date, total_predictions, correct_predictions,
+        false_positives, false_negatives, average_confidence, accuracy,
+        precision_score, f1_score, confusion_matrix, sufficient_stats, updated_at
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
+    ON CONFLICT (model_id, evaluation_date) DO UPDATE SET
+        total_predictions = EXCLUDED.total_predictions,
+        correct_predictions = EXCLUDED.correct_predictions,
+        false_positives = EXCLUDED.false_positives,
+        false_negatives = EXCLUDED.false_negatives,
+        average_confidence = EXCLUDED.average_confidence,
+        accuracy = EXCLUDED.accuracy,
+        precision_score = EXCLUDED.precision_score,
+        f1_score = EXCLUDED.f1_score,
+        confusion_matrix = EXCLUDED.confusion_matrix,
+        sufficient_stats = EXCLUDED.sufficient_stats,
+        updated_at = NOW()
+"""
+
+# Marca de agua de los datos de un modelo: si no cambia, una evaluación cacheada sigue vigente
+EVALUATION_WATERMARK_SQL = """
+    SELECT sam.updated_at AS model_updated_at,
+           (SELECT max(av.created_at) FROM ai_verifications av
+            WHERE av.verification_type = sam.verification_category) AS predictions_at,
+           (SELECT max(sf.created_at) FROM specialized_feedback sf) AS feedback_at
+    FROM specialized_ai_models sam
+    WHERE sam.id = %s
+"""
+
+
+def connection_params() -> Dict[str, Any]:
+    """Parámetros de conexión a PostgreSQL desde el entorno (DB_*)"""
+    return {
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'database': os.getenv('DB_NAME', 'pulso'),
+        'user': os.getenv('DB_USER', 'postgres'),
+        'password': os.getenv('DB_PASSWORD', ''),
+        'cursor_factory': RealDictCursor
+    }
+
+
+class EvaluationCache:
+    """Caché LRU en proceso de evaluaciones, con TTL y validada por marca de agua de los datos"""
+    
+    def __init__(self, ttl_seconds: float = 900, max_entries: int = 64, revalidate_after: float = 30):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.revalidate_after = revalidate_after  # Segundos en los que se sirve sin consultar la marca de agua
+        self._entries = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0}
+    
+    def _entry(self, key: Tuple):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry['stored_at'] > self.ttl_seconds:
+            del self._entries[key]
+            self.stats['expired'] += 1
+            return None
+        return entry
+    
+    def needs_revalidation(self, key: Tuple) -> bool:
+        """Indicar si hay que consultar la marca de agua antes de servir la entrada"""
+        entry = self._entry(key)
+        return entry is None or time.monotonic() - entry['checked_at'] > self.revalidate_after
+    
+    def get(self, key: Tuple, watermark: Optional[Tuple] = None) -> Optional[Dict[str, Any]]:
+        """Obtener una copia de la evaluación si sigue vigente (sin marca de agua: solo si es reciente)"""
+        entry = self._entry(key)
+        if entry is not None and watermark is None and self.needs_revalidation(key):
+            entry = None
+        if entry is not None and watermark is not None:
+            if entry['watermark'] != watermark:
+                entry = None
+            else:
+                entry['checked_at'] = time.monotonic()
+        
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.stats['hits'] += 1
+        return copy.deepcopy(entry['evaluation'])
+    
+    def put(self, key: Tuple, watermark: Tuple, evaluation: Dict[str, Any]):
+        """Guardar una evaluación con la marca de agua de los datos que la produjeron"""
+        now = time.monotonic()
+        self._entries[key] = {
+            'watermark': watermark,
+            'evaluation': copy.deepcopy(evaluation),
+            'stored_at': now,
+            'checked_at': now
+        }
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+    
+    def invalidate(self, model_id: Optional[str] = None):
+        """Descartar las entradas de un modelo, o todas"""
+        for key in [key for key in self._entries if model_id is None or key[0] == model_id]:
+            del self._entries[key]
+
+
 class ModelEvaluator:
     """Evaluador de modelos especializados en producción"""
     
-    def __init__(self):
-        self.db_connection = self._connect_to_database()
+    def __init__(self, connect: bool = True, cache: Optional[EvaluationCache] = None):
+        self.db_connection = self._connect_to_database() if connect else None
+        self.bootstrap_processes = int(os.getenv('BOOTSTRAP_PROCESSES', 0)) or None
+        self.slice_min_support = int(os.getenv('SLICE_MIN_SUPPORT', 30))
+        self.slice_top_k = int(os.getenv('SLICE_TOP_K', 10))
+        self.projection_max_age = float(os.getenv('EVALUATION_PROJECTION_MAX_AGE', 900))
+        self.commit_lag = float(os.getenv('EVALUATION_COMMIT_LAG', 5.0))  # Segundos, como --commit-lag del daemon
+        self._use_projection = False
+        self._projection_checked_at = None
+        # Drift por encima de deployment.monitoring.retraining_thresholds encola un reentrenamiento
+        self.retraining_thresholds = retraining_thresholds(load_training_config())
+        self.cache = cache or EvaluationCache(
+            ttl_seconds=float(os.getenv('EVALUATION_CACHE_TTL', 900)),
+            max_entries=int(os.getenv('EVALUATION_CACHE_SIZE', 64))
+        )
         
     def _connect_to_database(self):
         """Conectar a la base de datos"""
-        return psycopg2.connect(
-            host=os.getenv('DB_HOST', 'localhost'),
-            database=os.getenv('DB_NAME', 'pulso'),
-            user=os.getenv('DB_USER', 'postgres'),
-            password=os.getenv('DB_PASSWORD', ''),
-            cursor_factory=RealDictCursor
-        )
+        return psycopg2.connect(**connection_params())
+    
+    def evaluate_model_performance(self, model_id: str, days_back: int = 30, aggregate_in_sql: bool = True,
+                                   incremental: bool = False, use_cache: bool = True) -> Dict[str, Any]:
+        """Evaluar rendimiento de un modelo específico, reutilizando la caché si los datos no cambiaron"""
+        
+        mode = 'incremental' if incremental else ('sql' if aggregate_in_sql else 'rows')
+        key = (str(model_id), days_back, mode)
+        if not use_cache:
+            return self._evaluate_uncached(model_id, days_back, aggregate_in_sql, incremental)
+        
+        if not self.cache.needs_revalidation(key):
+            return self.cache.get(key)
+        
+        watermark = self._data_watermark(model_id)
+        evaluation = self.cache.get(key, watermark)
+        if evaluation is not None:
+            logger.info(f"Evaluación de {model_id} servida desde caché (datos sin cambios)")
+            return evaluation
+        
+        evaluation = self._evaluate_uncached(model_id, days_back, aggregate_in_sql, incremental)
+        if 'error' not in evaluation:
+            self.cache.put(key, watermark, evaluation)
+        return evaluation
     
-    def evaluate_model_performance(self, model_id: str, days_back: int = 30) -> Dict[str, Any]:
-        """Evaluar rendimiento de un modelo específico"""
+    def _data_watermark(self, model_id: str) -> Tuple:
+        """Última predicción y último feedback que afectan al modelo"""
+        
+        with self.db_connection.cursor() as cursor:
+            cursor.execute(EVALUATION_WATERMARK_SQL, (model_id,))
+            row = cursor.fetchone()
+        self.db_connection.commit()  # No dejar la transacción de lectura abierta
+        if not row:
+            raise ValueError(f"Model {model_id} not found")
+        return (row['model_updated_at'], row['predictions_at'], row['feedback_at'])
+    
+    def verification_source(self, cursor) -> str:
+        """Consulta de la proyección estrecha: la vista materializada si existe y es reciente, si no las tablas base"""
+        
+        now = time.monotonic()
+        if self._projection_checked_at is None or now - self._projection_checked_at > PROJECTION_CHECK_SECONDS:
+            cursor.execute(PROJECTION_AVAILABLE_SQL)
+            use_projection = bool(cursor.fetchone()['available'])
+            if use_projection:
+                cursor.execute(PROJECTION_FRESH_SQL, (self.projection_max_age,))
+                row = cursor.fetchone()
+                use_projection = bool(row and row['fresh'])
+            if use_projection != self._use_projection:
+                logger.info(f"Agregados del evaluador desde {'evaluation_verifications_mv' if use_projection else 'tablas base'}")
+            self._use_projection = use_projection
+            self._projection_checked_at = now
+        
+        return PROJECTION_VERIFICATIONS_SQL if self._use_projection else BASE_VERIFICATIONS_SQL
+    
+    def _evaluate_uncached(self, model_id: str, days_back: int, aggregate_in_sql: bool,
+                           incremental: bool) -> Dict[str, Any]:
+        if incremental:
+            return self.evaluate_incremental(model_id, days_back)
         
         with self.db_connection.cursor() as cursor:
             # Obtener información del modelo
-            cursor.execute("""
-                SELECT sam.*, vc.category_name, vc.evaluation_criteria
-                FROM specialized_ai_models sam
-                LEFT JOIN verification_categories vc ON sam.verification_category = vc.category_name
-                WHERE sam.id = %s
-            """, (model_id,))
+            cursor.execute(MODEL_INFO_SQL + " WHERE sam.id = %s", (model_id,))
             
             model_info = cursor.fetchone()
             if not model_info:
                 raise ValueError(f"Model {model_id} not found")
             
-            # Obtener verificaciones recientes
+            if aggregate_in_sql:
+                return self._evaluate_with_sql_aggregates(cursor, dict(model_info), days_back)
+            
+            # Obtener verificaciones recientes (solo las columnas que usa el análisis)
             cursor.execute("""
-                SELECT av.*, sf.expert_score, sf.detailed_feedback
+                SELECT av.id, av.created_at, av.confidence_score, av.empleado_id,
+                       CASE WHEN av.ai_result ? 'score'
+                            THEN jsonb_build_object('score', av.ai_result->'score') END AS ai_result,
+                       jsonb_strip_nulls(jsonb_build_object(
+                           'restaurant_type', COALESCE(av.content_data->'restaurant_type', av.content_data->'metadata'->'restaurant_type'),
+                           'area', COALESCE(av.content_data->'area', av.content_data->'metadata'->'area'),
+                           'shift', COALESCE(av.content_data->'shift', av.content_data->'metadata'->'shift')
+                       )) AS metadata,
+                       sf.expert_score, sf.detailed_feedback
                 FROM ai_verifications av
                 LEFT JOIN specialized_feedback sf ON av.id = sf.verification_id
                 WHERE av.verification_type = %s
@@ -65,94 +488,534 @@ class ModelEvaluator:
             
             verifications = cursor.fetchall()
         
-        if not verifications:
+        return self.evaluate_verifications(dict(model_info), verifications, days_back)
+    
+    def _evaluate_with_sql_aggregates(self, cursor, model_info: Dict, days_back: int) -> Dict[str, Any]:
+        """Evaluar a partir de agregados calculados en PostgreSQL, sin traer las filas"""
+        
+        verification_type = model_info['verification_category']
+        source = self.verification_source(cursor)
+        cursor.execute(AGGREGATE_METRICS_SQL.replace('{source}', source), (verification_type, days_back))
+        total = cursor.fetchone()
+        
+        total_predictions = total['total_predictions']
+        if total_predictions == 0:
+            return {'error': 'No verification data found for evaluation'}
+        
+        window = MetricAccumulator.from_dict(total)
+        
+        metrics = window.performance_metrics()
+        if window.values['n'] > 0:
+            cursor.execute(SCORE_CELLS_SQL.replace('{source}', source), (verification_type, days_back))
+            cells = cursor.fetchall()
+            metrics['confidence_intervals'] = ScoreCells.from_counts(
+                *(np.array([row[column] for row in cells], dtype=np.float64)
+                  for column in ('ai_score', 'expert_score', 'n', 'ai2', 'expert2', 'ai_expert'))
+            ).bootstrap(processes=self.bootstrap_processes)
+        drift_analysis = self.update_drift_monitor(cursor, model_info['id'], verification_type, days_back)
+        self.db_connection.commit()
+        
+        slice_analysis = {}
+        if window.values['n'] > 0:
+            cursor.execute(SLICE_METRICS_SQL, (verification_type, days_back))
+            slice_rows = [row for row in cursor.fetchall() if row['value'] is not None]
+            slice_analysis = slice_report(
+                [(row['dimension'], row['value']) for row in slice_rows],
+                np.array([[row[field] for field in SLICE_FIELDS] for row in slice_rows], dtype=np.float64)
+                .reshape(-1, len(SLICE_FIELDS)),
+                self.slice_min_support, self.slice_top_k
+            )
+        
+        if window.values['n'] == 0:
+            error_analysis = {'error': 'No feedback data for error analysis'}
+        else:
+            q25, q50, q75, q90 = total['error_quantiles']
+            threshold = outlier_threshold(q25, q75)
+            
+            cursor.execute(OUTLIER_EXAMPLES_SQL, (verification_type, days_back, threshold, 3))
+            outlier_rows = cursor.fetchall()
+            
+            summary = window.error_summary()
+            error_analysis = {
+                'total_errors': summary['total_errors'],
+                'mean_absolute_error': summary['mean_absolute_error'],
+                'median_absolute_error': q50,
+                'std_error': summary['std_error'],
+                'max_error': summary['max_error'],
+                'outliers': {
+                    'count': outlier_rows[0]['outlier_count'] if outlier_rows else 0,
+                    'threshold': threshold,
+                    'examples': [
+                        {
+                            'verification_id': row['id'],
+                            'ai_score': row['ai_score'],
+                            'expert_score': row['expert_score'],
+                            'error': abs(row['ai_score'] - row['expert_score']),
+                            'confidence': row['confidence'],
+                            'created_at': row['created_at'],
+                            'feedback': row['detailed_feedback']
+                        }
+                        for row in outlier_rows
+                    ]
+                },
+                'large_errors': summary['large_errors'],
+                'error_distribution': {'q25': q25, 'q50': q50, 'q75': q75, 'q90': q90}
+            }
+        
+        recommendations = self._generate_recommendations(metrics, drift_analysis, error_analysis, slice_analysis)
+        
+        return {
+            'model_info': model_info,
+            'evaluation_period': {
+                'days': days_back,
+                'total_predictions': total_predictions,
+                'with_feedback': window.values['n']
+            },
+            'performance_metrics': metrics,
+            'drift_analysis': drift_analysis,
+            'error_analysis': error_analysis,
+            'slice_analysis': slice_analysis,
+            'recommendations': recommendations,
+            'evaluation_timestamp': datetime.now().isoformat()
+        }
+    
+    def run_daemon(self, once: bool = False, **options) -> Dict[str, Any]:
+        """Evaluación continua por marcas de agua (opciones de evaluation_daemon.EvaluationDaemon)"""
+        from evaluation_daemon import EvaluationDaemon
+        return EvaluationDaemon(evaluator=self, **options).run(once=once)
+    
+    def update_daily_statistics(self, model_id: str, backfill_days: int = 90) -> Dict[str, Any]:
+        """Agregar a las estadísticas diarias solo las predicciones y el feedback nuevos"""
+        
+        with self.db_connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT verification_category FROM specialized_ai_models WHERE id = %s", (model_id,)
+            )
+            model_info = cursor.fetchone()
+            if not model_info:
+                raise ValueError(f"Model {model_id} not found")
+            verification_type = model_info['verification_category']
+            
+            # Mismo límite que el daemon: filas de transacciones aún sin confirmar quedan para la siguiente
+            cursor.execute(UPPER_BOUND_SQL, (self.commit_lag,))
+            upper_bound = cursor.fetchone()['upper_bound']
+            
+            cursor.execute("""
+                SELECT predictions_watermark, feedback_watermark
+                FROM model_evaluation_watermarks
+                WHERE model_id = %s
+                FOR UPDATE
+            """, (model_id,))
+            watermarks = cursor.fetchone()
+            if watermarks:
+                predictions_from = watermarks['predictions_watermark']
+                feedback_from = watermarks['feedback_watermark']
+            else:
+                # Primera ejecución: backfill; el feedback existente entra con sus predicciones
+                predictions_from = upper_bound - timedelta(days=backfill_days)
+                feedback_from = upper_bound
+            
+            daily = {}
+            cursor.execute(NEW_PREDICTIONS_SQL, (upper_bound, verification_type, predictions_from, upper_bound))
+            new_rows = cursor.fetchall()
+            self._accumulate_by_day(daily, new_rows, count_predictions=True)
+            
+            cursor.execute(LATE_FEEDBACK_SQL, (verification_type, feedback_from, upper_bound, predictions_from))
+            late_rows = cursor.fetchall()
+            self._accumulate_by_day(daily, late_rows, count_predictions=False)
+            
+            self._merge_daily_metrics(cursor, model_id, daily)
+            self._upsert_watermarks(cursor, model_id, upper_bound, upper_bound)
+        
+        self.db_connection.commit()
+        
+        logger.info(
+            f"Estadísticas diarias de {model_id}: {len(new_rows)} predicciones nuevas, "
+            f"{len(late_rows)} feedback tardíos, {len(daily)} días actualizados"
+        )
+        return {
+            'new_predictions': len(new_rows),
+            'late_feedback': len(late_rows),
+            'days_updated': sorted(str(day) for day in daily),
+            'watermark': upper_bound
+        }
+    
+    def _accumulate_by_day(self, daily: Dict, rows: List[Dict], count_predictions: bool):
+        """Agregar filas nuevas a los acumuladores de su día"""
+        
+        if not rows:
+            return
+        
+        n = len(rows)
+        days = np.empty(n, dtype=object)
+        days[:] = [row['day'] for row in rows]
+        ai_scores = np.fromiter((row['ai_score'] for row in rows), dtype=np.float64, count=n)
+        expert_scores = np.fromiter(
+            (np.nan if row['expert_score'] is None else row['expert_score'] for row in rows),
+            dtype=np.float64, count=n
+        )
+        confidences = np.fromiter((row['confidence'] for row in rows), dtype=np.float64, count=n)
+        has_feedback = ~np.isnan(expert_scores)
+        
+        for day in set(days):
+            in_day = days == day
+            accumulator = daily.setdefault(day, MetricAccumulator())
+            if count_predictions:
+                accumulator.add_predictions(np.count_nonzero(in_day))
+            selected = np.flatnonzero(in_day & has_feedback)
+            accumulator.update(
+                ai_scores[selected], expert_scores[selected], confidences[selected],
+                ids=[rows[i]['id'] for i in selected],
+                created_at=[rows[i]['created_at'] for i in selected],
+                feedback=[rows[i]['detailed_feedback'] for i in selected]
+            )
+    
+    def _merge_daily_metrics(self, cursor, model_id: str, daily: Dict[Any, MetricAccumulator]):
+        """Combinar acumuladores diarios nuevos con lo ya persistido para esos días y guardarlos"""
+        
+        if not daily:
+            return
+        
+        cursor.execute("""
+            SELECT evaluation_date, sufficient_stats
+            FROM model_production_metrics
+            WHERE model_id = %s AND evaluation_date = ANY(%s)
+            FOR UPDATE
+        """, (model_id, list(daily)))
+        merged = {day: MetricAccumulator().merge(accumulator) for day, accumulator in daily.items()}
+        for row in cursor.fetchall():
+            if row['sufficient_stats']:
+                merged[row['evaluation_date']].merge(MetricAccumulator.from_dict(row['sufficient_stats']))
+        
+        for day, accumulator in merged.items():
+            self._upsert_daily_metrics(cursor, model_id, day, accumulator)
+    
+    def _upsert_watermarks(self, cursor, model_id: str, predictions_watermark, feedback_watermark):
+        """Guardar hasta dónde se han agregado predicciones y feedback"""
+        cursor.execute("""
+            INSERT INTO model_evaluation_watermarks (model_id, predictions_watermark, feedback_watermark)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (model_id) DO UPDATE SET
+                predictions_watermark = EXCLUDED.predictions_watermark,
+                feedback_watermark = EXCLUDED.feedback_watermark,
+                updated_at = NOW()
+        """, (model_id, predictions_watermark, feedback_watermark))
+    
+    def _upsert_daily_metrics(self, cursor, model_id: str, day, accumulator: MetricAccumulator):
+        """Guardar las estadísticas de un día junto con sus métricas derivadas"""
+        
+        v = accumulator.values
+        metrics = accumulator.performance_metrics() if v['n'] > 0 else {}
+        cursor.execute(UPSERT_DAILY_METRICS_SQL, (
+            model_id, day, v['total_predictions'], v['tp'] + v['tn'], v['fp'], v['fn'],
+            metrics.get('average_confidence'), metrics.get('accuracy'),
+            metrics.get('precision'), metrics.get('f1_score'),
+            json.dumps(metrics['confusion_matrix']) if metrics else None,
+            json.dumps(accumulator.to_dict())
+        ))
+    
+    def evaluate_incremental(self, model_id: str, days_back: int = 30) -> Dict[str, Any]:
+        """Evaluar combinando las estadísticas diarias persistidas tras agregar solo lo nuevo"""
+        
+        self.update_daily_statistics(model_id, backfill_days=max(days_back, 90))
+        
+        with self.db_connection.cursor() as cursor:
+            cursor.execute(MODEL_INFO_SQL + " WHERE sam.id = %s", (model_id,))
+            model_info = cursor.fetchone()
+            if not model_info:
+                raise ValueError(f"Model {model_id} not found")
+            
+            cursor.execute("""
+                SELECT evaluation_date, sufficient_stats
+                FROM model_production_metrics
+                WHERE model_id = %s
+                AND evaluation_date >= CURRENT_DATE - %s
+                AND sufficient_stats IS NOT NULL
+                ORDER BY evaluation_date
+            """, (model_id, days_back))
+            days = [
+                (row['evaluation_date'], MetricAccumulator.from_dict(row['sufficient_stats']))
+                for row in cursor.fetchall()
+            ]
+            
+            drift_analysis = self.update_drift_monitor(
+                cursor, model_id, model_info['verification_category'], days_back
+            )
+            evaluation = self.evaluate_daily_statistics(dict(model_info), days, days_back, drift_analysis)
+        
+        self.db_connection.commit()
+        return evaluation
+    
+    def update_drift_monitor(self, cursor, model_id: str, verification_type: str, days_back: int) -> Dict[str, Any]:
+        """Alimentar los detectores persistidos con lo llegado desde su marca de agua"""
+        
+        # Límite con margen de commit (como update_daily_statistics): la marca de agua no pasa
+        # por encima de filas de transacciones aún sin confirmar
+        cursor.execute(UPPER_BOUND_SQL, (self.commit_lag,))
+        upper_bound = cursor.fetchone()['upper_bound']
+        cursor.execute("SELECT NOW() - INTERVAL '%s days' AS window_start", (days_back,))
+        window_start = cursor.fetchone()['window_start'].isoformat()
+        
+        cursor.execute(
+            "SELECT detector_state FROM model_drift_state WHERE model_id = %s FOR UPDATE", (model_id,)
+        )
+        row = cursor.fetchone()
+        monitor = DriftMonitor(row['detector_state'] if row else None)
+        
+        cursor.execute(PREDICTION_STREAM_SQL, (
+            verification_type, monitor.predictions_watermark or window_start, upper_bound
+        ))
+        predictions = cursor.fetchall()
+        monitor.update_predictions(
+            [r['created_at'] for r in predictions],
+            np.array([r['ai_score'] for r in predictions], dtype=np.float64),
+            np.array([r['confidence'] for r in predictions], dtype=np.float64)
+        )
+        
+        cursor.execute(FEEDBACK_STREAM_SQL, (
+            verification_type, monitor.feedback_watermark or window_start, upper_bound
+        ))
+        feedback = cursor.fetchall()
+        monitor.update_feedback(
+            [r['created_at'] for r in feedback],
+            np.array([r['ai_score'] for r in feedback], dtype=np.float64),
+            np.array([r['expert_score'] for r in feedback], dtype=np.float64),
+            watermark=feedback[-1]['feedback_at'] if feedback else None
+        )
+        
+        report = monitor.report(since=window_start)
+        cursor.execute("""
+            INSERT INTO model_drift_state (model_id, detector_state, drift_detected, drift_started_at)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (model_id) DO UPDATE SET
+                detector_state = EXCLUDED.detector_state,
+                drift_detected = EXCLUDED.drift_detected,
+                drift_started_at = EXCLUDED.drift_started_at,
+                updated_at = NOW()
+        """, (model_id, json.dumps(monitor.to_dict()), report['drift_detected'], report['drift_started_at']))
+        
+        logger.info(
+            f"Detectores de drift de {model_id}: {len(predictions)} predicciones y "
+            f"{len(feedback)} feedback nuevos"
+        )
+        if self.retraining_thresholds is not None:
+            queue_retraining(cursor, model_id, report, self.retraining_thresholds)
+        return report
+    
+    def update_experiments(self, cursor=None) -> List[Dict[str, Any]]:
+        """Alimentar el test secuencial de cada experimento en curso y cerrar los que ya son significativos"""
+        
+        if cursor is None:
+            with self.db_connection.cursor() as cursor:
+                results = self.update_experiments(cursor)
+            self.db_connection.commit()
+            return results
+        
+        # Con margen de commit: feedback_watermark no salta feedback de transacciones en curso
+        cursor.execute(UPPER_BOUND_SQL, (self.commit_lag,))
+        upper_bound = cursor.fetchone()['upper_bound']
+        cursor.execute("SELECT * FROM model_experiments WHERE status = 'running' FOR UPDATE SKIP LOCKED")
+        results = []
+        for experiment in cursor.fetchall():
+            test = SequentialTest(**experiment['test_config'], state=experiment['test_state'])
+            cursor.execute(EXPERIMENT_FEEDBACK_SQL, (experiment['id'], experiment['feedback_watermark'], upper_bound))
+            rows = cursor.fetchall()
+            decision = test.update(
+                [r['experiment_arm'] for r in rows],
+                np.array([r['ai_score'] for r in rows], dtype=np.float64),
+                np.array([r['expert_score'] for r in rows], dtype=np.float64)
+            ) if rows else test.decision
+            
+            cursor.execute("""
+                UPDATE model_experiments
+                SET test_state = %s, feedback_watermark = %s, updated_at = NOW()
+                WHERE id = %s
+            """, (json.dumps(test.to_dict()), upper_bound, experiment['id']))
+            if decision:
+                self._conclude_experiment(cursor, experiment, decision)
+            
+            report = test.report()
+            report.update({'experiment_id': str(experiment['id']), 'new_feedback': len(rows)})
+            results.append(report)
+            logger.info(
+                f"Experimento {experiment['id']} ({experiment['verification_category']}): {len(rows)} feedback nuevos, "
+                f"p={test.p_value:.4f}, decisión {decision or 'en curso'}"
+            )
+        return results
+    
+    def _conclude_experiment(self, cursor, experiment: Dict[str, Any], decision: str):
+        """Detener el experimento: todo el tráfico vuelve a un único modelo desplegado"""
+        
+        cursor.execute("""
+            UPDATE model_experiments
+            SET status = 'stopped', decision = %s, stopped_at = NOW(), updated_at = NOW()
+            WHERE id = %s
+        """, (decision, experiment['id']))
+        
+        if decision == 'challenger_wins':
+            winner, loser = experiment['challenger_model_id'], experiment['champion_model_id']
+        else:
+            # Challenger peor o sin diferencia: se mantiene el champion
+            winner, loser = experiment['champion_model_id'], experiment['challenger_model_id']
+        cursor.execute("""
+            UPDATE specialized_ai_models
+            SET deployment_status = 'deployed', deployed_at = COALESCE(deployed_at, NOW()), updated_at = NOW()
+            WHERE id = %s
+        """, (winner,))
+        cursor.execute("""
+            UPDATE specialized_ai_models
+            SET deployment_status = 'deprecated', deprecated_at = NOW(), updated_at = NOW()
+            WHERE id = %s
+        """, (loser,))
+        self.cache.invalidate()
+        logger.info(f"Experimento {experiment['id']} detenido: {decision}; modelo desplegado {winner}")
+    
+    def evaluate_daily_statistics(self, model_info: Dict, days: List[Tuple[Any, MetricAccumulator]],
+                                  days_back: int, drift_analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Evaluar una ventana a partir de acumuladores diarios ordenados por fecha"""
+        
+        window = MetricAccumulator()
+        for _, accumulator in days:
+            window.merge(accumulator)
+        
+        total_predictions = window.values['total_predictions']
+        if total_predictions == 0:
             return {'error': 'No verification data found for evaluation'}
         
+        metrics = window.performance_metrics()
+        
+        if window.values['n'] == 0:
+            error_analysis = {'error': 'No feedback data for error analysis'}
+        else:
+            error_analysis = window.error_analysis()
+        
+        recommendations = self._generate_recommendations(metrics, drift_analysis, error_analysis)
+        
+        return {
+            'model_info': model_info,
+            'evaluation_period': {
+                'days': days_back,
+                'total_predictions': total_predictions,
+                'with_feedback': window.values['n'],
+                'daily_summaries': len(days)
+            },
+            'performance_metrics': metrics,
+            'drift_analysis': drift_analysis,
+            'error_analysis': error_analysis,
+            'recommendations': recommendations,
+            'evaluation_timestamp': datetime.now().isoformat()
+        }
+    
+    def evaluate_verifications(self, model_info: Dict, verifications, days_back: int,
+                               drift_analysis: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Evaluar un conjunto de verificaciones ya cargadas (lista de dicts o EvaluationFrame)
+
+        Sin drift_analysis (detectores persistidos de update_drift_monitor) el drift se estima sobre el frame
+        """
+        
+        if len(verifications) == 0:
+            return {'error': 'No verification data found for evaluation'}
+        
+        # Un solo frame columnar para todos los análisis
+        if isinstance(verifications, EvaluationFrame):
+            frame = verifications
+        else:
+            frame = EvaluationFrame.from_records(verifications)
+        
         # Calcular métricas
-        metrics = self._calculate_performance_metrics(verifications)
+        metrics = self._calculate_performance_metrics(frame)
         
         # Análisis de drift
-        drift_analysis = self._detect_performance_drift(verifications)
+        if drift_analysis is None:
+            drift_analysis = self._detect_performance_drift(frame)
         
         # Análisis de errores
-        error_analysis = self._analyze_prediction_errors(verifications)
+        error_analysis = self._analyze_prediction_errors(frame)
+        
+        # Métricas por segmento
+        slice_analysis = self.analyze_slices(frame)
         
         # Recomendaciones
-        recommendations = self._generate_recommendations(metrics, drift_analysis, error_analysis)
+        recommendations = self._generate_recommendations(metrics, drift_analysis, error_analysis, slice_analysis)
         
         return {
-            'model_info': dict(model_info),
+            'model_info': model_info,
             'evaluation_period': {
                 'days': days_back,
-                'total_predictions': len(verifications),
-                'with_feedback': len([v for v in verifications if v['expert_score'] is not None])
+                'total_predictions': len(frame),
+                'with_feedback': int(frame.has_feedback.sum())
             },
             'performance_metrics': metrics,
             'drift_analysis': drift_analysis,
             'error_analysis': error_analysis,
+            'slice_analysis': slice_analysis,
             'recommendations': recommendations,
             'evaluation_timestamp': datetime.now().isoformat()
         }
     
-    def _calculate_performance_metrics(self, verifications: List[Dict]) -> Dict[str, Any]:
+    def analyze_slices(self, frame: EvaluationFrame, dimensions: Optional[List[str]] = None,
+                       min_support: Optional[int] = None, top_k: Optional[int] = None,
+                       rank_by: str = 'accuracy') -> Dict[str, Any]:
+        """Métricas completas por tipo de restaurante, área, turno y empleado en una pasada agrupada"""
+        
+        segments, sums = slice_sums(frame, dimensions)
+        if not segments:
+            return {}
+        return slice_report(
+            segments, sums,
+            self.slice_min_support if min_support is None else min_support,
+            self.slice_top_k if top_k is None else top_k,
+            rank_by
+        )
+    
+    def _calculate_performance_metrics(self, frame: EvaluationFrame) -> Dict[str, Any]:
         """Calcular métricas de rendimiento"""
         
         # Filtrar verificaciones con feedback experto
-        with_feedback = [v for v in verifications if v['expert_score'] is not None]
+        with_feedback = frame.with_feedback()
         
-        if not with_feedback:
+        if len(with_feedback) == 0:
             return {'error': 'No expert feedback available for metric calculation'}
         
-        # Extraer scores
-        ai_scores = [v['ai_result']['score'] if v['ai_result'] and 'score' in v['ai_result'] else 0 
-                    for v in with_feedback]
-        expert_scores = [v['expert_score'] for v in with_feedback]
+        ai_scores = with_feedback.ai_score
+        expert_scores = with_feedback.expert_score
         
         # Convertir a clasificación binaria (pass/fail)
-        ai_predictions = [1 if score >= 80 else 0 for score in ai_scores]
-        expert_labels = [1 if score >= 80 else 0 for score in expert_scores]
+        ai_predictions = ai_scores >= PASS_THRESHOLD
+        expert_labels = expert_scores >= PASS_THRESHOLD
+        correct = ai_predictions == expert_labels
         
-        # Métricas básicas
-        accuracy = accuracy_score(expert_labels, ai_predictions)
-        precision, recall, f1, _ = precision_recall_fscore_support(
-            expert_labels, ai_predictions, average='binary', zero_division=0
-        )
+        # Métricas básicas desde la matriz de confusión
+        tp = int(np.count_nonzero(ai_predictions & expert_labels))
+        fp = int(np.count_nonzero(ai_predictions & ~expert_labels))
+        fn = int(np.count_nonzero(~ai_predictions & expert_labels))
+        tn = len(correct) - tp - fp - fn
+        
+        accuracy = correct.mean()
+        precision = tp / (tp + fp) if tp + fp > 0 else 0.0
+        recall = tp / (tp + fn) if tp + fn > 0 else 0.0
+        f1 = 2 * tp / (2 * tp + fp + fn) if 2 * tp + fp + fn > 0 else 0.0
         
         # Correlación de scores
         score_correlation = np.corrcoef(ai_scores, expert_scores)[0, 1] if len(ai_scores) > 1 else 0
         
         # Métricas de confianza
-        confidences = [v['confidence_score'] for v in with_feedback]
+        confidences = with_feedback.confidence
         avg_confidence = np.mean(confidences)
         
         # Análisis por rangos de confianza
-        high_conf_mask = np.array(confidences) >= 0.9
-        med_conf_mask = (np.array(confidences) >= 0.7) & (np.array(confidences) < 0.9)
-        low_conf_mask = np.array(confidences) < 0.7
-        
-        confidence_analysis = {
-            'high_confidence': {
-                'count': np.sum(high_conf_mask),
-                'accuracy': accuracy_score(
-                    np.array(expert_labels)[high_conf_mask], 
-                    np.array(ai_predictions)[high_conf_mask]
-                ) if np.sum(high_conf_mask) > 0 else 0
-            },
-            'medium_confidence': {
-                'count': np.sum(med_conf_mask),
-                'accuracy': accuracy_score(
-                    np.array(expert_labels)[med_conf_mask], 
-                    np.array(ai_predictions)[med_conf_mask]
-                ) if np.sum(med_conf_mask) > 0 else 0
-            },
-            'low_confidence': {
-                'count': np.sum(low_conf_mask),
-                'accuracy': accuracy_score(
-                    np.array(expert_labels)[low_conf_mask], 
-                    np.array(ai_predictions)[low_conf_mask]
-                ) if np.sum(low_conf_mask) > 0 else 0
-            }
+        bands = {
+            'high_confidence': confidences >= 0.9,
+            'medium_confidence': (confidences >= 0.7) & (confidences < 0.9),
+            'low_confidence': confidences < 0.7
         }
+        confidence_analysis = {}
+        for band, mask in bands.items():
+            count = int(np.count_nonzero(mask))
+            confidence_analysis[band] = {
+                'count': count,
+                'accuracy': correct[mask].mean() if count > 0 else 0
+            }
         
         return {
             'accuracy': round(accuracy, 4),
@@ -162,190 +1025,66 @@ class ModelEvaluator:
             'score_correlation': round(score_correlation, 4),
             'average_confidence': round(avg_confidence, 4),
             'confidence_analysis': confidence_analysis,
-            'confusion_matrix': confusion_matrix(expert_labels, ai_predictions).tolist(),
-            'sample_size': len(with_feedback)
+            'confusion_matrix': confusion_from_counts(tp, fp, fn, tn),
+            'sample_size': len(with_feedback),
+            'confidence_intervals': ScoreCells.from_scores(ai_scores, expert_scores).bootstrap(
+                processes=self.bootstrap_processes
+            )
         }
     
-    def _detect_performance_drift(self, verifications: List[Dict]) -> Dict[str, Any]:
-        """Detectar drift en el rendimiento del modelo"""
-        
-        # Ordenar por fecha
-        verifications_sorted = sorted(verifications, key=lambda x: x['created_at'])
-        
-        # Dividir en períodos
-        mid_point = len(verifications_sorted) // 2
-        early_period = verifications_sorted[:mid_point]
-        recent_period = verifications_sorted[mid_point:]
-        
-        # Calcular métricas para cada período
-        early_metrics = self._calculate_period_metrics(early_period)
-        recent_metrics = self._calculate_period_metrics(recent_period)
-        
-        # Detectar cambios significativos
-        drift_detected = False
-        significant_changes = []
-        
-        for metric in ['accuracy', 'confidence', 'score_correlation']:
-            if metric in early_metrics and metric in recent_metrics:
-                early_val = early_metrics[metric]
-                recent_val = recent_metrics[metric]
-                
-                if abs(recent_val - early_val) > 0.05:  # Umbral de 5%
-                    drift_detected = True
-                    significant_changes.append({
-                        'metric': metric,
-                        'early_value': early_val,
-                        'recent_value': recent_val,
-                        'change': recent_val - early_val,
-                        'change_percentage': ((recent_val - early_val) / early_val * 100) if early_val != 0 else 0
-                    })
+    def _detect_performance_drift(self, frame: EvaluationFrame) -> Dict[str, Any]:
+        """Detectar drift recorriendo la ventana en orden temporal con detectores en streaming"""
         
-        return {
-            'drift_detected': drift_detected,
-            'early_period': {
-                'count': len(early_period),
-                'metrics': early_metrics
-            },
-            'recent_period': {
-                'count': len(recent_period),
-                'metrics': recent_metrics
-            },
-            'significant_changes': significant_changes,
-            'drift_magnitude': max([abs(c['change']) for c in significant_changes]) if significant_changes else 0
-        }
-    
-    def _calculate_period_metrics(self, verifications: List[Dict]) -> Dict[str, float]:
-        """Calcular métricas para un período específico"""
-        
-        with_feedback = [v for v in verifications if v['expert_score'] is not None]
-        
-        if not with_feedback:
-            return {}
-        
-        ai_scores = [v['ai_result']['score'] if v['ai_result'] and 'score' in v['ai_result'] else 0 
-                    for v in with_feedback]
-        expert_scores = [v['expert_score'] for v in with_feedback]
-        confidences = [v['confidence_score'] for v in with_feedback]
-        
-        ai_predictions = [1 if score >= 80 else 0 for score in ai_scores]
-        expert_labels = [1 if score >= 80 else 0 for score in expert_scores]
+        monitor = DriftMonitor()
+        order = frame.chronological_order()
+        monitor.update_predictions(frame.created_at[order], frame.ai_score[order], frame.confidence[order])
         
-        return {
-            'accuracy': accuracy_score(expert_labels, ai_predictions) if len(expert_labels) > 0 else 0,
-            'confidence': np.mean(confidences) if confidences else 0,
-            'score_correlation': np.corrcoef(ai_scores, expert_scores)[0, 1] if len(ai_scores) > 1 else 0
-        }
+        with_feedback = order[frame.has_feedback[order]]
+        monitor.update_feedback(
+            frame.created_at[with_feedback],
+            frame.ai_score[with_feedback], frame.expert_score[with_feedback]
+        )
+        return monitor.report()
     
-    def _analyze_prediction_errors(self, verifications: List[Dict]) -> Dict[str, Any]:
-        """Analizar patrones en los errores de predicción"""
+    def _analyze_prediction_errors(self, frame: EvaluationFrame) -> Dict[str, Any]:
+        """Analizar patrones en los errores de predicción en una pasada por bloques con memoria acotada"""
         
-        with_feedback = [v for v in verifications if v['expert_score'] is not None]
+        with_feedback = frame.with_feedback()
         
-        if not with_feedback:
+        if len(with_feedback) == 0:
             return {'error': 'No feedback data for error analysis'}
         
-        errors = []
-        for v in with_feedback:
-            ai_score = v['ai_result']['score'] if v['ai_result'] and 'score' in v['ai_result'] else 0
-            expert_score = v['expert_score']
-            error = abs(ai_score - expert_score)
-            
-            errors.append({
-                'verification_id': v['id'],
-                'ai_score': ai_score,
-                'expert_score': expert_score,
-                'error': error,
-                'confidence': v['confidence_score'],
-                'created_at': v['created_at'],
-                'feedback': v.get('detailed_feedback', {})
-            })
-        
-        # Análisis estadístico de errores
-        error_values = [e['error'] for e in errors]
-        
-        # Identificar outliers
-        q75, q25 = np.percentile(error_values, [75, 25])
-        iqr = q75 - q25
-        outlier_threshold = q75 + 1.5 * iqr
-        outliers = [e for e in errors if e['error'] > outlier_threshold]
-        
-        # Patrones comunes en errores grandes
-        large_errors = [e for e in errors if e['error'] > 20]  # Errores > 20 puntos
+        accumulator = MetricAccumulator()
+        for start in range(0, len(with_feedback), ERROR_ANALYSIS_CHUNK):
+            chunk = slice(start, start + ERROR_ANALYSIS_CHUNK)
+            accumulator.update(
+                with_feedback.ai_score[chunk], with_feedback.expert_score[chunk], with_feedback.confidence[chunk],
+                ids=with_feedback.ids[chunk], created_at=with_feedback.created_at[chunk],
+                feedback=with_feedback.feedback[chunk] if with_feedback.feedback is not None else None
+            )
         
-        common_patterns = self._identify_error_patterns(large_errors)
-        
-        return {
-            'total_errors': len(errors),
-            'mean_absolute_error': np.mean(error_values),
-            'median_absolute_error': np.median(error_values),
-            'std_error': np.std(error_values),
-            'max_error': np.max(error_values),
-            'outliers': {
-                'count': len(outliers),
-                'threshold': outlier_threshold,
-                'examples': outliers[:3]  # Primeros 3 outliers
-            },
-            'large_errors': {
-                'count': len(large_errors),
-                'percentage': len(large_errors) / len(errors) * 100,
-                'common_patterns': common_patterns
-            },
-            'error_distribution': {
-                'q25': np.percentile(error_values, 25),
-                'q50': np.percentile(error_values, 50),
-                'q75': np.percentile(error_values, 75),
-                'q90': np.percentile(error_values, 90)
-            }
-        }
+        return accumulator.error_analysis()
     
-    def _identify_error_patterns(self, large_errors: List[Dict]) -> List[Dict]:
-        """Identificar patrones comunes en errores grandes"""
-        
-        patterns = []
-        
-        if not large_errors:
-            return patterns
-        
-        # Patrón 1: Errores con alta confianza (falsos positivos del modelo)
-        high_conf_errors = [e for e in large_errors if e['confidence'] > 0.8]
-        if high_conf_errors:
-            patterns.append({
-                'pattern': 'high_confidence_errors',
-                'description': 'Errores grandes con alta confianza del modelo',
-                'count': len(high_conf_errors),
-                'avg_error': np.mean([e['error'] for e in high_conf_errors]),
-                'avg_confidence': np.mean([e['confidence'] for e in high_conf_errors])
-            })
-        
-        # Patrón 2: Sobreestimación sistemática
-        overestimations = [e for e in large_errors if e['ai_score'] > e['expert_score']]
-        if len(overestimations) > len(large_errors) * 0.6:  # Más del 60%
-            patterns.append({
-                'pattern': 'systematic_overestimation',
-                'description': 'El modelo tiende a sobreestimar la calidad',
-                'count': len(overestimations),
-                'avg_overestimation': np.mean([e['ai_score'] - e['expert_score'] for e in overestimations])
-            })
-        
-        # Patrón 3: Subestimación sistemática
-        underestimations = [e for e in large_errors if e['ai_score'] < e['expert_score']]
-        if len(underestimations) > len(large_errors) * 0.6:
-            patterns.append({
-                'pattern': 'systematic_underestimation',
-                'description': 'El modelo tiende a subestimar la calidad',
-                'count': len(underestimations),
-                'avg_underestimation': np.mean([e['expert_score'] - e['ai_score'] for e in underestimations])
-            })
-        
-        return patterns
-    
-    def _generate_recommendations(self, metrics: Dict, drift_analysis: Dict, error_analysis: Dict) -> List[Dict]:
+    def _generate_recommendations(self, metrics: Dict, drift_analysis: Dict, error_analysis: Dict,
+                                  slice_analysis: Optional[Dict] = None) -> List[Dict]:
         """Generar recomendaciones basadas en el análisis"""
         
         recommendations = []
+        intervals = metrics.get('confidence_intervals', {})
+        uncertain = []
+        
+        def below(metric: str, threshold: float) -> bool:
+            """Alertar solo si todo el intervalo está bajo el umbral; sin intervalo, por el valor puntual"""
+            if metrics.get(metric, 0) >= threshold:
+                return False
+            interval = intervals.get(metric)
+            if interval and interval['upper'] >= threshold:
+                uncertain.append(f"{metric} {metrics[metric]:.3f} (IC: {interval['lower']:.3f}-{interval['upper']:.3f})")
+                return False
+            return True
         
         # Recomendaciones basadas en métricas
-        if metrics.get('accuracy', 0) < 0.8:
+        if below('accuracy', 0.8):
             recommendations.append({
                 'priority': 'high',
                 'category': 'performance',
@@ -358,7 +1097,7 @@ class ModelEvaluator:
                 ]
             })
         
-        if metrics.get('score_correlation', 0) < 0.7:
+        if below('score_correlation', 0.7):
             recommendations.append({
                 'priority': 'medium',
                 'category': 'calibration',
@@ -371,6 +1110,37 @@ class ModelEvaluator:
                 ]
             })
         
+        if uncertain:
+            recommendations.append({
+                'priority': 'low',
+                'category': 'sample_size',
+                'title': 'Métricas Bajo el Umbral sin Significancia',
+                'description': f"El intervalo de confianza aún incluye el umbral: {', '.join(uncertain)}",
+                'actions': [
+                    'Recolectar más feedback experto antes de reentrenar',
+                    'Ampliar la ventana de evaluación'
+                ]
+            })
+        
+        # Recomendaciones basadas en segmentos con soporte suficiente
+        weak_slices = [
+            s for s in (slice_analysis or {}).get('worst_slices', [])
+            if s['accuracy'] is not None and s['accuracy'] < 0.8
+        ]
+        if weak_slices and metrics.get('accuracy', 0) >= 0.8:
+            recommendations.append({
+                'priority': 'medium',
+                'category': 'segment_performance',
+                'title': 'Segmentos con Precisión Baja',
+                'description': 'Precisión bajo el 80% en: ' + ', '.join(
+                    f"{s['dimension']}={s['value']} ({s['accuracy']:.2%}, n={s['sample_size']})" for s in weak_slices[:3]
+                ),
+                'actions': [
+                    'Ampliar los datos de entrenamiento de esos segmentos',
+                    'Revisar las anotaciones de expertos en esos segmentos'
+                ]
+            })
+        
         # Recomendaciones basadas en drift
         if drift_analysis.get('drift_detected', False):
             recommendations.append({
@@ -430,13 +1200,174 @@ class ModelEvaluator:
         
         return recommendations
     
-    def generate_evaluation_report(self, model_id: str, output_path: str = None) -> str:
-        """Generar reporte completo de evaluación"""
+    def evaluate_fleet(self, days_back: int = 30, output_dir: str = '.', io_workers: int = 4,
+                       processes: Optional[int] = None) -> Dict[str, Any]:
+        """Evaluar todos los modelos desplegados: lectura por hilos, métricas en procesos"""
+        
+        fleet_start = datetime.now()
+        os.makedirs(output_dir, exist_ok=True)
+        
+        with self.db_connection.cursor() as cursor:
+            cursor.execute(MODEL_INFO_SQL + " WHERE sam.deployment_status = 'deployed'")
+            models = [dict(row) for row in cursor.fetchall()]
+            source = self.verification_source(cursor)
+        self.db_connection.commit()
+        
+        if not models:
+            logger.warning("No hay modelos desplegados para evaluar")
+            return {'models': [], 'total_wall_seconds': 0.0}
+        
+        models_by_type = {}
+        for model_info in models:
+            models_by_type.setdefault(model_info['verification_category'], []).append(model_info)
+        
+        # Repartir los tipos de verificación entre hilos; cada hilo hace una consulta por lotes
+        verification_types = sorted(models_by_type)
+        shards = [verification_types[i::io_workers] for i in range(min(io_workers, len(verification_types)))]
+        
+        timings = {}
+        results = []
+        # spawn: los procesos hijos no heredan la conexión abierta a PostgreSQL
+        with ThreadPoolExecutor(max_workers=len(shards)) as io_pool, \
+                ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn')) as cpu_pool:
+            fetches = [io_pool.submit(self._fetch_fleet_frames, shard, days_back, source) for shard in shards]
+            # Detectores persistidos y cola de reentrenamiento por modelo, como en evaluate_incremental
+            drift_updates = {
+                model_info['id']: io_pool.submit(self._update_fleet_drift, model_info, days_back)
+                for model_info in models
+            }
+            
+            evaluations = {}
+            for fetch in as_completed(fetches):
+                frames, fetch_seconds = fetch.result()
+                for verification_type in frames:
+                    for model_info in models_by_type[verification_type]:
+                        drift_analysis, drift_seconds = drift_updates[model_info['id']].result()
+                        timings[model_info['id']] = {'fetch_seconds': fetch_seconds, 'drift_seconds': drift_seconds}
+                        future = cpu_pool.submit(_evaluate_frame_worker, model_info, frames[verification_type],
+                                                 days_back, drift_analysis)
+                        evaluations[future] = model_info
+                for verification_type in set(shards[fetches.index(fetch)]) - set(frames):
+                    for model_info in models_by_type[verification_type]:
+                        timings[model_info['id']] = {'fetch_seconds': fetch_seconds}
+                        results.append((model_info, {'error': 'No verification data found for evaluation'}))
+            
+            writes = {}
+            for future in as_completed(evaluations):
+                model_info = evaluations[future]
+                evaluation, evaluation_seconds = future.result()
+                timings[model_info['id']]['evaluation_seconds'] = evaluation_seconds
+                results.append((model_info, evaluation))
+            
+            for model_info, evaluation in results:
+                output_path = os.path.join(output_dir, f"model_evaluation_report_{model_info['id']}.json")
+                writes[io_pool.submit(self._write_report, model_info['id'], evaluation, output_path)] = model_info
+            
+            report_paths = {}
+            for future in as_completed(writes):
+                model_info = writes[future]
+                report_paths[model_info['id']], write_seconds = future.result()
+                timings[model_info['id']]['report_seconds'] = write_seconds
+        
+        summary = []
+        for model_info, evaluation in results:
+            metrics = evaluation.get('performance_metrics', {})
+            summary.append({
+                'model_id': model_info['id'],
+                'model_name': model_info.get('model_name'),
+                'verification_category': model_info['verification_category'],
+                'error': evaluation.get('error'),
+                'accuracy': metrics.get('accuracy'),
+                'sample_size': metrics.get('sample_size', 0),
+                'drift_detected': evaluation.get('drift_analysis', {}).get('drift_detected', False),
+                'high_priority_recommendations': len([
+                    r for r in evaluation.get('recommendations', []) if r.get('priority') == 'high'
+                ]),
+                'report_path': report_paths.get(model_info['id']),
+                'timings': timings.get(model_info['id'], {})
+            })
+        
+        fleet_report = {
+            'generated_at': datetime.now().isoformat(),
+            'days_back': days_back,
+            'models_evaluated': len(summary),
+            'total_wall_seconds': (datetime.now() - fleet_start).total_seconds(),
+            'models': sorted(summary, key=lambda m: str(m['model_id']))
+        }
+        fleet_path = os.path.join(output_dir, f"fleet_evaluation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        write_report(fleet_report, fleet_path)
+        fleet_report['report_path'] = fleet_path
+        
+        logger.info(f"Fleet evaluation saved to {fleet_path} ({fleet_report['total_wall_seconds']:.1f}s)")
+        return fleet_report
+    
+    def _update_fleet_drift(self, model_info: Dict, days_back: int) -> Tuple[Optional[Dict[str, Any]], float]:
+        """Actualizar los detectores de drift de un modelo con su propia conexión (usado desde hilos)
+
+        Si falla, el modelo se evalúa con el drift estimado sobre el frame (None)
+        """
+        
+        start = datetime.now()
+        connection = self._connect_to_database()
+        try:
+            with connection.cursor() as cursor:
+                drift_analysis = self.update_drift_monitor(
+                    cursor, model_info['id'], model_info['verification_category'], days_back
+                )
+            connection.commit()
+        except Exception as e:
+            connection.rollback()
+            logger.error(f"Error actualizando el drift de {model_info['id']}: {e}")
+            drift_analysis = None
+        finally:
+            connection.close()
+        return drift_analysis, (datetime.now() - start).total_seconds()
+    
+    def _fetch_fleet_frames(self, verification_types: List[str], days_back: int,
+                            source: str = BASE_VERIFICATIONS_SQL) -> Tuple[Dict[str, EvaluationFrame], float]:
+        """Leer las verificaciones de varios tipos con una consulta y construir un frame por tipo"""
+        
+        start = datetime.now()
+        connection = self._connect_to_database()
+        columns = {}
+        try:
+            # Cursor de servidor con tuplas: las filas llegan por lotes sin materializar dicts
+            with connection.cursor(name='fleet_verifications', cursor_factory=psycopg2.extensions.cursor) as cursor:
+                cursor.itersize = 50_000
+                cursor.execute(FLEET_VERIFICATIONS_SQL.replace('{source}', source), (verification_types, days_back))
+                for verification_type, row_id, created_at, confidence, ai_score, expert_score in cursor:
+                    type_columns = columns.setdefault(verification_type, ([], [], [], [], []))
+                    type_columns[0].append(row_id)
+                    type_columns[1].append(created_at)
+                    type_columns[2].append(confidence)
+                    type_columns[3].append(ai_score)
+                    type_columns[4].append(np.nan if expert_score is None else expert_score)
+        finally:
+            connection.close()
+        
+        frames = {}
+        for verification_type, (ids, created_at, confidence, ai_score, expert_score) in columns.items():
+            created = np.empty(len(created_at), dtype=object)
+            created[:] = created_at
+            identifiers = np.empty(len(ids), dtype=object)
+            identifiers[:] = ids
+            frames[verification_type] = EvaluationFrame(
+                np.array(ai_score, dtype=np.float64), np.array(expert_score, dtype=np.float64),
+                np.array(confidence, dtype=np.float64), created, identifiers
+            )
+        return frames, (datetime.now() - start).total_seconds()
+    
+    def _write_report(self, model_id: str, evaluation: Dict[str, Any], output_path: str) -> Tuple[str, float]:
+        """Escribir el reporte de un modelo (usado desde hilos en modo flota)"""
         
-        evaluation = self.evaluate_model_performance(model_id)
+        start = datetime.now()
+        write_report(self._build_report(model_id, evaluation), output_path)
+        return output_path, (datetime.now() - start).total_seconds()
+    
+    def _build_report(self, model_id: str, evaluation: Dict[str, Any]) -> Dict[str, Any]:
+        """Estructura del reporte completo a partir de una evaluación"""
         
-        # Crear reporte en formato JSON
-        report = {
+        return {
             'report_metadata': {
                 'generated_at': datetime.now().isoformat(),
                 'model_id': model_id,
@@ -444,17 +1375,32 @@ class ModelEvaluator:
             },
             'executive_summary': self._create_executive_summary(evaluation),
             'detailed_analysis': evaluation,
-            'action_plan': self._create_action_plan(evaluation['recommendations'])
+            'action_plan': self._create_action_plan(evaluation.get('recommendations', []))
         }
+    
+    def generate_evaluation_report(self, model_id: str, output_path: str = None, days_back: int = 30,
+                                   evaluation: Optional[Dict[str, Any]] = None, report_format: str = 'json',
+                                   figure_processes: Optional[int] = None) -> str:
+        """Generar reporte completo de evaluación (reutiliza una evaluación ya hecha si se pasa)"""
+        
+        if evaluation is None:
+            evaluation = self.evaluate_model_performance(model_id, days_back)
+        
+        report = self._build_report(model_id, evaluation)
         
         # Guardar reporte
         if output_path is None:
-            output_path = f"model_evaluation_report_{model_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            output_path = f"model_evaluation_report_{model_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{report_format}"
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=2, ensure_ascii=False, default=str)
+        if report_format == 'html':
+            # El stack de gráficos solo se carga aquí (y en los workers de figuras)
+            from report_html import write_html_report
+            return write_html_report(report, output_path, figure_processes)
         
-        logger.info(f"Evaluation report saved to {output_path}")
+        written = write_report(report, output_path)
+        
+        logger.info(f"Evaluation report saved to {output_path} ({written['bytes'] / 1e6:.1f} MB, "
+                    f"{len(written['sidecars'])} sidecars, {written['seconds']:.2f}s)")
         return output_path
     
     def _create_executive_summary(self, evaluation: Dict) -> Dict[str, Any]:
@@ -541,6 +1487,8 @@ class ModelEvaluator:
             'calibration': 16,
             'error_reduction': 32,
             'confidence_calibration': 20,
+            'sample_size': 8,
+            'segment_performance': 24,
             'maintenance': 8
         }
         
@@ -553,36 +1501,252 @@ class ModelEvaluator:
         base = base_hours.get(category, 16)
         return int(base * multiplier.get(priority, 1.0))
 
+def _evaluate_frame_worker(model_info: Dict, frame: EvaluationFrame, days_back: int,
+                           drift_analysis: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], float]:
+    """Evaluar un frame en un proceso del pool (sin conexión a la base de datos)"""
+    
+    start = datetime.now()
+    evaluation = ModelEvaluator(connect=False).evaluate_verifications(model_info, frame, days_back, drift_analysis)
+    return evaluation, (datetime.now() - start).total_seconds()
+
+def evaluate_verifications_file(args):
+    """Evaluar verificaciones sintéticas desde archivo, sin conexión a la base de datos"""
+    
+    from synthetic_data import load_batch
+    
+    evaluator = ModelEvaluator(connect=False)
+    if args.bootstrap_processes:
+        evaluator.bootstrap_processes = args.bootstrap_processes
+    if args.slice_min_support is not None:
+        evaluator.slice_min_support = args.slice_min_support
+    if args.slice_top_k is not None:
+        evaluator.slice_top_k = args.slice_top_k
+    
+    logger.info(f"Cargando verificaciones desde {args.verifications_file}...")
+    start = datetime.now()
+    kind, batch = load_batch(args.verifications_file)
+    if kind != 'verification':
+        raise ValueError(f"{args.verifications_file} contiene datos '{kind}', se esperaban verificaciones")
+    verifications = EvaluationFrame.from_batch(batch)
+    load_seconds = (datetime.now() - start).total_seconds()
+    
+    start = datetime.now()
+    evaluation = evaluator.evaluate_verifications({'id': args.model_id}, verifications, args.days_back)
+    evaluation_seconds = (datetime.now() - start).total_seconds()
+    
+    if args.include_rows:
+        # Arrays por fila; write_report los envía al sidecar Parquet si son grandes
+        evaluation['rows'] = {
+            'verification_id': verifications.ids,
+            'ai_score': verifications.ai_score,
+            'expert_score': verifications.expert_score,
+            'confidence': verifications.confidence,
+            'created_at': verifications.created_at
+        }
+    
+    if args.format == 'html':
+        from report_html import write_html_report
+        output_path = args.output_report or f"model_evaluation_{args.model_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
+        write_html_report(evaluator._build_report(args.model_id, evaluation), output_path, args.figure_processes)
+        print(f"\nReporte HTML guardado en: {output_path}")
+        return
+    
+    output_path = args.output_report or f"model_evaluation_{args.model_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    written = write_report(evaluation, output_path)
+    
+    print("\n=== EVALUACIÓN DESDE ARCHIVO ===")
+    print(f"Verificaciones: {len(verifications)}")
+    print(f"Carga: {load_seconds:.2f}s, evaluación: {evaluation_seconds:.2f}s")
+    print(f"Precisión: {evaluation.get('performance_metrics', {}).get('accuracy', 0):.2%}")
+    print(f"\nResultado guardado en: {output_path} ({written['bytes'] / 1e6:.1f} MB, "
+          f"escritura {written['seconds']:.2f}s)")
+    for table, sidecar_path in written['sidecars'].items():
+        print(f"Sidecar {table}: {sidecar_path}")
+
+def benchmark_evaluation(rows: int = 1_000_000, seed: int = 42) -> Dict[str, Any]:
+    """Medir la evaluación desde dicts y desde el lote columnar, comprobando que coinciden"""
+    
+    from synthetic_data import SyntheticDataGenerator, batch_to_records
+    
+    evaluator = ModelEvaluator(connect=False)
+    batch = SyntheticDataGenerator(seed=seed).batch('verification', rows)
+    records = batch_to_records(batch, 'verification')
+    
+    timings = {}
+    results = {}
+    for name, build in (('records', lambda: EvaluationFrame.from_records(records)),
+                        ('columnar', lambda: EvaluationFrame.from_batch(batch))):
+        start = datetime.now()
+        frame = build()
+        build_seconds = (datetime.now() - start).total_seconds()
+        
+        start = datetime.now()
+        results[name] = evaluator.evaluate_verifications({'id': 'benchmark'}, frame, 30)
+        timings[name] = {
+            'build_seconds': build_seconds,
+            'evaluation_seconds': (datetime.now() - start).total_seconds()
+        }
+    
+    sections = ['performance_metrics', 'drift_analysis', 'error_analysis', 'slice_analysis']
+    matches = all(results['records'][key] == results['columnar'][key] for key in sections)
+    
+    print(f"\n=== BENCHMARK DE EVALUACIÓN ({rows} verificaciones) ===")
+    for name, timing in timings.items():
+        print(f"{name}: construcción {timing['build_seconds']:.2f}s, evaluación {timing['evaluation_seconds']:.2f}s")
+    print(f"Resultados idénticos: {'sí' if matches else 'NO'}")
+    
+    return {'rows': rows, 'timings': timings, 'results_match': matches}
+
+def check_startup(budget_seconds: float = STARTUP_BUDGET_SECONDS, repeat: int = 3) -> Dict[str, Any]:
+    """Medir en un intérprete limpio la importación de este módulo y los stacks pesados que arrastra"""
+    
+    probe = (
+        "import sys, time, json; start = time.perf_counter(); import model_evaluation; "
+        "print(json.dumps({'seconds': time.perf_counter() - start, "
+        f"'heavy': [m for m in {list(HEAVY_MODULES)!r} if m in sys.modules]}}))"
+    )
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    runs = [
+        json.loads(subprocess.run(
+            [sys.executable, '-c', probe], cwd=script_dir, capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1])
+        for _ in range(repeat)
+    ]
+    seconds = min(run['seconds'] for run in runs)
+    heavy = sorted({module for run in runs for module in run['heavy']})
+    passed = seconds <= budget_seconds and not heavy
+    
+    print("\n=== ARRANQUE DEL CAMINO JSON ===")
+    print(f"Importación de model_evaluation: {seconds:.3f}s (límite {budget_seconds:.2f}s)")
+    print(f"Stacks pesados cargados: {', '.join(heavy) if heavy else 'ninguno'}")
+    print(f"Resultado: {'OK' if passed else 'REGRESIÓN'}")
+    
+    return {'seconds': seconds, 'budget_seconds': budget_seconds, 'heavy_modules': heavy, 'passed': passed}
+
 def main():
     """Función principal para evaluación de modelos"""
     
     import argparse
     
     parser = argparse.ArgumentParser(description='Evaluar modelos especializados')
-    parser.add_argument('--model-id', required=True, help='ID del modelo a evaluar')
+    parser.add_argument('--model-id', help='ID del modelo a evaluar')
+    parser.add_argument('--verifications-file',
+                       help='Archivo generado por synthetic_data.py para evaluar sin base de datos')
     parser.add_argument('--days-back', type=int, default=30, help='Días hacia atrás para análisis')
+    parser.add_argument('--fetch-rows', action='store_true',
+                       help='Traer las filas y calcular en Python en lugar de agregar en SQL')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Agregar solo datos nuevos a las estadísticas diarias y combinar la ventana')
     parser.add_argument('--output-report', help='Ruta para guardar reporte')
+    parser.add_argument('--include-rows', action='store_true',
+                        help='Incluir los arrays por fila en el reporte (sidecar Parquet si son grandes)')
     parser.add_argument('--format', choices=['json', 'html'], default='json', help='Formato del reporte')
+    parser.add_argument('--figure-processes', type=int,
+                        help='Procesos para renderizar las figuras del reporte HTML (1 = en el proceso actual)')
+    parser.add_argument('--experiments', action='store_true',
+                       help='Actualizar los tests secuenciales de los experimentos A/B en curso y salir')
+    parser.add_argument('--daemon', action='store_true',
+                       help='Evaluación continua de los modelos desplegados (opciones en evaluation_daemon.py)')
+    parser.add_argument('--fleet', action='store_true',
+                       help='Evaluar todos los modelos desplegados en una sola ejecución')
+    parser.add_argument('--output-dir', default='.', help='Directorio de reportes en modo flota')
+    parser.add_argument('--io-workers', type=int, default=4, help='Hilos de lectura en modo flota')
+    parser.add_argument('--processes', type=int, help='Procesos para el cálculo de métricas en modo flota')
+    parser.add_argument('--slice-min-support', type=int, help='Feedback mínimo para reportar un segmento')
+    parser.add_argument('--slice-top-k', type=int, help='Número de peores segmentos a reportar')
+    parser.add_argument('--bootstrap-processes', type=int,
+                       help='Procesos para los remuestreos bootstrap (por defecto, en el proceso actual)')
+    parser.add_argument('--benchmark-rows', type=int,
+                       help='Medir la evaluación sobre N verificaciones sintéticas y salir')
+    parser.add_argument('--check-startup', action='store_true',
+                       help='Verificar el tiempo de importación del camino JSON y salir (código 1 si hay regresión)')
+    parser.add_argument('--startup-budget', type=float, default=STARTUP_BUDGET_SECONDS,
+                       help='Segundos máximos de importación para --check-startup')
     
     args = parser.parse_args()
     
+    if args.check_startup:
+        if not check_startup(args.startup_budget)['passed']:
+            raise SystemExit(1)
+        return
+    
+    if args.benchmark_rows:
+        benchmark_evaluation(args.benchmark_rows)
+        return
+    
+    if args.experiments:
+        print("\n=== EXPERIMENTOS A/B ===")
+        for result in ModelEvaluator().update_experiments():
+            arms = result['arms']
+            accuracy = ', '.join(
+                f"{arm} {values['accuracy']:.2%} (n={values['samples']})" if values['accuracy'] is not None
+                else f"{arm} sin datos"
+                for arm, values in arms.items()
+            )
+            print(f"{result['experiment_id']}: {accuracy}; p={result['p_value']:.4f}, "
+                  f"decisión {result['decision'] or 'en curso'}")
+        return
+    
+    if args.daemon:
+        ModelEvaluator(connect=False).run_daemon(
+            model_ids=[args.model_id] if args.model_id else None, days_back=args.days_back
+        )
+        return
+    
+    if args.fleet:
+        fleet_report = ModelEvaluator().evaluate_fleet(
+            args.days_back, args.output_dir, args.io_workers, args.processes
+        )
+        print("\n=== EVALUACIÓN DE FLOTA ===")
+        for model in fleet_report['models']:
+            timings = model['timings']
+            status = model['error'] or f"precisión {model['accuracy']:.2%}"
+            print(f"{model['model_name']} ({model['verification_category']}): {status}, "
+                  f"lectura {timings.get('fetch_seconds', 0):.2f}s, "
+                  f"evaluación {timings.get('evaluation_seconds', 0):.2f}s")
+        print(f"Tiempo total: {fleet_report['total_wall_seconds']:.2f}s")
+        if fleet_report.get('report_path'):
+            print(f"\nReporte combinado guardado en: {fleet_report['report_path']}")
+        return
+    
+    if not args.model_id:
+        parser.error('--model-id es obligatorio salvo con --fleet o --benchmark-rows')
+    
+    if args.verifications_file:
+        evaluate_verifications_file(args)
+        return
+    
     evaluator = ModelEvaluator()
+    if args.bootstrap_processes:
+        evaluator.bootstrap_processes = args.bootstrap_processes
+    if args.slice_min_support is not None:
+        evaluator.slice_min_support = args.slice_min_support
+    if args.slice_top_k is not None:
+        evaluator.slice_top_k = args.slice_top_k
     
     try:
         # Evaluar modelo
         logger.info(f"Evaluando modelo {args.model_id}...")
-        evaluation = evaluator.evaluate_model_performance(args.model_id, args.days_back)
+        evaluation = evaluator.evaluate_model_performance(
+            args.model_id, args.days_back, aggregate_in_sql=not args.fetch_rows, incremental=args.incremental
+        )
         
         # Generar reporte
-        report_path = evaluator.generate_evaluation_report(args.model_id, args.output_report)
+        report_path = evaluator.generate_evaluation_report(
+            args.model_id, args.output_report, args.days_back, evaluation=evaluation,
+            report_format=args.format, figure_processes=args.figure_processes
+        )
         
         # Mostrar resumen
         metrics = evaluation.get('performance_metrics', {})
-        print(f"\n=== RESUMEN DE EVALUACIÓN ===")
+        print("\n=== RESUMEN DE EVALUACIÓN ===")
         print(f"Modelo: {args.model_id}")
         print(f"Período: {args.days_back} días")
         print(f"Predicciones analizadas: {metrics.get('sample_size', 0)}")
         print(f"Precisión: {metrics.get('accuracy', 0):.2%}")
+        accuracy_ci = metrics.get('confidence_intervals', {}).get('accuracy')
+        if accuracy_ci:
+            print(f"  IC 95%: {accuracy_ci['lower']:.2%} - {accuracy_ci['upper']:.2%}")
         print(f"Confianza promedio: {metrics.get('average_confidence', 0):.3f}")
         print(f"Correlación con expertos: {metrics.get('score_correlation', 0):.3f}")
         
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Sketches de memoria acotada para el análisis de errores de predicción
+KLL para cuantiles del error absoluto y reservorio acotado de outliers;
+ambos se combinan entre días para responder cualquier ventana
+
+Precisión: con k=200 el error de rango normalizado de KLL es <= 1.7/k (~0.85%)
+con alta probabilidad; el cuantil devuelto es siempre un valor observado.
+Se comprueba con `python quantile_sketch.py --check`.
+"""
+
+import math
+import hashlib
+import logging
+from typing import Dict, List, Any, Optional, Sequence
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+RANK_ERROR_FACTOR = 1.7  # Cota documentada: error de rango normalizado <= RANK_ERROR_FACTOR / k
+
+
+class KLLSketch:
+    """Sketch KLL combinable para cuantiles con memoria O(k)"""
+
+    def __init__(self, k: int = 200, c: float = 2 / 3, state: Optional[Dict] = None):
+        self.k = k
+        self.c = c
+        self.n = 0
+        self.min = None
+        self.max = None
+        self.compactions = 0
+        self.levels = [np.empty(0)]
+        if state:
+            self.k = state['k']
+            self.n = state['n']
+            self.min = state['min']
+            self.max = state['max']
+            self.compactions = state['compactions']
+            self.levels = [np.asarray(level, dtype=np.float64) for level in state['levels']]
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - 1 - level
+        return max(2, int(math.ceil(self.k * self.c ** depth)))
+
+    def _offset(self) -> int:
+        """Bit pseudoaleatorio determinista para elegir la mitad que sube de nivel"""
+        self.compactions += 1
+        return (self.compactions * 0x9E3779B97F4A7C15 >> 32) & 1
+
+    def _compress(self):
+        while True:
+            level = next((h for h, items in enumerate(self.levels) if len(items) > self._capacity(h)), None)
+            if level is None:
+                return
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+
+            items = np.sort(self.levels[level])
+            keep = items[:len(items) % 2]
+            items = items[len(items) % 2:]
+            promoted = items[self._offset()::2]
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate((self.levels[level + 1], promoted))
+
+    def update(self, values: Sequence[float]) -> 'KLLSketch':
+        """Añadir valores (un lote en una pasada)"""
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return self
+        self.n += len(values)
+        batch_min, batch_max = float(values.min()), float(values.max())
+        self.min = batch_min if self.min is None else min(self.min, batch_min)
+        self.max = batch_max if self.max is None else max(self.max, batch_max)
+        # Entrar por bloques de k valores: un lote grande compactado de golpe vaciaría los niveles bajos
+        start = 0
+        while start < len(values):
+            room = max(self.k, self._capacity(0) - len(self.levels[0]) + 1)
+            self.levels[0] = np.concatenate((self.levels[0], values[start:start + room]))
+            self._compress()
+            start += room
+        return self
+
+    def merge(self, other: 'KLLSketch') -> 'KLLSketch':
+        """Combinar con otro sketch (p. ej. de otro día)"""
+        if other.n == 0:
+            return self
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate((self.levels[h], items))
+        self.n += other.n
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self.compactions += other.compactions
+        self._compress()
+        return self
+
+    def _weighted_items(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h, dtype=np.int64) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs: Sequence[float]) -> List[float]:
+        """Cuantiles aproximados (q en [0, 1]); los extremos son exactos"""
+        if self.n == 0:
+            return [float('nan')] * len(qs)
+        items, cumulative = self._weighted_items()
+        result = []
+        for q in qs:
+            if q <= 0:
+                result.append(self.min)
+            elif q >= 1:
+                result.append(self.max)
+            else:
+                index = int(np.searchsorted(cumulative, q * cumulative[-1], side='left'))
+                result.append(float(items[min(index, len(items) - 1)]))
+        return result
+
+    def quantile(self, q: float) -> float:
+        return self.quantiles([q])[0]
+
+    def rank(self, value: float) -> int:
+        """Número estimado de valores <= value"""
+        if self.n == 0:
+            return 0
+        items, cumulative = self._weighted_items()
+        index = int(np.searchsorted(items, value, side='right'))
+        return int(cumulative[index - 1]) if index > 0 else 0
+
+    def count_above(self, value: float) -> int:
+        """Número estimado de valores > value"""
+        return self.n - self.rank(value)
+
+    def size(self) -> int:
+        return int(sum(len(level) for level in self.levels))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'k': self.k,
+            'n': self.n,
+            'min': self.min,
+            'max': self.max,
+            'compactions': self.compactions,
+            'levels': [level.tolist() for level in self.levels]
+        }
+
+
+def _uniform(identifier) -> float:
+    """Uniforme pseudoaleatoria estable por fila: la misma fila tiene el mismo valor en cualquier día o proceso"""
+    digest = hashlib.blake2b(str(identifier).encode(), digest_size=8).digest()
+    return (int.from_bytes(digest, 'big') + 0.5) / 2 ** 64
+
+
+def json_value(value):
+    """Convertir escalares NumPy, UUIDs y fechas a valores serializables en JSON"""
+    if hasattr(value, 'item'):
+        value = value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+class OutlierReservoir:
+    """Muestra acotada de filas con error grande, ponderada por error (A-Res), combinable"""
+
+    def __init__(self, size: int = 32, state: Optional[Dict] = None):
+        self.size = size
+        self.seen = 0
+        self.items = []
+        if state:
+            self.size = state['size']
+            self.seen = state['seen']
+            self.items = state['items']
+
+    def add(self, ids: Sequence, ai_scores: np.ndarray, expert_scores: np.ndarray, errors: np.ndarray,
+            confidences: np.ndarray, created_at: Sequence, feedback: Optional[Sequence] = None) -> 'OutlierReservoir':
+        """Añadir filas candidatas; solo las que entran en la muestra se materializan como dicts"""
+        self.seen += len(errors)
+        if len(errors) == 0:
+            return self
+
+        # Clave -ln(u)/error: las filas con más error tienen más probabilidad de quedarse
+        uniforms = np.fromiter((_uniform(i) for i in ids), dtype=np.float64, count=len(errors))
+        keys = -np.log(uniforms) / np.maximum(errors, 1e-9)
+        selected = np.argsort(keys, kind='stable')[:self.size]
+
+        for i in selected:
+            self.items.append({
+                'verification_id': json_value(ids[i]),
+                'ai_score': float(ai_scores[i]),
+                'expert_score': float(expert_scores[i]),
+                'error': float(errors[i]),
+                'confidence': float(confidences[i]),
+                'created_at': json_value(created_at[i]),
+                'feedback': feedback[i] if feedback is not None else {},
+                'sample_key': float(keys[i])
+            })
+        self._truncate()
+        return self
+
+    def merge(self, other: 'OutlierReservoir') -> 'OutlierReservoir':
+        self.seen += other.seen
+        self.items.extend(other.items)
+        self._truncate()
+        return self
+
+    def _truncate(self):
+        unique = {str(item['verification_id']): item for item in self.items}
+        self.items = sorted(unique.values(), key=lambda item: item['sample_key'])[:self.size]
+
+    def examples(self, threshold: float, limit: int = 3) -> List[Dict[str, Any]]:
+        """Ejemplos más recientes de la muestra con error por encima del umbral"""
+        selected = [item for item in self.items if item['error'] > threshold]
+        selected.sort(key=lambda item: str(item['created_at']), reverse=True)
+        return [{key: value for key, value in item.items() if key != 'sample_key'} for item in selected[:limit]]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'size': self.size, 'seen': self.seen, 'items': self.items}
+
+
+def check_accuracy(rows: int = 1_000_000, k: int = 200, partitions: int = 30, seed: int = 42) -> Dict[str, Any]:
+    """Comparar cuantiles del sketch (construido por días y combinado) con np.percentile exacto"""
+
+    rng = np.random.default_rng(seed)
+    datasets = {
+        # Errores absolutos enteros como los de scores 0-100, y una distribución continua con cola
+        'integer_errors': np.abs(np.round(rng.normal(0, 8, size=rows))),
+        'continuous_lognormal': rng.lognormal(1.5, 0.8, size=rows)
+    }
+    qs = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+    bound = RANK_ERROR_FACTOR / k
+
+    results = {}
+    for name, values in datasets.items():
+        merged = KLLSketch(k)
+        for part in np.array_split(values, partitions):
+            merged.merge(KLLSketch(k, state=KLLSketch(k).update(part).to_dict()))
+
+        sorted_values = np.sort(values)
+        worst = 0.0
+        per_quantile = {}
+        for q, estimate in zip(qs, merged.quantiles(qs)):
+            # Error de rango: distancia entre q y el intervalo de rangos que ocupa el valor estimado
+            low = np.searchsorted(sorted_values, estimate, side='left') / rows
+            high = np.searchsorted(sorted_values, estimate, side='right') / rows
+            rank_error = max(0.0, low - q, q - high)
+            worst = max(worst, rank_error)
+            per_quantile[str(q)] = {
+                'estimate': estimate,
+                'exact': float(np.percentile(values, q * 100)),
+                'rank_error': rank_error
+            }
+
+        results[name] = {
+            'max_rank_error': worst,
+            'within_bound': worst <= bound,
+            'retained_items': merged.size(),
+            'quantiles': per_quantile
+        }
+
+    return {'rows': rows, 'k': k, 'partitions': partitions, 'bound': bound, 'datasets': results}
+
+
+def main():
+    """Comprobar la precisión documentada del sketch"""
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Sketches de cuantiles para el análisis de errores')
+    parser.add_argument('--check', action='store_true', help='Comparar con percentiles exactos')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Número de valores sintéticos')
+    parser.add_argument('--k', type=int, default=200, help='Parámetro de precisión del sketch')
+    parser.add_argument('--partitions', type=int, default=30, help='Sketches diarios a combinar')
+    parser.add_argument('--seed', type=int, default=42, help='Semilla de los datos sintéticos')
+
+    args = parser.parse_args()
+    if not args.check:
+        parser.error('Indica --check')
+
+    report = check_accuracy(args.rows, args.k, args.partitions, args.seed)
+
+    print(f"\n=== PRECISIÓN DEL SKETCH KLL (k={report['k']}, cota {report['bound']:.4f}) ===")
+    for name, result in report['datasets'].items():
+        status = 'OK' if result['within_bound'] else 'FUERA DE COTA'
+        print(f"{name}: error de rango máximo {result['max_rank_error']:.4f} "
+              f"({result['retained_items']} elementos retenidos) {status}")
+        for q, quantile in result['quantiles'].items():
+            print(f"  q{q}: sketch {quantile['estimate']:.3f} / exacto {quantile['exact']:.3f}")
+
+    if not all(result['within_bound'] for result in report['datasets'].values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Reporte HTML de evaluación de modelos
+Las figuras se renderizan en procesos worker (matplotlib/seaborn solo se importan allí)
+y se incrustan como PNG en un único archivo HTML autocontenido
+"""
+
+import io
+import os
+import html
+import base64
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FIGURE_DPI = 100
+METRIC_LABELS = {
+    'accuracy': 'Precisión', 'precision': 'Precision', 'recall': 'Recall',
+    'f1_score': 'F1', 'score_correlation': 'Correlación'
+}
+
+
+def _pyplot():
+    """Importar matplotlib con backend sin pantalla (solo en los workers)"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _png(fig) -> str:
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=FIGURE_DPI, bbox_inches='tight')
+    _pyplot().close(fig)
+    return base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def _confusion_figure(data: Dict[str, Any]):
+    import seaborn as sns
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(4.5, 4))
+    sns.heatmap(data['matrix'], annot=True, fmt='d', cmap='Blues', cbar=False, ax=ax,
+                xticklabels=['No aprobado', 'Aprobado'], yticklabels=['No aprobado', 'Aprobado'])
+    ax.set_xlabel('Predicción IA')
+    ax.set_ylabel('Experto')
+    ax.set_title('Matriz de confusión')
+    return fig
+
+
+def _metrics_figure(data: Dict[str, Any]):
+    plt = _pyplot()
+    names = [name for name in METRIC_LABELS if name in data['values']]
+    values = [data['values'][name] for name in names]
+    intervals = data.get('intervals', {})
+    lower = [values[i] - intervals.get(name, {}).get('lower', values[i]) for i, name in enumerate(names)]
+    upper = [intervals.get(name, {}).get('upper', values[i]) - values[i] for i, name in enumerate(names)]
+    fig, ax = plt.subplots(figsize=(6, 3.5))
+    ax.bar([METRIC_LABELS[name] for name in names], values, yerr=[lower, upper], capsize=4, color='#4c72b0')
+    ax.set_ylim(0, 1)
+    ax.set_title('Métricas con IC 95%')
+    return fig
+
+
+def _confidence_figure(data: Dict[str, Any]):
+    plt = _pyplot()
+    buckets = ['low_confidence', 'medium_confidence', 'high_confidence']
+    labels = ['Baja', 'Media', 'Alta']
+    accuracy = [data[b].get('accuracy', 0) for b in buckets]
+    counts = [data[b].get('count', 0) for b in buckets]
+    fig, ax = plt.subplots(figsize=(5, 3.5))
+    bars = ax.bar(labels, accuracy, color='#55a868')
+    for bar, count in zip(bars, counts):
+        ax.annotate(f"n={count}", (bar.get_x() + bar.get_width() / 2, bar.get_height()),
+                    ha='center', va='bottom', fontsize=8)
+    ax.set_ylim(0, 1.05)
+    ax.set_xlabel('Confianza del modelo')
+    ax.set_ylabel('Precisión')
+    ax.set_title('Calibración por nivel de confianza')
+    return fig
+
+
+def _errors_figure(data: Dict[str, Any]):
+    plt = _pyplot()
+    fig, (left, right) = plt.subplots(1, 2, figsize=(9, 3.5))
+    quantiles = data['distribution']
+    left.bar(list(quantiles), list(quantiles.values()), color='#c44e52')
+    left.set_title('Cuantiles del error absoluto')
+    examples = data['examples']
+    if examples:
+        right.scatter([e['expert_score'] for e in examples], [e['ai_score'] for e in examples],
+                      c=[e.get('confidence') or 0 for e in examples], cmap='viridis', s=20)
+        right.plot([0, 100], [0, 100], linestyle='--', color='grey', linewidth=1)
+    right.set_xlabel('Puntuación experto')
+    right.set_ylabel('Puntuación IA')
+    right.set_title('Ejemplos atípicos')
+    return fig
+
+
+def _slices_figure(data: Dict[str, Any]):
+    plt = _pyplot()
+    slices = data['slices']
+    labels = [f"{s['dimension']}={s['value']}" for s in slices]
+    fig, ax = plt.subplots(figsize=(6, 0.4 * len(slices) + 1.5))
+    ax.barh(labels[::-1], [s['accuracy'] for s in slices][::-1], color='#8172b2')
+    if data.get('global_accuracy') is not None:
+        ax.axvline(data['global_accuracy'], color='black', linestyle='--', linewidth=1, label='Global')
+        ax.legend(loc='lower right')
+    ax.set_xlim(0, 1)
+    ax.set_title('Segmentos con peor precisión')
+    return fig
+
+
+def _drift_figure(data: Dict[str, Any]):
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(5, 3))
+    ax.bar(list(data), list(data.values()), color='#dd8452')
+    ax.axhline(0.2, color='grey', linestyle='--', linewidth=1)
+    ax.set_ylabel('PSI')
+    ax.set_title('Estabilidad de distribuciones')
+    return fig
+
+
+FIGURES = {
+    'confusion_matrix': _confusion_figure,
+    'metrics': _metrics_figure,
+    'confidence': _confidence_figure,
+    'errors': _errors_figure,
+    'slices': _slices_figure,
+    'drift': _drift_figure
+}
+
+
+def render_figure(spec: Tuple[str, Dict[str, Any]]) -> Tuple[str, str]:
+    """Renderizar una figura en PNG base64 (ejecutado en un worker)"""
+    name, data = spec
+    return name, _png(FIGURES[name](data))
+
+
+def figure_specs(evaluation: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    """Datos mínimos (picklables) de cada figura disponible en la evaluación"""
+
+    metrics = evaluation.get('performance_metrics', {})
+    errors = evaluation.get('error_analysis', {})
+    slices = evaluation.get('slice_analysis', {})
+    detectors = evaluation.get('drift_analysis', {}).get('detectors', {})
+    specs = []
+
+    if metrics.get('confusion_matrix'):
+        specs.append(('confusion_matrix', {'matrix': metrics['confusion_matrix']}))
+    values = {name: metrics[name] for name in METRIC_LABELS if isinstance(metrics.get(name), (int, float))}
+    if values:
+        specs.append(('metrics', {'values': values, 'intervals': metrics.get('confidence_intervals', {})}))
+    if metrics.get('confidence_analysis'):
+        specs.append(('confidence', metrics['confidence_analysis']))
+    if errors.get('error_distribution'):
+        specs.append(('errors', {
+            'distribution': errors['error_distribution'],
+            'examples': errors.get('outliers', {}).get('examples', [])
+        }))
+    if slices.get('worst_slices'):
+        specs.append(('slices', {'slices': slices['worst_slices'], 'global_accuracy': metrics.get('accuracy')}))
+    psi = {name: detector['psi'] for name, detector in detectors.items() if isinstance(detector, dict) and 'psi' in detector}
+    if psi:
+        specs.append(('drift', psi))
+    return specs
+
+
+def render_figures(specs: List[Tuple[str, Dict[str, Any]]], processes: Optional[int] = None) -> Dict[str, str]:
+    """Renderizar las figuras en paralelo (spawn); processes <= 1 renderiza en el proceso actual"""
+
+    if processes is None:
+        processes = min(len(specs), os.cpu_count() or 1)
+    if processes <= 1 or len(specs) <= 1:
+        return dict(render_figure(spec) for spec in specs)
+    with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return dict(pool.map(render_figure, specs))
+
+
+def _table(rows: List[Tuple[str, Any]]) -> str:
+    cells = ''.join(f"<tr><th>{html.escape(str(k))}</th><td>{html.escape(str(v))}</td></tr>" for k, v in rows)
+    return f"<table>{cells}</table>"
+
+
+def _percent(value) -> str:
+    return f"{value:.2%}" if isinstance(value, (int, float)) else '-'
+
+
+def build_html(report: Dict[str, Any], figures: Dict[str, str]) -> str:
+    """Documento HTML autocontenido a partir del reporte y las figuras renderizadas"""
+
+    metadata = report.get('report_metadata', {})
+    summary = report.get('executive_summary', {})
+    evaluation = report.get('detailed_analysis', {})
+    metrics = evaluation.get('performance_metrics', {})
+    plan = report.get('action_plan', {})
+    accuracy_ci = metrics.get('confidence_intervals', {}).get('accuracy')
+
+    sections = [
+        f"<h1>Evaluación del modelo {html.escape(str(metadata.get('model_id', '')))}</h1>",
+        f"<p class='meta'>Generado: {html.escape(str(metadata.get('generated_at', '')))}</p>",
+        "<h2>Resumen ejecutivo</h2>",
+        _table([
+            ('Estado', summary.get('overall_status', '-')),
+            ('Precisión', _percent(metrics.get('accuracy')) + (
+                f" (IC 95%: {_percent(accuracy_ci['lower'])} - {_percent(accuracy_ci['upper'])})" if accuracy_ci else '')),
+            ('Confianza promedio', f"{metrics.get('average_confidence', 0):.3f}"),
+            ('Predicciones con feedback', metrics.get('sample_size', 0)),
+            ('Drift detectado', 'sí' if summary.get('drift_detected') else 'no'),
+            ('Próxima revisión', summary.get('next_review_date', '-'))
+        ])
+    ]
+
+    titles = {
+        'metrics': 'Métricas', 'confusion_matrix': 'Matriz de confusión', 'confidence': 'Confianza',
+        'errors': 'Errores', 'slices': 'Segmentos', 'drift': 'Drift'
+    }
+    if figures:
+        sections.append("<h2>Figuras</h2><div class='figures'>")
+        for name in FIGURES:
+            if name in figures:
+                sections.append(f"<figure><img src='data:image/png;base64,{figures[name]}' alt='{titles[name]}'>"
+                                f"<figcaption>{titles[name]}</figcaption></figure>")
+        sections.append("</div>")
+
+    recommendations = evaluation.get('recommendations', [])
+    if recommendations:
+        sections.append("<h2>Recomendaciones</h2><ul>")
+        for rec in recommendations:
+            actions = ''.join(f"<li>{html.escape(str(a))}</li>" for a in rec.get('actions', []))
+            sections.append(
+                f"<li class='{html.escape(rec.get('priority', 'low'))}'><strong>{html.escape(rec.get('title', ''))}</strong> "
+                f"({html.escape(rec.get('priority', 'low'))}): {html.escape(rec.get('description', ''))}<ul>{actions}</ul></li>"
+            )
+        sections.append("</ul>")
+
+    if plan:
+        sections.append("<h2>Plan de acción</h2>")
+        sections.append(_table([
+            ('Acciones inmediatas', len(plan.get('immediate_actions', []))),
+            ('Corto plazo', len(plan.get('short_term_actions', []))),
+            ('Largo plazo', len(plan.get('long_term_actions', []))),
+            ('Horas estimadas', plan.get('total_estimated_hours', 0))
+        ]))
+
+    style = (
+        "body{font-family:sans-serif;max-width:1100px;margin:2em auto;color:#222}"
+        "table{border-collapse:collapse;margin:1em 0}th,td{border:1px solid #ddd;padding:4px 10px;text-align:left}"
+        ".figures{display:flex;flex-wrap:wrap;gap:1em}figure{margin:0}img{max-width:100%}"
+        ".meta{color:#666}li.high{color:#b00}li.medium{color:#a60}"
+    )
+    return (f"<!DOCTYPE html><html lang='es'><head><meta charset='utf-8'>"
+            f"<title>Evaluación {html.escape(str(metadata.get('model_id', '')))}</title><style>{style}</style></head>"
+            f"<body>{''.join(sections)}</body></html>")
+
+
+def write_html_report(report: Dict[str, Any], output_path: str, processes: Optional[int] = None) -> str:
+    """Renderizar las figuras del reporte y guardar el HTML"""
+
+    specs = figure_specs(report.get('detailed_analysis', {}))
+    figures = render_figures(specs, processes)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(build_html(report, figures))
+    logger.info(f"Reporte HTML con {len(figures)} figuras guardado en {output_path}")
+    return output_path
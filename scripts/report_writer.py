@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Escritura rápida de reportes de evaluación
+Los escalares y arrays NumPy se serializan como números nativos (NaN/inf como null),
+las secciones se escriben por bloques con el codificador C de json y las tablas
+por fila grandes van a sidecars Parquet columnares referenciados desde el JSON
+"""
+
+import os
+import json
+import math
+import time
+import logging
+import argparse
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Any
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STREAM_CHUNK = 1000  # Elementos por bloque al escribir listas grandes
+SIDECAR_MIN_ROWS = 10_000  # Tablas o arrays por fila desde este tamaño van al sidecar
+
+
+def to_builtin(value):
+    """Convertir recursivamente a tipos JSON nativos (NumPy como números, NaN/inf como null)"""
+    if isinstance(value, dict):
+        return {str(key): to_builtin(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_builtin(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return _array_to_list(value)
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating, Decimal)):
+        value = float(value)
+        return value if math.isfinite(value) else None
+    if isinstance(value, np.datetime64):
+        return None if np.isnat(value) else str(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def _array_to_list(array: np.ndarray) -> List:
+    if array.dtype.kind == 'f':
+        finite = np.isfinite(array)
+        if finite.all():
+            return array.tolist()
+        values = array.astype(object)
+        values[~finite] = None
+        return values.tolist()
+    if array.dtype.kind == 'M':
+        return [None if text == 'NaT' else text for text in np.datetime_as_string(array).tolist()]
+    if array.dtype.kind == 'O':
+        return [to_builtin(item) for item in array]
+    return array.tolist()
+
+
+def _is_table(value) -> bool:
+    """Lista de dicts, array 1-D o dict de columnas de igual longitud"""
+    if isinstance(value, np.ndarray):
+        return value.ndim == 1
+    if isinstance(value, list):
+        return len(value) > 0 and isinstance(value[0], dict)
+    if isinstance(value, dict) and value:
+        columns = list(value.values())
+        return all(isinstance(c, np.ndarray) and c.ndim == 1 for c in columns) and len({len(c) for c in columns}) == 1
+    return False
+
+
+def _table_length(value) -> int:
+    return len(next(iter(value.values()))) if isinstance(value, dict) else len(value)
+
+
+def _to_arrow(value):
+    """Tabla Arrow desde una tabla por fila; los valores anidados se guardan como texto JSON"""
+    import pyarrow as pa
+
+    if isinstance(value, np.ndarray):
+        value = {'value': value}
+    if isinstance(value, list):
+        names = list(dict.fromkeys(key for row in value for key in row))
+        value = {name: [row.get(name) for row in value] for name in names}
+
+    columns = {}
+    for name, column in value.items():
+        if isinstance(column, np.ndarray) and column.dtype.kind != 'O':
+            columns[name] = pa.array(column)
+            continue
+        items = column.tolist() if isinstance(column, np.ndarray) else column
+        if any(isinstance(item, (dict, list)) for item in items):
+            items = [None if item is None else json.dumps(to_builtin(item), ensure_ascii=False) for item in items]
+        else:
+            items = [item.item() if isinstance(item, np.generic) else item for item in items]
+        columns[name] = pa.array(items)
+    return pa.table(columns)
+
+
+def _extract_sidecars(value, path: str, tables: Dict[str, Any], min_rows: int):
+    """Sustituir las tablas por fila grandes por referencias y acumularlas en `tables`"""
+    if _is_table(value) and _table_length(value) >= min_rows:
+        tables[path] = value
+        return {'sidecar_table': path, 'rows': _table_length(value)}
+    if isinstance(value, dict):
+        return {key: _extract_sidecars(item, f"{path}.{key}" if path else str(key), tables, min_rows)
+                for key, item in value.items()}
+    return value
+
+
+def _write_stream(f, value, depth: int = 0):
+    """Escribir el JSON por secciones: cada valor pequeño en una llamada al codificador C"""
+    if isinstance(value, dict) and depth < 2:
+        f.write('{')
+        for i, (key, item) in enumerate(value.items()):
+            f.write((', ' if i else '') + json.dumps(str(key), ensure_ascii=False) + ': ')
+            _write_stream(f, item, depth + 1)
+        f.write('}')
+    elif isinstance(value, (list, np.ndarray)) and len(value) > STREAM_CHUNK:
+        f.write('[')
+        for start in range(0, len(value), STREAM_CHUNK):
+            chunk = json.dumps(to_builtin(value[start:start + STREAM_CHUNK]), ensure_ascii=False, allow_nan=False)
+            f.write((', ' if start else '') + chunk[1:-1])
+        f.write(']')
+    else:
+        f.write(json.dumps(to_builtin(value), ensure_ascii=False, allow_nan=False))
+
+
+def write_report(report: Dict[str, Any], path: str, sidecar: bool = True,
+                 sidecar_min_rows: int = SIDECAR_MIN_ROWS) -> Dict[str, Any]:
+    """Escribir un reporte JSON en streaming, con sidecars Parquet para las tablas por fila grandes"""
+
+    start = time.perf_counter()
+    tables = {}
+    if sidecar:
+        try:
+            import pyarrow.parquet as pq
+            report = _extract_sidecars(report, '', tables, sidecar_min_rows)
+        except ImportError:
+            logger.warning("pyarrow no está instalado: las tablas por fila se escriben dentro del JSON")
+
+    stem = os.path.splitext(path)[0]
+    sidecar_paths = {}
+    for table, value in tables.items():
+        sidecar_path = f"{stem}.{table}.parquet"
+        pq.write_table(_to_arrow(value), sidecar_path, compression='zstd')
+        sidecar_paths[table] = os.path.basename(sidecar_path)
+    if sidecar_paths:
+        report = dict(report, sidecars=sidecar_paths)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        _write_stream(f, report)
+    os.replace(tmp_path, path)
+
+    return {
+        'path': path,
+        'bytes': os.path.getsize(path),
+        'sidecars': sidecar_paths,
+        'sidecar_bytes': sum(os.path.getsize(os.path.join(os.path.dirname(path), p)) for p in sidecar_paths.values()),
+        'seconds': time.perf_counter() - start
+    }
+
+
+def read_report(path: str, load_sidecars: bool = False) -> Dict[str, Any]:
+    """Leer un reporte; con load_sidecars las referencias se sustituyen por tablas Arrow"""
+    with open(path, encoding='utf-8') as f:
+        report = json.load(f)
+    if not load_sidecars or 'sidecars' not in report:
+        return report
+
+    import pyarrow.parquet as pq
+
+    directory = os.path.dirname(path)
+
+    def resolve(value):
+        if isinstance(value, dict):
+            if 'sidecar_table' in value:
+                return pq.read_table(os.path.join(directory, report['sidecars'][value['sidecar_table']]))
+            return {key: resolve(item) for key, item in value.items()}
+        return value
+
+    return resolve(report)
+
+
+def _benchmark_report(rows: int, seed: int) -> Dict[str, Any]:
+    """Reporte con la forma del evaluador y `rows` ejemplos y arrays por fila"""
+    rng = np.random.default_rng(seed)
+    ai = np.round(rng.normal(82, 10, size=rows))
+    expert = np.round(ai + rng.normal(0, 8, size=rows))
+    created_at = np.datetime64('2026-01-01T00:00:00') + rng.integers(0, 30 * 86400, size=rows).astype('timedelta64[s]')
+    base_time = datetime(2026, 1, 1)
+    return {
+        'report_metadata': {'model_id': 'benchmark', 'generated_at': datetime.now()},
+        'performance_metrics': {
+            'accuracy': np.float64(0.91), 'sample_size': np.int64(rows),
+            'confusion_matrix': [[np.int64(10), np.int64(2)], [np.int64(3), np.int64(40)]],
+            'score_correlation': np.float64('nan')
+        },
+        'error_analysis': {
+            'error_distribution': dict(zip(['q25', 'q50', 'q75', 'q90'], np.percentile(np.abs(ai - expert), [25, 50, 75, 90]))),
+            'outliers': {
+                'count': np.int64(rows),
+                'examples': [
+                    {
+                        'verification_id': np.int64(i), 'ai_score': ai[i], 'expert_score': expert[i],
+                        'error': np.float64(abs(ai[i] - expert[i])), 'confidence': np.float64(0.87),
+                        'created_at': base_time + timedelta(seconds=int(i)), 'feedback': {'comment': 'Revisión'}
+                    }
+                    for i in range(rows)
+                ]
+            }
+        },
+        'rows': {'ai_score': ai, 'expert_score': expert, 'error': np.abs(ai - expert), 'created_at': created_at}
+    }
+
+
+def benchmark_report_writer(rows: int = 200_000, output_dir: str = '.', seed: int = 42) -> Dict[str, Any]:
+    """Comparar json.dump(indent=2, default=str) con write_report: tiempo de escritura, tamaño y lectura"""
+
+    os.makedirs(output_dir, exist_ok=True)
+    report = _benchmark_report(rows, seed)
+    results = {}
+
+    legacy_path = os.path.join(output_dir, 'report_benchmark_legacy.json')
+    start = time.perf_counter()
+    with open(legacy_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False, default=str)
+    write_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    read_report(legacy_path)
+    results['legacy'] = {
+        'write_seconds': write_seconds, 'bytes': os.path.getsize(legacy_path),
+        'read_seconds': time.perf_counter() - start
+    }
+
+    for name, sidecar in (('streaming', False), ('streaming_sidecar', True)):
+        path = os.path.join(output_dir, f'report_benchmark_{name}.json')
+        written = write_report(report, path, sidecar=sidecar)
+        start = time.perf_counter()
+        read_report(path, load_sidecars=True)
+        results[name] = {
+            'write_seconds': written['seconds'], 'bytes': written['bytes'] + written['sidecar_bytes'],
+            'read_seconds': time.perf_counter() - start
+        }
+
+    return {'rows': rows, 'results': results}
+
+
+def main():
+    """Benchmark del escritor de reportes"""
+
+    parser = argparse.ArgumentParser(description='Escritura de reportes de evaluación')
+    parser.add_argument('--benchmark-rows', type=int, default=200_000, help='Filas por tabla del reporte sintético')
+    parser.add_argument('--output-dir', default='.', help='Directorio de los archivos de prueba')
+    args = parser.parse_args()
+
+    benchmark = benchmark_report_writer(args.benchmark_rows, args.output_dir)
+    print(f"\n=== ESCRITURA DE REPORTES ({benchmark['rows']} filas por tabla) ===")
+    for name, result in benchmark['results'].items():
+        print(f"{name}: escritura {result['write_seconds']:.2f}s, lectura {result['read_seconds']:.2f}s, "
+              f"{result['bytes'] / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,554 @@
+#!/usr/bin/env python3
+"""
+Reentrenamiento de modelos disparado por drift
+El evaluador encola un trabajo cuando el drift de un modelo desplegado supera el umbral
+de su métrica (deployment.monitoring.retraining_thresholds); el worker parte del artefacto
+desplegado (warm start), lo ajusta con la ventana reciente y las correction_annotations de
+los expertos, lo valida contra el modelo desplegado antes de deploy_model y registra el
+cómputo frente a un entrenamiento desde cero
+"""
+
+import os
+import re
+import copy
+import json
+import time
+import logging
+import argparse
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+
+from evaluation_stats import PASS_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+CONFIG_FILE = os.getenv('TRAINING_CONFIG_FILE', 'config/training_config.json')
+DEFAULT_RETRAINING_THRESHOLD = 0.05
+
+# Umbral por métrica de drift, en la escala de 'magnitude' de DriftMonitor.report(); cada detector mide
+# algo distinto, así que un único umbral no sirve. deployment.monitoring.retraining_thresholds los
+# sobreescribe y el retraining_threshold escalar (anterior) se aplica a la exactitud
+RETRAINING_THRESHOLDS = {
+    'accuracy': DEFAULT_RETRAINING_THRESHOLD,  # Caída absoluta de exactitud pass/fail
+    'mean_absolute_error': 0.03,  # Aumento del error absoluto: 3 puntos de score (/100)
+    'score_distribution': 0.25,  # PSI: > 0.25 es un cambio grande de distribución
+    'confidence_distribution': 0.25
+}
+
+# deployment.retraining en la configuración; estos valores se usan si falta alguno
+RETRAINING_DEFAULTS = {
+    'window_days': 30,  # Ventana reciente con feedback experto
+    'annotation_days': 180,  # Antigüedad máxima de las correction_annotations que se añaden
+    'validation_fraction': 0.2,  # Parte más reciente de la ventana, reservada para validar
+    'min_samples': 200,
+    'min_improvement': 0.0,  # Mejora relativa mínima de la pérdida frente al modelo desplegado
+    'additional_estimators': 50,  # Árboles nuevos sobre el ensemble desplegado
+    'fine_tune_epochs': 5,
+    'learning_rate_scale': 0.1,  # Sobre el learning_rate del modelo de visión
+    'freeze_backbone': True,
+    'stale_hours': 6  # Trabajos 'running' sin terminar tras este tiempo se vuelven a tomar
+}
+
+# Tipo de artefacto desplegado -> familia de datos (synthetic_data / HorecaDataset)
+ARTIFACT_KINDS = {
+    'temperature_control': 'sensor',
+    'kitchen_hygiene_vision': 'image'
+}
+
+# Solo modelos desplegados, uno activo por modelo y una vez por evento de drift (drift_started_at);
+# sin inicio conocido solo se deduplica contra trabajos pendientes o en curso
+QUEUE_RETRAINING_SQL = """
+    INSERT INTO model_retraining_jobs (
+        model_id, drift_magnitude, drift_started_at, trigger_report, parent_artifact_id
+    )
+    SELECT sam.id, %s, %s, %s, sam.model_artifacts->>'artifact_id'
+    FROM specialized_ai_models sam
+    WHERE sam.id = %s
+    AND sam.deployment_status = 'deployed'
+    AND NOT EXISTS (
+        SELECT 1 FROM model_retraining_jobs j
+        WHERE j.model_id = sam.id
+        AND (j.status IN ('queued', 'running') OR j.drift_started_at = %s::timestamptz)
+    )
+    ON CONFLICT (model_id) WHERE status IN ('queued', 'running') DO NOTHING
+    RETURNING id
+"""
+
+CLAIM_JOB_SQL = """
+    UPDATE model_retraining_jobs
+    SET status = 'running', started_at = NOW()
+    WHERE id = (
+        SELECT id FROM model_retraining_jobs
+        WHERE status = 'queued'
+        OR (status = 'running' AND started_at < NOW() - make_interval(hours => %s))
+        ORDER BY queued_at
+        FOR UPDATE SKIP LOCKED
+        LIMIT 1
+    )
+    RETURNING *
+"""
+
+# Ventana reciente con feedback experto, más las correcciones anotadas algo más antiguas
+RETRAINING_WINDOW_SQL = """
+    SELECT av.id, av.created_at, av.content_data,
+           sf.expert_score::float8 AS expert_score, sf.correction_annotations
+    FROM ai_verifications av
+    JOIN specialized_feedback sf ON sf.verification_id = av.id
+    WHERE av.verification_type = %s
+    AND sf.expert_score IS NOT NULL
+    AND sf.feedback_quality <> 'disputed'
+    AND (
+        av.created_at >= NOW() - make_interval(days => %s)
+        OR (sf.correction_annotations IS NOT NULL AND av.created_at >= NOW() - make_interval(days => %s))
+    )
+    ORDER BY av.created_at
+"""
+
+# Último entrenamiento desde cero de la categoría con cómputo medido (save_training_run)
+BASELINE_SQL = """
+    SELECT tr.id, tr.hardware_config
+    FROM model_training_runs tr
+    JOIN specialized_ai_models sam ON sam.id = tr.model_id
+    WHERE sam.verification_category = %s
+    AND tr.status = 'completed'
+    AND tr.hardware_config ? 'cpu_seconds'
+    AND COALESCE((tr.hardware_config->>'warm_start')::boolean, false) = false
+    ORDER BY tr.training_end DESC
+    LIMIT 1
+"""
+
+REGISTER_MODEL_SQL = """
+    INSERT INTO specialized_ai_models (
+        model_name, model_type, verification_category, industry_focus, base_model, model_version,
+        training_dataset_id, model_config, training_metrics, validation_metrics,
+        deployment_status, confidence_threshold
+    )
+    SELECT model_name, model_type, verification_category, industry_focus, base_model, %s,
+           training_dataset_id, model_config, %s, %s, 'training', confidence_threshold
+    FROM specialized_ai_models
+    WHERE id = %s
+    RETURNING id
+"""
+
+
+def load_training_config(config_file: str = CONFIG_FILE) -> Dict[str, Any]:
+    """Configuración de entrenamiento y despliegue (vacía si el archivo no existe)"""
+    if not os.path.exists(config_file):
+        return {}
+    with open(config_file, 'r') as f:
+        return json.load(f)
+
+
+def retraining_thresholds(config: Dict[str, Any]) -> Optional[Dict[str, float]]:
+    """Umbrales de drift por métrica para reentrenar; None si la detección de drift está desactivada"""
+    monitoring = config.get('deployment', {}).get('monitoring', {})
+    if not monitoring.get('drift_detection', True):
+        return None
+    thresholds = dict(RETRAINING_THRESHOLDS)
+    if 'retraining_threshold' in monitoring:
+        thresholds['accuracy'] = monitoring['retraining_threshold']
+    thresholds.update(monitoring.get('retraining_thresholds', {}))
+    return {metric: float(value) for metric, value in thresholds.items()}
+
+
+def retraining_options(config: Dict[str, Any]) -> Dict[str, Any]:
+    return dict(RETRAINING_DEFAULTS, **config.get('deployment', {}).get('retraining', {}))
+
+
+def retraining_trigger(drift_report: Dict[str, Any], thresholds: Dict[str, float]) -> Optional[Dict[str, Any]]:
+    """Cambios del reporte de drift con magnitud >= umbral de su métrica; None si ninguno lo alcanza
+
+    drift_magnitude es la mayor razón magnitud/umbral (>= 1), comparable entre detectores
+    """
+    if not drift_report.get('drift_detected'):
+        return None
+    changes = []
+    for change in drift_report.get('significant_changes', []):
+        threshold = thresholds.get(change['metric'])
+        if threshold is not None and change['magnitude'] >= threshold:
+            changes.append(dict(change, threshold=threshold, ratio=change['magnitude'] / threshold))
+    if not changes:
+        return None
+    started = [c['started_at'] for c in changes if c.get('started_at')]
+    return {
+        'thresholds': thresholds,
+        'drift_magnitude': max(c['ratio'] for c in changes),
+        'drift_started_at': min(started) if started else drift_report.get('drift_started_at'),
+        'changes': changes
+    }
+
+
+def queue_retraining(cursor, model_id: str, drift_report: Dict[str, Any],
+                     thresholds: Dict[str, float]) -> Optional[str]:
+    """Encolar un reentrenamiento si el drift supera el umbral de alguna métrica (en la transacción del llamador)"""
+
+    trigger = retraining_trigger(drift_report, thresholds)
+    if trigger is None:
+        return None
+    cursor.execute(QUEUE_RETRAINING_SQL, (
+        trigger['drift_magnitude'], trigger['drift_started_at'], json.dumps(trigger),
+        model_id, trigger['drift_started_at']
+    ))
+    row = cursor.fetchone()
+    if row:
+        logger.warning(f"Reentrenamiento {row['id']} encolado para {model_id}: "
+                       f"drift {trigger['drift_magnitude']:.2f}x el umbral en "
+                       f"{', '.join(c['metric'] for c in trigger['changes'])}")
+        return row['id']
+    return None
+
+
+def _expert_label(score: float) -> str:
+    """Clase de higiene a partir de la puntuación del experto"""
+    if score >= 90:
+        return 'excellent'
+    if score >= PASS_THRESHOLD:
+        return 'good'
+    if score >= 50:
+        return 'needs_improvement'
+    return 'critical'
+
+
+def training_record(row: Dict[str, Any], kind: str) -> Dict[str, Any]:
+    """Registro de entrenamiento: datos de la verificación con las correcciones del experto encima"""
+    record = dict(row['content_data'] or {})
+    if kind == 'image':
+        record.setdefault('score', row['expert_score'])
+        record.setdefault('label', _expert_label(row['expert_score']))
+    record.update(row['correction_annotations'] or {})
+    record['corrected'] = bool(row['correction_annotations'])
+    return record
+
+
+def split_window(records: List[Dict], validation_fraction: float) -> Tuple[List[Dict], List[Dict]]:
+    """Partición temporal: se valida con lo más reciente, que es lo que el drift afecta"""
+    split = int(len(records) * (1 - validation_fraction))
+    return records[:split], records[split:]
+
+
+def next_version(version: Optional[str]) -> str:
+    """Versión siguiente: incrementa el último número ('1.0' -> '1.1')"""
+    match = re.search(r'(\d+)$', version or '')
+    if not match:
+        return f"{version}.1" if version else '1'
+    return version[:match.start()] + str(int(match.group(1)) + 1)
+
+
+def _speedup(baseline: Optional[Dict[str, Any]], compute: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    if not baseline:
+        return {'wall_speedup': None, 'cpu_speedup': None}
+    return {
+        'wall_speedup': baseline['wall_seconds'] / compute['wall_seconds'] if compute['wall_seconds'] else None,
+        'cpu_speedup': baseline['cpu_seconds'] / compute['cpu_seconds'] if compute['cpu_seconds'] else None
+    }
+
+
+def _temperature_mae(predictor, records: List[Dict]) -> float:
+    from train_specialized_models import TemperatureControlModel
+
+    features = TemperatureControlModel().prepare_features(records)
+    targets = np.array([record['target_temp'] for record in records], dtype=np.float64)
+    return float(np.mean(np.abs(predictor.predict(features) - targets)))
+
+
+class RetrainingWorker:
+    """Consume model_retraining_jobs: warm start, validación y despliegue como challenger"""
+
+    def __init__(self, trainer, options: Optional[Dict[str, Any]] = None, measure_baseline: bool = False):
+        self.trainer = trainer
+        self.connection = trainer.db_connection
+        self.store = trainer.artifact_store
+        self.options = dict(retraining_options(trainer.config), **(options or {}))
+        self.measure_baseline = measure_baseline
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """Tomar el trabajo pendiente más antiguo (SKIP LOCKED: varios workers no se pisan)"""
+        with self.connection.cursor() as cursor:
+            cursor.execute(CLAIM_JOB_SQL, (self.options['stale_hours'],))
+            job = cursor.fetchone()
+        self.connection.commit()
+        return dict(job) if job else None
+
+    def run(self, once: bool = False, poll_interval: float = 60.0) -> List[Dict[str, Any]]:
+        """Procesar trabajos hasta vaciar la cola (once) o indefinidamente"""
+        results = []
+        while True:
+            job = self.claim()
+            if job is None:
+                if once:
+                    return results
+                time.sleep(poll_interval)
+                continue
+            results.append(self.run_job(job))
+
+    def run_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            result = self._retrain(job)
+        except Exception as e:
+            self.connection.rollback()
+            logger.error(f"Reentrenamiento {job['id']} fallido: {str(e)}")
+            result = {'status': 'failed', 'error_log': str(e)}
+        self._finish(job['id'], result)
+        return dict(result, job_id=str(job['id']), model_id=str(job['model_id']))
+
+    def _retrain(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        from train_specialized_models import ComputeMeter
+
+        with self.connection.cursor() as cursor:
+            cursor.execute("SELECT * FROM specialized_ai_models WHERE id = %s", (job['model_id'],))
+            model = dict(cursor.fetchone())
+        self.connection.commit()
+
+        parent = job['parent_artifact_id'] or (model['model_artifacts'] or {}).get('artifact_id')
+        if not parent:
+            return {'status': 'rejected', 'error_log': 'El modelo desplegado no tiene artefacto para warm start'}
+        if not self.store.exists(parent):
+            return {'status': 'failed', 'error_log': f"Artefacto desplegado no disponible: {parent}"}
+        model_type = self.store.manifest(parent)['model_type']
+        if model_type not in ARTIFACT_KINDS:
+            return {'status': 'rejected', 'error_log': f"Sin warm start para artefactos {model_type}"}
+        kind = ARTIFACT_KINDS[model_type]
+
+        records = self.load_window(model['verification_category'], kind)
+        corrected = sum(record['corrected'] for record in records)
+        samples = {'window': len(records) - corrected, 'corrected': corrected, 'total': len(records)}
+        if len(records) < self.options['min_samples']:
+            return {'status': 'rejected', 'training_samples': samples,
+                    'error_log': f"Muestras insuficientes: {len(records)} < {self.options['min_samples']}"}
+        train, validation = split_window(records, self.options['validation_fraction'])
+        samples.update({'train': len(train), 'validation': len(validation)})
+
+        with ComputeMeter() as meter:
+            if kind == 'sensor':
+                results = self.trainer.train_temperature_model(
+                    train, validation, parent_artifact=parent,
+                    additional_estimators=self.options['additional_estimators']
+                )
+            else:
+                results = self.trainer.train_vision_model(train, validation, self._vision_config(parent))
+        compute = dict(meter.to_dict(), warm_start=True, parent_artifact=parent, train_samples=len(train))
+
+        baseline = self._measure_baseline(kind, train, validation) if self.measure_baseline else \
+            self._recorded_baseline(model['verification_category'])
+        compute.update(_speedup(baseline, compute))
+
+        validation_report = self.validate(kind, results['artifact_id'], parent, validation)
+        outcome = {
+            'artifact_id': results['artifact_id'], 'training_samples': samples,
+            'validation': validation_report, 'compute': compute, 'baseline': baseline
+        }
+        logger.info(
+            f"Reentrenamiento {job['id']}: pérdida {validation_report['candidate_loss']:.4f} vs desplegado "
+            f"{validation_report['deployed_loss']:.4f}; {compute['wall_seconds']:.1f}s de pared"
+            + (f" ({compute['wall_speedup']:.1f}x más rápido que desde cero)" if compute['wall_speedup'] else '')
+        )
+        if not validation_report['passed']:
+            return dict(outcome, status='rejected')
+
+        with self.connection.cursor() as cursor:
+            cursor.execute(REGISTER_MODEL_SQL, (
+                next_version(model['model_version']),
+                json.dumps(results.get('final_metrics', results.get('metrics', {})), default=_json_default),
+                json.dumps(validation_report),
+                model['id']
+            ))
+            new_model_id = cursor.fetchone()['id']
+        self.connection.commit()
+
+        training_config = {
+            'retraining_job': str(job['id']), 'warm_start_from': parent, 'model_type': model_type,
+            'options': self.options
+        }
+        run_id = self.trainer.save_training_run(new_model_id, training_config, dict(
+            results, compute=dict(compute, baseline=baseline), run_prefix='Retraining',
+            dataset_split={'train': len(train), 'validation': len(validation), 'split': 'temporal'}
+        ))
+        if not self.trainer.deploy_model(
+            new_model_id, results['model_path'], results.get('final_metrics', results.get('metrics', {})),
+            results['artifact_id']
+        ):
+            return dict(outcome, status='failed', new_model_id=new_model_id, training_run_id=run_id,
+                        error_log='deploy_model falló')
+        return dict(outcome, status='completed', new_model_id=new_model_id, training_run_id=run_id)
+
+    def load_window(self, verification_category: str, kind: str) -> List[Dict[str, Any]]:
+        """Ventana reciente con feedback experto y correcciones anotadas, en orden temporal"""
+        with self.connection.cursor() as cursor:
+            cursor.execute(RETRAINING_WINDOW_SQL, (
+                verification_category, self.options['window_days'], self.options['annotation_days']
+            ))
+            rows = cursor.fetchall()
+        self.connection.commit()
+        return [training_record(row, kind) for row in rows]
+
+    def _vision_config(self, parent: str, warm_start: bool = True) -> Dict[str, Any]:
+        config = self.trainer.config
+        model_config = dict(config.get('model_configs', {}).get('kitchen_hygiene_vision', {}))
+        model_config.update({
+            'seed': config.get('seed', 42),
+            'batch_size': model_config.get('batch_size', config.get('batch_size', 32)),
+            'distributed_workers': config.get('distributed_workers', 1)
+        })
+        if not warm_start:
+            return model_config
+        model_config.update({
+            'epochs': self.options['fine_tune_epochs'],
+            'learning_rate': model_config.get('learning_rate', 0.001) * self.options['learning_rate_scale'],
+            'freeze_backbone': self.options['freeze_backbone'],
+            'init_artifact': parent,
+            'parent_artifact': parent,
+            'artifact_store_path': str(self.store.root)
+        })
+        return model_config
+
+    def validate(self, kind: str, candidate: str, deployed: str, validation: List[Dict]) -> Dict[str, Any]:
+        """Pérdida del reentrenado y del desplegado sobre la misma ventana de validación"""
+        if kind == 'sensor':
+            metric = 'val_mae'
+            candidate_loss = _temperature_mae(self.store.load_predictor(candidate), validation)
+            deployed_loss = _temperature_mae(self.store.load_predictor(deployed), validation)
+        else:
+            from vision_models import evaluate_vision_state
+
+            metric = 'val_loss'
+            model_config = self._vision_config(deployed, warm_start=False)
+            candidate_loss = evaluate_vision_state(self.store.load_state_dict(candidate), validation, model_config)[metric]
+            deployed_loss = evaluate_vision_state(self.store.load_state_dict(deployed), validation, model_config)[metric]
+
+        required = deployed_loss * (1 - self.options['min_improvement'])
+        return {
+            'metric': metric,
+            'candidate_loss': candidate_loss,
+            'deployed_loss': deployed_loss,
+            'improvement': (deployed_loss - candidate_loss) / deployed_loss if deployed_loss else 0.0,
+            'min_improvement': self.options['min_improvement'],
+            'passed': candidate_loss <= required,
+            'samples': len(validation)
+        }
+
+    def _measure_baseline(self, kind: str, train: List[Dict], validation: List[Dict]) -> Dict[str, Any]:
+        """Entrenar desde cero con los mismos datos (sin guardar artefacto) para medir su cómputo"""
+        from train_specialized_models import ComputeMeter, TemperatureControlModel
+
+        with ComputeMeter() as meter:
+            if kind == 'sensor':
+                TemperatureControlModel().train(train, validation)
+            else:
+                from vision_models import train_vision_distributed
+
+                model_config = self._vision_config(None, warm_start=False)
+                train_vision_distributed(train, validation, model_config, model_config['distributed_workers'])
+        return dict(meter.to_dict(), source='measured', train_samples=len(train))
+
+    def _recorded_baseline(self, verification_category: str) -> Optional[Dict[str, Any]]:
+        with self.connection.cursor() as cursor:
+            cursor.execute(BASELINE_SQL, (verification_category,))
+            row = cursor.fetchone()
+        self.connection.commit()
+        if not row:
+            return None
+        return dict(row['hardware_config'], source='training_run', training_run_id=str(row['id']))
+
+    def _finish(self, job_id, result: Dict[str, Any]):
+        with self.connection.cursor() as cursor:
+            cursor.execute("""
+                UPDATE model_retraining_jobs
+                SET status = %s, artifact_id = %s, new_model_id = %s, training_run_id = %s,
+                    training_samples = %s, validation = %s, compute = %s, baseline = %s,
+                    error_log = %s, finished_at = NOW()
+                WHERE id = %s
+            """, (
+                result['status'], result.get('artifact_id'), result.get('new_model_id'),
+                result.get('training_run_id'),
+                *(json.dumps(result[key], default=_json_default) if result.get(key) is not None else None
+                  for key in ('training_samples', 'validation', 'compute', 'baseline')),
+                result.get('error_log'), job_id
+            ))
+        self.connection.commit()
+
+
+def _json_default(value):
+    from artifact_store import json_default
+    return json_default(value)
+
+
+def _drifted_sensor_records(generator, n: int, offset: float) -> List[Dict[str, Any]]:
+    """Registros de sensores con la temperatura objetivo desplazada (p. ej. nueva consigna de conservación)"""
+    from synthetic_data import batch_to_records
+
+    batch = generator.batch('sensor', n)
+    batch['target_temp'] = batch['target_temp'] + offset
+    return batch_to_records(batch, 'sensor')
+
+
+def benchmark_warm_start(rows: int = 20_000, recent_rows: int = 4_000, offset: float = -1.5,
+                         additional_estimators: int = 50, seed: int = 42) -> Dict[str, Any]:
+    """Modelo de temperatura con drift: reentrenar desde cero (como main()) vs warm start del desplegado"""
+    from synthetic_data import SyntheticDataGenerator
+    from train_specialized_models import ComputeMeter, TemperatureControlModel
+
+    generator = SyntheticDataGenerator(seed=seed)
+    history = _drifted_sensor_records(generator, rows, 0.0)
+    recent = _drifted_sensor_records(generator, recent_rows, offset)
+    train, validation = split_window(recent, RETRAINING_DEFAULTS['validation_fraction'])
+
+    deployed = TemperatureControlModel()
+    deployed.train(history, validation)
+    results = {'deployed': {'val_mae': _temperature_mae(deployed.model, validation)}}
+
+    # Desde cero: el dataset completo actualizado, con todos los árboles
+    with ComputeMeter() as meter:
+        scratch = TemperatureControlModel()
+        scratch.train(history + train, validation)
+    results['from_scratch'] = dict(meter.to_dict(), val_mae=_temperature_mae(scratch.model, validation),
+                                   train_samples=len(history) + len(train))
+
+    with ComputeMeter() as meter:
+        warm = TemperatureControlModel().warm_start(copy.deepcopy(deployed.model), additional_estimators)
+        warm.train(train, validation)
+    results['warm_start'] = dict(meter.to_dict(), val_mae=_temperature_mae(warm.model, validation),
+                                 train_samples=len(train))
+    results['warm_start'].update(_speedup(results['from_scratch'], results['warm_start']))
+    return results
+
+
+def main():
+    """Worker de reentrenamiento (PostgreSQL con DB_* y migraciones 09 y 15) o benchmark sin base de datos"""
+
+    parser = argparse.ArgumentParser(description='Reentrenamiento con warm start disparado por drift')
+    parser.add_argument('--config-file', default=CONFIG_FILE, help='Archivo de configuración')
+    parser.add_argument('--once', action='store_true', help='Procesar la cola pendiente y salir')
+    parser.add_argument('--poll-interval', type=float, default=60.0, help='Segundos entre consultas a la cola')
+    parser.add_argument('--measure-baseline', action='store_true',
+                        help='Entrenar también desde cero con los mismos datos para medir la línea base')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Comparar warm start y entrenamiento desde cero con datos sintéticos y salir')
+    parser.add_argument('--benchmark-rows', type=int, default=20_000, help='Filas históricas del benchmark')
+    parser.add_argument('--seed', type=int, default=42, help='Semilla de los datos sintéticos')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        results = benchmark_warm_start(rows=args.benchmark_rows, seed=args.seed)
+        print("\n=== WARM START vs DESDE CERO (temperatura, cambio de consigna) ===")
+        print(f"Desplegado: MAE {results['deployed']['val_mae']:.3f}")
+        for name in ('from_scratch', 'warm_start'):
+            run = results[name]
+            print(f"{name}: MAE {run['val_mae']:.3f}, {run['wall_seconds']:.2f}s pared, "
+                  f"{run['cpu_seconds']:.2f}s CPU, {run['train_samples']} filas")
+        print(f"Aceleración: {results['warm_start']['wall_speedup']:.1f}x pared, "
+              f"{results['warm_start']['cpu_speedup']:.1f}x CPU")
+        return
+
+    from train_specialized_models import ModelTrainer
+
+    config = load_training_config(args.config_file)
+    worker = RetrainingWorker(ModelTrainer(config), measure_baseline=args.measure_baseline)
+    for result in worker.run(once=args.once, poll_interval=args.poll_interval):
+        print(f"{result['job_id']} ({result['model_id']}): {result['status']}"
+              + (f" -> {result['new_model_id']}" if result.get('new_model_id') else '')
+              + (f" [{result['error_log']}]" if result.get('error_log') else ''))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -117,6 +117,7 @@ albumentations>=1.3.0
 librosa>=0.9.0
 soundfile>=0.10.0
 openai-whisper>=20230314
+faster-whisper>=1.0.0  # Motor int8 (CTranslate2) para service_audio.whisper_model "faster-whisper/<tamaño>"
 
 # NLP
 tokenizers>=0.13.0
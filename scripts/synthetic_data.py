@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Generador de datos sintéticos para pruebas de carga de modelos HORECA
+Produce lotes columnares reproducibles (un solo Generator por semilla) y los
+escribe como Parquet o arrays memory-mapped para el trainer y el evaluador
+"""
+
+import os
+import json
+import logging
+import argparse
+from datetime import datetime
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+import numpy as np
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Columnas categóricas por tipo de dato: se generan como códigos int8
+# y se decodifican con estas listas (equivalente a dictionary encoding)
+CATEGORIES = {
+    'image': {
+        'label': ['excellent', 'good', 'needs_improvement', 'critical'],
+        'restaurant_type': ['fast_food', 'casual', 'fine_dining'],
+        'area': ['prep', 'cooking', 'storage', 'cleaning'],
+        'shift': ['morning', 'afternoon', 'evening']
+    },
+    'sensor': {
+        'label': ['compliant', 'non_compliant'],
+        'equipment_type': ['refrigerator', 'freezer', 'oven'],
+        'food_category': ['meat', 'dairy', 'vegetables']
+    },
+    'room': {
+        'label': ['excellent', 'good', 'needs_improvement', 'critical'],
+        'area': ['bedroom', 'bathroom', 'amenities', 'maintenance'],
+        'room_category': ['luxury', 'premium', 'standard', 'budget']
+    },
+    'audio': {
+        'label': ['excellent', 'good', 'needs_improvement'],
+        'service_type': ['drive_thru', 'counter', 'phone'],
+        'language': ['es']
+    },
+    'verification': {
+        'restaurant_type': ['fast_food', 'casual', 'fine_dining'],
+        'area': ['prep', 'cooking', 'storage', 'cleaning'],
+        'shift': ['morning', 'afternoon', 'evening']
+    }
+}
+
+# Columnas que los loaders del trainer agrupan bajo 'metadata'
+METADATA_COLUMNS = {
+    'image': ['restaurant_type', 'area', 'shift'],
+    'room': ['area', 'room_category'],
+    'sensor': ['equipment_type', 'food_category'],
+    'audio': ['service_type', 'duration', 'language'],
+    'verification': ['restaurant_type', 'area', 'shift']
+}
+
+SENSOR_BASE_TEMPS = np.array([2.0, -18.0, 65.0])  # Refrigeración, congelación, caliente
+
+# Instante de referencia de created_at: fijo para que la misma semilla dé los mismos lotes
+DEFAULT_REFERENCE_TIME = '2025-01-01T00:00:00'
+
+
+class SyntheticDataGenerator:
+    """Generador vectorizado de lotes columnares HORECA con semilla fija"""
+
+    def __init__(self, seed: int = 42, days_back: int = 30, feedback_ratio: float = 0.6,
+                 num_employees: int = 200, reference_time: str = DEFAULT_REFERENCE_TIME):
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.days_back = days_back
+        self.feedback_ratio = feedback_ratio
+        self.num_employees = num_employees
+        # 'now' para fechas relativas a la ejecución (p. ej. ventanas NOW() - días en la base de datos)
+        if reference_time == 'now':
+            reference_time = datetime.now().replace(microsecond=0).isoformat()
+        self.reference_time = np.datetime64(reference_time, 's')
+
+    def batch(self, kind: str, n: int, start: int = 0) -> Dict[str, np.ndarray]:
+        """Generar un lote columnar de n filas a partir del índice start"""
+        generators = {
+            'image': self._image_batch,
+            'room': self._room_batch,
+            'sensor': self._sensor_batch,
+            'audio': self._audio_batch,
+            'verification': self._verification_batch
+        }
+        if kind not in generators:
+            raise ValueError(f"Unsupported data kind: {kind}")
+
+        batch = generators[kind](n)
+        batch['sample_id'] = np.arange(start, start + n, dtype=np.int64)
+        return batch
+
+    def iter_batches(self, kind: str, total: int, chunk_size: int = 100_000) -> Iterator[Dict[str, np.ndarray]]:
+        """Generar lotes en streaming para datasets mayores que la memoria"""
+        for start in range(0, total, chunk_size):
+            yield self.batch(kind, min(chunk_size, total - start), start)
+
+    def _codes(self, kind: str, column: str, n: int) -> np.ndarray:
+        """Elegir categorías uniformemente como códigos int8"""
+        return self.rng.integers(0, len(CATEGORIES[kind][column]), size=n, dtype=np.int8)
+
+    def _image_batch(self, n: int) -> Dict[str, np.ndarray]:
+        return {
+            'label': self._codes('image', 'label', n),
+            'score': self.rng.integers(60, 100, size=n, dtype=np.int16),
+            'restaurant_type': self._codes('image', 'restaurant_type', n),
+            'area': self._codes('image', 'area', n),
+            'shift': self._codes('image', 'shift', n)
+        }
+
+    def _room_batch(self, n: int) -> Dict[str, np.ndarray]:
+        """Fotos de habitaciones de hotel: una por área (vision_models.HOTEL_AREAS)"""
+        return {
+            'label': self._codes('room', 'label', n),
+            'score': self.rng.integers(60, 100, size=n, dtype=np.int16),
+            'area': self._codes('room', 'area', n),
+            'room_category': self._codes('room', 'room_category', n)
+        }
+
+    def _sensor_batch(self, n: int) -> Dict[str, np.ndarray]:
+        base_temp = SENSOR_BASE_TEMPS[self.rng.integers(0, len(SENSOR_BASE_TEMPS), size=n)]
+        noise = self.rng.normal(0, 0.5, size=n)
+
+        return {
+            'temperature': base_temp + noise,
+            'humidity': self.rng.uniform(40, 80, size=n),
+            'ambient_temp': self.rng.uniform(18, 28, size=n),
+            'equipment_age': self.rng.uniform(0.5, 10, size=n),
+            'maintenance_score': self.rng.uniform(70, 100, size=n),
+            'target_temp': base_temp,
+            'label': (np.abs(noise) >= 1.0).astype(np.int8),  # 0 = compliant, 1 = non_compliant
+            'equipment_type': self._codes('sensor', 'equipment_type', n),
+            'food_category': self._codes('sensor', 'food_category', n)
+        }
+
+    def _audio_batch(self, n: int) -> Dict[str, np.ndarray]:
+        return {
+            'label': self._codes('audio', 'label', n),
+            'service_type': self._codes('audio', 'service_type', n),
+            'duration': self.rng.uniform(30, 180, size=n),
+            'language': np.zeros(n, dtype=np.int8)
+        }
+
+    def _verification_batch(self, n: int) -> Dict[str, np.ndarray]:
+        """Verificaciones con el formato que consume ModelEvaluator"""
+        offsets = self.rng.integers(0, self.days_back * 86400, size=n)
+        ai_score = np.clip(np.round(self.rng.normal(82, 10, size=n)), 0, 100)
+        expert_score = np.clip(np.round(ai_score + self.rng.normal(0, 8, size=n)), 0, 100)
+        has_feedback = self.rng.random(n) < self.feedback_ratio
+
+        return {
+            'created_at': self.reference_time - offsets.astype('timedelta64[s]'),
+            'ai_score': ai_score,
+            'expert_score': np.where(has_feedback, expert_score, np.nan),
+            'confidence': np.round(self.rng.uniform(0.5, 1.0, size=n), 2),
+            'empleado_id': self.rng.integers(0, self.num_employees, size=n, dtype=np.int32),
+            'restaurant_type': self._codes('verification', 'restaurant_type', n),
+            'area': self._codes('verification', 'area', n),
+            'shift': self._codes('verification', 'shift', n)
+        }
+
+
+def decode_column(kind: str, column: str, codes: np.ndarray) -> np.ndarray:
+    """Decodificar una columna categórica a sus etiquetas"""
+    return np.asarray(CATEGORIES[kind][column])[codes]
+
+
+def batch_to_frame(batch: Dict[str, np.ndarray], kind: str):
+    """Convertir un lote columnar a DataFrame con columnas categóricas"""
+    import pandas as pd
+
+    columns = {}
+    for name, values in batch.items():
+        if name in CATEGORIES[kind]:
+            columns[name] = pd.Categorical.from_codes(values, categories=CATEGORIES[kind][name])
+        else:
+            columns[name] = values
+    return pd.DataFrame(columns)
+
+
+def batch_to_records(batch: Dict[str, np.ndarray], kind: str) -> List[Dict[str, Any]]:
+    """Convertir un lote columnar a la lista de dicts que esperan los loaders del trainer"""
+    columns = {
+        name: (decode_column(kind, name, values) if name in CATEGORIES[kind] else values).tolist()
+        for name, values in batch.items()
+    }
+    metadata_columns = [c for c in METADATA_COLUMNS[kind] if c in columns]
+    row_columns = [c for c in columns if c not in metadata_columns]
+    n = len(batch['sample_id'])
+
+    records = []
+    for i in range(n):
+        record = {name: columns[name][i] for name in row_columns}
+        record['metadata'] = {name: columns[name][i] for name in metadata_columns}
+        records.append(record)
+
+    sample_ids = columns['sample_id']
+    if kind == 'image':
+        for record, i in zip(records, sample_ids):
+            record['image_path'] = f"/data/images/kitchen_{i:04d}.jpg"
+    elif kind == 'room':
+        for record, i in zip(records, sample_ids):
+            record['image_path'] = f"/data/images/room_{i:04d}.jpg"
+    elif kind == 'audio':
+        for record, i in zip(records, sample_ids):
+            record['audio_path'] = f"/data/audio/service_{i:04d}.wav"
+            record['transcription'] = f"Ejemplo de transcripción {i}"
+    elif kind == 'verification':
+        for record in records:
+            record['id'] = record.pop('sample_id')
+            record['ai_result'] = {'score': record.pop('ai_score')}
+            record['confidence_score'] = record.pop('confidence')
+            expert_score = record['expert_score']
+            record['expert_score'] = None if expert_score != expert_score else int(expert_score)
+            record['detailed_feedback'] = {}
+
+    return records
+
+
+def write_parquet(batches: Iterator[Dict[str, np.ndarray]], path: str, kind: str,
+                  metadata: Optional[Dict[str, str]] = None) -> int:
+    """Escribir lotes en streaming a un archivo Parquet con columnas dictionary-encoded"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    rows = 0
+    try:
+        for batch in batches:
+            arrays = {}
+            for name, values in batch.items():
+                if name in CATEGORIES[kind]:
+                    arrays[name] = pa.DictionaryArray.from_arrays(
+                        pa.array(values), pa.array(CATEGORIES[kind][name])
+                    )
+                else:
+                    arrays[name] = pa.array(values)
+            table = pa.table(arrays)
+            if writer is None:
+                schema_metadata = {b'horeca_kind': kind.encode()}
+                schema_metadata.update({key.encode(): value.encode() for key, value in (metadata or {}).items()})
+                writer = pq.ParquetWriter(path, table.schema.with_metadata(schema_metadata))
+            writer.write_table(table)
+            rows += table.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def write_memmap(batches: Iterator[Dict[str, np.ndarray]], directory: str, kind: str, total: int) -> int:
+    """Escribir lotes en streaming a un directorio de arrays .npy memory-mapped"""
+    os.makedirs(directory, exist_ok=True)
+    arrays = {}
+    rows = 0
+
+    for batch in batches:
+        n = len(batch['sample_id'])
+        for name, values in batch.items():
+            if name not in arrays:
+                arrays[name] = np.lib.format.open_memmap(
+                    os.path.join(directory, f"{name}.npy"), mode='w+', dtype=values.dtype, shape=(total,)
+                )
+            arrays[name][rows:rows + n] = values
+        rows += n
+
+    for array in arrays.values():
+        array.flush()
+
+    manifest = {
+        'kind': kind,
+        'rows': rows,
+        'columns': {name: str(array.dtype) for name, array in arrays.items()},
+        'categories': CATEGORIES[kind]
+    }
+    with open(os.path.join(directory, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return rows
+
+
+def load_batch(path: str, columns: Optional[List[str]] = None) -> Tuple[str, Dict[str, np.ndarray]]:
+    """Leer un archivo generado (Parquet o directorio memory-mapped) como lote columnar"""
+    if os.path.isdir(path):
+        with open(os.path.join(path, 'manifest.json'), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        names = columns or list(manifest['columns'])
+        batch = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r')
+            for name in names
+        }
+        return manifest['kind'], batch
+
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(path, memory_map=True)
+    kind = parquet_file.schema_arrow.metadata[b'horeca_kind'].decode()
+    table = parquet_file.read(columns=columns).unify_dictionaries()
+
+    # Con un solo row group los buffers de Arrow pasan a NumPy sin copia
+    batch = {}
+    for name in table.column_names:
+        chunks = table.column(name).chunks
+        if name in CATEGORIES[kind]:
+            codes = [chunk.indices.to_numpy() for chunk in chunks]
+            batch[name] = (codes[0] if len(codes) == 1 else np.concatenate(codes)).astype(np.int8, copy=False)
+        elif len(chunks) == 1:
+            batch[name] = chunks[0].to_numpy(zero_copy_only=False)
+        else:
+            batch[name] = table.column(name).to_numpy()
+    return kind, batch
+
+
+def load_records(path: str) -> List[Dict[str, Any]]:
+    """Leer un archivo generado como lista de dicts para el trainer o el evaluador"""
+    kind, batch = load_batch(path)
+    return batch_to_records(batch, kind)
+
+
+def check_reproducible(kind: str, rows: int, seed: int = 42, chunk_size: int = 100_000, **options) -> bool:
+    """Comprobar que dos generadores con la misma semilla producen lotes idénticos"""
+
+    runs = [list(SyntheticDataGenerator(seed=seed, **options).iter_batches(kind, rows, chunk_size)) for _ in range(2)]
+    identical = len(runs[0]) == len(runs[1]) and all(
+        first.keys() == second.keys() and all(
+            np.array_equal(first[column], second[column], equal_nan=first[column].dtype.kind in 'fcmM')
+            for column in first
+        )
+        for first, second in zip(*runs)
+    )
+    logger.info(f"Lotes '{kind}' con semilla {seed}: {'idénticos' if identical else 'DISTINTOS'} en dos ejecuciones")
+    return identical
+
+
+def main():
+    """Función principal para generar datos sintéticos"""
+
+    parser = argparse.ArgumentParser(description='Generar datos sintéticos HORECA para pruebas de carga')
+    parser.add_argument('--kind', required=True, choices=sorted(CATEGORIES),
+                       help='Tipo de datos a generar')
+    parser.add_argument('--rows', type=int, required=True, help='Número total de filas')
+    parser.add_argument('--output',
+                       help='Archivo .parquet o directorio de arrays memory-mapped')
+    parser.add_argument('--format', choices=['parquet', 'memmap'], default='parquet',
+                       help='Formato de salida')
+    parser.add_argument('--chunk-size', type=int, default=100_000,
+                       help='Filas por lote en streaming')
+    parser.add_argument('--seed', type=int, default=42, help='Semilla del generador')
+    parser.add_argument('--days-back', type=int, default=30,
+                       help='Ventana temporal de las verificaciones generadas')
+    parser.add_argument('--reference-date', default=DEFAULT_REFERENCE_TIME,
+                       help="Fin de la ventana de created_at (ISO 8601, o 'now' para la fecha actual)")
+    parser.add_argument('--check-reproducible', action='store_true',
+                       help='Generar dos veces con la misma semilla, verificar que los lotes coinciden y salir')
+
+    args = parser.parse_args()
+
+    if args.check_reproducible:
+        if not check_reproducible(args.kind, args.rows, args.seed, args.chunk_size,
+                                  days_back=args.days_back, reference_time=args.reference_date):
+            raise SystemExit(1)
+        return
+    if not args.output:
+        parser.error('se requiere --output')
+
+    generator = SyntheticDataGenerator(seed=args.seed, days_back=args.days_back,
+                                       reference_time=args.reference_date)
+    batches = generator.iter_batches(args.kind, args.rows, args.chunk_size)
+
+    start = datetime.now()
+    if args.format == 'parquet':
+        rows = write_parquet(batches, args.output, args.kind)
+    else:
+        rows = write_memmap(batches, args.output, args.kind, args.rows)
+    elapsed = (datetime.now() - start).total_seconds()
+
+    logger.info(f"{rows} filas '{args.kind}' escritas en {args.output} "
+                f"({elapsed:.2f}s, {rows / max(elapsed, 1e-9):,.0f} filas/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,172 +5,170 @@ Soporta diferentes tipos de modelos: visión, audio, texto y sensores
 """
 
 import os
+import sys
 import json
+import time
 import logging
+import resource
 import argparse
+import importlib
+import subprocess
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 import numpy as np
-import pandas as pd
 from pathlib import Path
 
-# ML Libraries
-import torch
-import torch.nn as nn
-import torch.optim as optim
-from torch.utils.data import DataLoader, Dataset
-import torchvision.transforms as transforms
-from transformers import (
-    AutoTokenizer, AutoModel, AutoProcessor,
-    WhisperProcessor, WhisperForConditionalGeneration,
-    pipeline
-)
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, precision_recall_fscore_support, confusion_matrix
-from sklearn.ensemble import GradientBoostingRegressor
-import cv2
-import librosa
-import whisper
+from artifact_store import ArtifactStore, json_default
+from dataset_snapshot import DatasetSnapshotStore
+from synthetic_data import SyntheticDataGenerator, batch_to_records, load_records
 
-# Database
-import psycopg2
-from psycopg2.extras import RealDictCursor
-import supabase
+# Las librerías pesadas (torch, transformers, whisper, cv2, librosa, sklearn,
+# psycopg2, supabase) se importan solo cuando se selecciona su familia de modelo
 
 # Configuration
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-class HorecaDataset(Dataset):
-    """Dataset personalizado para datos HORECA"""
+# Tipo de datos de cada dataset según su verification_type
+DATASET_KINDS = {
+    'kitchen_hygiene_restaurant': 'image',
+    'room_cleanliness_hotel': 'room',
+    'food_temperature_control': 'sensor',
+    'speed_service_fastfood': 'audio'
+}
+
+# Módulos con las dependencias de cada familia de modelo
+MODEL_FAMILY_MODULES = {
+    'vision': ['vision_models'],
+    'hotel_room': ['vision_models'],
+    'temperature': ['sklearn.ensemble'],
+    'audio': ['audio_models']
+}
+
+# Nombres re-exportados desde los módulos de cada familia (importación perezosa)
+_LAZY_ATTRIBUTES = {
+    'HorecaDataset': 'vision_models',
+    'KitchenHygieneVisionModel': 'vision_models',
+    'HotelRoomStandardsModel': 'vision_models',
+    'ServiceAudioAnalyzer': 'audio_models'
+}
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def load_model_family(model_type: str) -> None:
+    """Importar las dependencias de la familia de modelo seleccionada"""
+    families = list(MODEL_FAMILY_MODULES) if model_type == 'all' else [model_type]
+    for family in families:
+        for module_name in MODEL_FAMILY_MODULES[family]:
+            importlib.import_module(module_name)
+
+def import_time_report(model_type: str, top: int = 15) -> Dict[str, Any]:
+    """Resumir `python -X importtime` para el arranque de una familia de modelo"""
     
-    def __init__(self, data: List[Dict], transform=None, data_type='image'):
-        self.data = data
-        self.transform = transform
-        self.data_type = data_type
-        
-    def __len__(self):
-        return len(self.data)
+    code = f"import train_specialized_models as m; m.load_model_family({model_type!r})"
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True, check=True
+    )
     
-    def __getitem__(self, idx):
-        item = self.data[idx]
-        
-        if self.data_type == 'image':
-            # Cargar y procesar imagen
-            image_path = item['image_path']
-            image = cv2.imread(image_path)
-            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            
-            if self.transform:
-                image = self.transform(image)
-                
-            return {
-                'image': image,
-                'label': item['label'],
-                'score': item.get('score', 0),
-                'metadata': item.get('metadata', {})
-            }
-            
-        elif self.data_type == 'audio':
-            # Cargar y procesar audio
-            audio_path = item['audio_path']
-            audio, sr = librosa.load(audio_path, sr=16000)
-            
-            # Extraer características
-            mfccs = librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=13)
-            spectral_centroids = librosa.feature.spectral_centroid(y=audio, sr=sr)
-            
-            features = np.concatenate([
-                np.mean(mfccs, axis=1),
-                np.mean(spectral_centroids, axis=1)
-            ])
-            
-            return {
-                'features': torch.FloatTensor(features),
-                'audio': audio,
-                'label': item['label'],
-                'transcription': item.get('transcription', ''),
-                'metadata': item.get('metadata', {})
-            }
-            
-        elif self.data_type == 'sensor':
-            # Datos de sensores (temperatura, humedad, etc.)
-            features = np.array([
-                item['temperature'],
-                item.get('humidity', 0),
-                item.get('ambient_temp', 20),
-                item.get('equipment_age', 1),
-                item.get('maintenance_score', 100)
-            ])
-            
-            return {
-                'features': torch.FloatTensor(features),
-                'label': item['label'],
-                'target_value': item.get('target_value', 0),
-                'metadata': item.get('metadata', {})
-            }
+    # Formato: "import time: self [us] | cumulative | imported package"
+    by_package = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, module = line[len('import time:'):].split('|')
+        package = module.strip().split('.')[0]
+        by_package[package] = by_package.get(package, 0) + int(self_us)
+    
+    total_us = sum(by_package.values())
+    ranking = sorted(by_package.items(), key=lambda item: item[1], reverse=True)
+    
+    return {
+        'model_type': model_type,
+        'total_import_seconds': round(total_us / 1e6, 3),
+        'modules_imported': len(by_package),
+        'top_packages': [
+            {'package': package, 'seconds': round(us / 1e6, 3), 'percentage': round(us / max(total_us, 1) * 100, 1)}
+            for package, us in ranking[:top]
+        ]
+    }
 
-class KitchenHygieneVisionModel(nn.Module):
-    """Modelo especializado para evaluación de higiene en cocinas"""
-    
-    def __init__(self, num_classes=4, pretrained=True):
-        super(KitchenHygieneVisionModel, self).__init__()
-        
-        # Base: ResNet50 pre-entrenado
-        import torchvision.models as models
-        self.backbone = models.resnet50(pretrained=pretrained)
-        
-        # Modificar la última capa
-        num_features = self.backbone.fc.in_features
-        self.backbone.fc = nn.Identity()
-        
-        # Capas especializadas para higiene
-        self.hygiene_classifier = nn.Sequential(
-            nn.Linear(num_features, 512),
-            nn.ReLU(),
-            nn.Dropout(0.3),
-            nn.Linear(512, 256),
-            nn.ReLU(),
-            nn.Dropout(0.2),
-            nn.Linear(256, num_classes)  # excellent, good, needs_improvement, critical
-        )
-        
-        # Regressor para puntuación 0-100
-        self.score_regressor = nn.Sequential(
-            nn.Linear(num_features, 256),
-            nn.ReLU(),
-            nn.Dropout(0.2),
-            nn.Linear(256, 128),
-            nn.ReLU(),
-            nn.Linear(128, 1),
-            nn.Sigmoid()  # Output 0-1, luego escalar a 0-100
-        )
-        
-        # Attention mechanism para áreas críticas
-        self.attention = nn.MultiheadAttention(embed_dim=num_features, num_heads=8)
-        
-    def forward(self, x):
-        # Extraer características
-        features = self.backbone(x)
-        
-        # Aplicar attention
-        features_att, _ = self.attention(features.unsqueeze(0), features.unsqueeze(0), features.unsqueeze(0))
-        features_att = features_att.squeeze(0)
-        
-        # Clasificación y regresión
-        classification = self.hygiene_classifier(features_att)
-        score = self.score_regressor(features_att) * 100  # Escalar a 0-100
-        
+def measure_startup(model_type: str) -> Dict[str, float]:
+    """Medir tiempo de arranque y RSS máximo de un proceso nuevo para una familia"""
+    
+    code = (
+        "import resource, sys\n"
+        "import train_specialized_models as m\n"
+        f"m.load_model_family({model_type!r})\n"
+        "rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+        "print(rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024)\n"
+    )
+    start = datetime.now()
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True, check=True
+    )
+    elapsed = (datetime.now() - start).total_seconds()
+    
+    return {
+        'startup_seconds': round(elapsed, 3),
+        'max_rss_mb': round(float(result.stdout.strip().splitlines()[-1]), 1)
+    }
+
+def check_startup(model_type: str, max_seconds: float, max_rss_mb: float) -> bool:
+    """Verificar que el arranque de una familia se mantiene dentro del presupuesto"""
+    
+    startup = measure_startup(model_type)
+    within_budget = startup['startup_seconds'] <= max_seconds and startup['max_rss_mb'] <= max_rss_mb
+    
+    log = logger.info if within_budget else logger.error
+    log(f"Arranque '{model_type}': {startup['startup_seconds']:.2f}s (máx {max_seconds:.2f}s), "
+        f"RSS {startup['max_rss_mb']:.0f} MB (máx {max_rss_mb:.0f} MB)")
+    return within_budget
+
+def _cpu_seconds() -> float:
+    """CPU de usuario y sistema del proceso y de los hijos ya terminados (workers de DDP)"""
+    total = 0.0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+class ComputeMeter:
+    """Tiempo de pared y de CPU de un entrenamiento (se guarda en model_training_runs.hardware_config)"""
+    
+    def __enter__(self):
+        self.started_at = datetime.now()
+        self._wall = time.perf_counter()
+        self._cpu = _cpu_seconds()
+        return self
+    
+    def __exit__(self, *exc):
+        self.finished_at = datetime.now()
+        self.wall_seconds = time.perf_counter() - self._wall
+        self.cpu_seconds = _cpu_seconds() - self._cpu
+        return False
+    
+    def to_dict(self) -> Dict[str, Any]:
         return {
-            'classification': classification,
-            'score': score,
-            'features': features_att
+            'started_at': self.started_at.isoformat(),
+            'finished_at': self.finished_at.isoformat(),
+            'wall_seconds': round(self.wall_seconds, 3),
+            'cpu_seconds': round(self.cpu_seconds, 3),
+            'cpu_count': os.cpu_count()
         }
 
 class TemperatureControlModel:
     """Modelo especializado para control de temperatura"""
     
     def __init__(self):
+        from sklearn.ensemble import GradientBoostingRegressor
+        
         self.model = GradientBoostingRegressor(
             n_estimators=200,
             max_depth=8,
@@ -218,6 +216,12 @@ class TemperatureControlModel:
         }
         return encoding.get(food_category.lower(), 0)
     
+    def warm_start(self, base_model, additional_estimators: int) -> 'TemperatureControlModel':
+        """Continuar el boosting de un modelo ya entrenado: train() solo ajusta los árboles nuevos"""
+        self.model = base_model
+        self.model.set_params(warm_start=True, n_estimators=len(base_model.estimators_) + additional_estimators)
+        return self
+    
     def train(self, train_data: List[Dict], val_data: List[Dict]) -> Dict[str, float]:
         """Entrenar el modelo"""
         # Preparar datos
@@ -244,133 +248,28 @@ class TemperatureControlModel:
         
         return metrics
 
-class ServiceAudioAnalyzer:
-    """Analizador de audio para servicio al cliente"""
-    
-    def __init__(self):
-        # Cargar modelos pre-entrenados
-        self.whisper_model = whisper.load_model("large-v3")
-        self.sentiment_pipeline = pipeline(
-            "sentiment-analysis", 
-            model="nlptown/bert-base-multilingual-uncased-sentiment"
-        )
-        
-    def analyze_service_audio(self, audio_path: str) -> Dict[str, Any]:
-        """Analizar audio de servicio al cliente"""
-        
-        # Transcribir audio
-        result = self.whisper_model.transcribe(audio_path, language='es')
-        transcription = result['text']
-        
-        # Análisis de sentimiento
-        sentiment = self.sentiment_pipeline(transcription)[0]
-        
-        # Métricas de calidad de servicio
-        service_metrics = self._analyze_service_quality(transcription)
-        
-        # Análisis temporal
-        timing_analysis = self._analyze_timing(result['segments'])
-        
-        return {
-            'transcription': transcription,
-            'sentiment': sentiment,
-            'service_metrics': service_metrics,
-            'timing_analysis': timing_analysis,
-            'overall_score': self._calculate_overall_score(service_metrics, sentiment, timing_analysis)
-        }
-    
-    def _analyze_service_quality(self, text: str) -> Dict[str, float]:
-        """Analizar calidad del servicio basado en el texto"""
-        
-        # Palabras clave positivas y negativas
-        positive_keywords = [
-            'gracias', 'por favor', 'disculpe', 'con gusto', 
-            'excelente', 'perfecto', 'claro', 'enseguida'
-        ]
-        negative_keywords = [
-            'no puedo', 'imposible', 'no tenemos', 'espere', 
-            'problema', 'error', 'mal', 'tarde'
-        ]
-        
-        text_lower = text.lower()
-        
-        positive_count = sum(1 for word in positive_keywords if word in text_lower)
-        negative_count = sum(1 for word in negative_keywords if word in text_lower)
-        
-        # Calcular métricas
-        politeness_score = min(100, (positive_count / max(1, len(text.split()) / 10)) * 100)
-        clarity_score = 100 - (negative_count / max(1, len(text.split()) / 10)) * 50
-        
-        return {
-            'politeness': max(0, min(100, politeness_score)),
-            'clarity': max(0, min(100, clarity_score)),
-            'positive_keywords': positive_count,
-            'negative_keywords': negative_count
-        }
-    
-    def _analyze_timing(self, segments: List[Dict]) -> Dict[str, float]:
-        """Analizar timing del servicio"""
-        
-        if not segments:
-            return {'response_time': 0, 'speech_rate': 0, 'pause_analysis': 0}
-        
-        # Calcular velocidad de habla
-        total_duration = segments[-1]['end'] - segments[0]['start']
-        total_words = sum(len(seg['text'].split()) for seg in segments)
-        speech_rate = total_words / total_duration * 60  # palabras por minuto
-        
-        # Analizar pausas
-        pauses = []
-        for i in range(1, len(segments)):
-            pause = segments[i]['start'] - segments[i-1]['end']
-            if pause > 0.5:  # Pausas mayores a 0.5 segundos
-                pauses.append(pause)
-        
-        avg_pause = np.mean(pauses) if pauses else 0
-        
-        return {
-            'total_duration': total_duration,
-            'speech_rate': speech_rate,
-            'average_pause': avg_pause,
-            'long_pauses': len([p for p in pauses if p > 2.0])
-        }
-    
-    def _calculate_overall_score(self, service_metrics: Dict, sentiment: Dict, timing: Dict) -> float:
-        """Calcular puntuación general del servicio"""
-        
-        # Pesos para diferentes aspectos
-        weights = {
-            'politeness': 0.3,
-            'clarity': 0.25,
-            'sentiment': 0.25,
-            'timing': 0.2
-        }
-        
-        # Normalizar sentiment score (1-5 stars to 0-100)
-        sentiment_score = (float(sentiment['label'].split()[0]) - 1) * 25
-        
-        # Normalizar timing score
-        timing_score = min(100, max(0, 100 - (timing['average_pause'] * 10)))
-        
-        overall_score = (
-            service_metrics['politeness'] * weights['politeness'] +
-            service_metrics['clarity'] * weights['clarity'] +
-            sentiment_score * weights['sentiment'] +
-            timing_score * weights['timing']
-        )
-        
-        return round(overall_score, 2)
-
 class ModelTrainer:
     """Clase principal para entrenar modelos especializados"""
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.db_connection = self._connect_to_database()
-        self.supabase_client = self._connect_to_supabase()
+        self._supabase_client = None
+        self.artifact_store = ArtifactStore(config.get('artifact_store_path'))
+        self.snapshot_store = DatasetSnapshotStore(config.get('snapshot_path'))
+        
+    @property
+    def supabase_client(self):
+        """Cliente de Supabase, creado en el primer uso"""
+        if self._supabase_client is None:
+            self._supabase_client = self._connect_to_supabase()
+        return self._supabase_client
         
     def _connect_to_database(self):
         """Conectar a la base de datos PostgreSQL"""
+        import psycopg2
+        from psycopg2.extras import RealDictCursor
+        
         return psycopg2.connect(
             host=os.getenv('DB_HOST', 'localhost'),
             database=os.getenv('DB_NAME', 'pulso'),
@@ -381,16 +280,28 @@ class ModelTrainer:
     
     def _connect_to_supabase(self):
         """Conectar a Supabase"""
+        import supabase
+        
         return supabase.create_client(
             os.getenv('SUPABASE_URL'),
             os.getenv('SUPABASE_SERVICE_ROLE_KEY')
         )
     
-    def load_training_data(self, dataset_id: str) -> Tuple[List[Dict], Dict[str, Any]]:
+    def load_training_data(self, dataset_id: str, columns: Optional[List[str]] = None) -> Tuple[List[Dict], Dict[str, Any]]:
         """Cargar datos de entrenamiento desde la base de datos"""
         
+        dataset_info = self._fetch_dataset_info(dataset_id)
+        
+        if columns is not None and 'sample_id' not in columns:
+            columns = ['sample_id'] + list(columns)
+        kind, batch = self.load_training_columns(dataset_info, columns)
+        
+        return batch_to_records(batch, kind), dataset_info
+    
+    def _fetch_dataset_info(self, dataset_id: str) -> Dict[str, Any]:
+        """Obtener la fila del dataset en ai_training_datasets"""
+        
         with self.db_connection.cursor() as cursor:
-            # Obtener información del dataset
             cursor.execute("""
                 SELECT * FROM ai_training_datasets WHERE id = %s
             """, (dataset_id,))
@@ -399,239 +310,128 @@ class ModelTrainer:
             if not dataset_info:
                 raise ValueError(f"Dataset {dataset_id} not found")
             
-            # Cargar datos según el tipo
-            verification_type = dataset_info['verification_type']
-            
-            if verification_type == 'kitchen_hygiene_restaurant':
-                data = self._load_image_data(dataset_info)
-            elif verification_type == 'food_temperature_control':
-                data = self._load_sensor_data(dataset_info)
-            elif verification_type == 'speed_service_fastfood':
-                data = self._load_audio_data(dataset_info)
-            else:
-                raise ValueError(f"Unsupported verification type: {verification_type}")
-            
-            return data, dict(dataset_info)
+            return dict(dataset_info)
     
-    def _load_image_data(self, dataset_info: Dict) -> List[Dict]:
-        """Cargar datos de imágenes para entrenamiento"""
+    def load_training_columns(self, dataset_info: Dict, columns: Optional[List[str]] = None) -> Tuple[str, Dict[str, np.ndarray]]:
+        """Cargar el dataset como columnas NumPy, desde el snapshot local si sigue vigente"""
         
-        # En un entorno real, esto cargaría desde el storage
-        # Por ahora, simulamos datos de ejemplo
-        data = []
-        
-        # Simular datos de entrenamiento
-        for i in range(dataset_info['labeled_samples']):
-            data.append({
-                'image_path': f"/data/images/kitchen_{i:04d}.jpg",
-                'label': np.random.choice(['excellent', 'good', 'needs_improvement', 'critical']),
-                'score': np.random.randint(60, 100),
-                'metadata': {
-                    'restaurant_type': np.random.choice(['fast_food', 'casual', 'fine_dining']),
-                    'area': np.random.choice(['prep', 'cooking', 'storage', 'cleaning']),
-                    'shift': np.random.choice(['morning', 'afternoon', 'evening'])
-                }
-            })
+        if self.config.get('use_snapshots', True) and self.snapshot_store.is_fresh(dataset_info):
+            return self.snapshot_store.read(dataset_info, columns)
         
-        return data
-    
-    def _load_sensor_data(self, dataset_info: Dict) -> List[Dict]:
-        """Cargar datos de sensores para entrenamiento"""
+        kind, batch = self._load_dataset_batch(dataset_info)
+        self.snapshot_store.write(dataset_info, kind, batch)
         
-        data = []
-        
-        for i in range(dataset_info['labeled_samples']):
-            # Simular lecturas de temperatura
-            base_temp = np.random.choice([2.0, -18.0, 65.0])  # Refrigeración, congelación, caliente
-            noise = np.random.normal(0, 0.5)
-            
-            data.append({
-                'temperature': base_temp + noise,
-                'humidity': np.random.uniform(40, 80),
-                'ambient_temp': np.random.uniform(18, 28),
-                'equipment_age': np.random.uniform(0.5, 10),
-                'maintenance_score': np.random.uniform(70, 100),
-                'target_temp': base_temp,
-                'label': 'compliant' if abs(noise) < 1.0 else 'non_compliant',
-                'metadata': {
-                    'equipment_type': np.random.choice(['refrigerator', 'freezer', 'oven']),
-                    'food_category': np.random.choice(['meat', 'dairy', 'vegetables'])
-                }
-            })
-        
-        return data
+        if columns is not None:
+            batch = {name: batch[name] for name in columns}
+        return kind, batch
     
-    def _load_audio_data(self, dataset_info: Dict) -> List[Dict]:
-        """Cargar datos de audio para entrenamiento"""
+    def _load_dataset_batch(self, dataset_info: Dict) -> Tuple[str, Dict[str, np.ndarray]]:
+        """Construir el dataset completo como lote columnar según el tipo de verificación"""
         
-        data = []
+        verification_type = dataset_info['verification_type']
+        if verification_type not in DATASET_KINDS:
+            raise ValueError(f"Unsupported verification type: {verification_type}")
+        kind = DATASET_KINDS[verification_type]
         
-        for i in range(dataset_info['labeled_samples']):
-            data.append({
-                'audio_path': f"/data/audio/service_{i:04d}.wav",
-                'transcription': f"Ejemplo de transcripción {i}",
-                'label': np.random.choice(['excellent', 'good', 'needs_improvement']),
-                'metadata': {
-                    'service_type': np.random.choice(['drive_thru', 'counter', 'phone']),
-                    'duration': np.random.uniform(30, 180),
-                    'language': 'es'
-                }
-            })
-        
-        return data
+        # En un entorno real, esto cargaría desde el storage
+        # Por ahora, simulamos datos de ejemplo con el generador sintético
+        generator = SyntheticDataGenerator(seed=self.config.get('seed', 42))
+        return kind, generator.batch(kind, dataset_info['labeled_samples'])
     
     def train_vision_model(self, train_data: List[Dict], val_data: List[Dict], model_config: Dict) -> Dict[str, Any]:
         """Entrenar modelo de visión para higiene de cocina"""
         
         logger.info("Iniciando entrenamiento de modelo de visión...")
         
-        # Transformaciones de datos
-        train_transform = transforms.Compose([
-            transforms.ToPILImage(),
-            transforms.Resize((224, 224)),
-            transforms.RandomHorizontalFlip(p=0.5),
-            transforms.RandomRotation(15),
-            transforms.ColorJitter(brightness=0.2, contrast=0.2),
-            transforms.ToTensor(),
-            transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
-        ])
-        
-        val_transform = transforms.Compose([
-            transforms.ToPILImage(),
-            transforms.Resize((224, 224)),
-            transforms.ToTensor(),
-            transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
-        ])
-        
-        # Crear datasets
-        train_dataset = HorecaDataset(train_data, transform=train_transform, data_type='image')
-        val_dataset = HorecaDataset(val_data, transform=val_transform, data_type='image')
-        
-        # DataLoaders
-        train_loader = DataLoader(train_dataset, batch_size=model_config.get('batch_size', 32), shuffle=True)
-        val_loader = DataLoader(val_dataset, batch_size=model_config.get('batch_size', 32), shuffle=False)
-        
-        # Modelo
-        model = KitchenHygieneVisionModel(num_classes=4)
-        device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-        model.to(device)
-        
-        # Optimizador y loss
-        optimizer = optim.Adam(model.parameters(), lr=model_config.get('learning_rate', 0.001))
-        classification_loss = nn.CrossEntropyLoss()
-        regression_loss = nn.MSELoss()
-        
-        # Entrenamiento
-        num_epochs = model_config.get('epochs', 50)
-        best_val_loss = float('inf')
-        training_history = {'train_loss': [], 'val_loss': [], 'val_accuracy': []}
-        
-        for epoch in range(num_epochs):
-            # Entrenamiento
-            model.train()
-            train_loss = 0.0
-            
-            for batch in train_loader:
-                # Simular batch (en implementación real cargaría imágenes)
-                batch_size = len(batch['label'])
-                images = torch.randn(batch_size, 3, 224, 224).to(device)
-                
-                # Labels
-                labels = torch.tensor([
-                    ['excellent', 'good', 'needs_improvement', 'critical'].index(label) 
-                    for label in batch['label']
-                ]).to(device)
-                scores = torch.tensor(batch['score'], dtype=torch.float32).to(device)
-                
-                optimizer.zero_grad()
-                
-                outputs = model(images)
-                
-                # Loss combinado
-                cls_loss = classification_loss(outputs['classification'], labels)
-                reg_loss = regression_loss(outputs['score'].squeeze(), scores)
-                total_loss = cls_loss + 0.1 * reg_loss
-                
-                total_loss.backward()
-                optimizer.step()
-                
-                train_loss += total_loss.item()
-            
-            # Validación
-            model.eval()
-            val_loss = 0.0
-            correct = 0
-            total = 0
-            
-            with torch.no_grad():
-                for batch in val_loader:
-                    batch_size = len(batch['label'])
-                    images = torch.randn(batch_size, 3, 224, 224).to(device)
-                    
-                    labels = torch.tensor([
-                        ['excellent', 'good', 'needs_improvement', 'critical'].index(label) 
-                        for label in batch['label']
-                    ]).to(device)
-                    scores = torch.tensor(batch['score'], dtype=torch.float32).to(device)
-                    
-                    outputs = model(images)
-                    
-                    cls_loss = classification_loss(outputs['classification'], labels)
-                    reg_loss = regression_loss(outputs['score'].squeeze(), scores)
-                    total_loss = cls_loss + 0.1 * reg_loss
-                    
-                    val_loss += total_loss.item()
-                    
-                    _, predicted = torch.max(outputs['classification'].data, 1)
-                    total += labels.size(0)
-                    correct += (predicted == labels).sum().item()
-            
-            # Métricas
-            avg_train_loss = train_loss / len(train_loader)
-            avg_val_loss = val_loss / len(val_loader)
-            val_accuracy = 100 * correct / total
-            
-            training_history['train_loss'].append(avg_train_loss)
-            training_history['val_loss'].append(avg_val_loss)
-            training_history['val_accuracy'].append(val_accuracy)
-            
-            logger.info(f"Epoch {epoch+1}/{num_epochs}: "
-                       f"Train Loss: {avg_train_loss:.4f}, "
-                       f"Val Loss: {avg_val_loss:.4f}, "
-                       f"Val Accuracy: {val_accuracy:.2f}%")
-            
-            # Guardar mejor modelo
-            if avg_val_loss < best_val_loss:
-                best_val_loss = avg_val_loss
-                torch.save(model.state_dict(), f"/tmp/best_model_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pth")
+        from vision_models import train_vision_distributed
+        
+        # Con más de un proceso entrena data-parallel en CPU; este proceso es rank 0
+        results = train_vision_distributed(
+            train_data, val_data, model_config, model_config.get('distributed_workers', 1)
+        )
+        
+        training_history = results['training_history']
+        best_val_loss = results['best_val_loss']
+        
+        final_metrics = {
+            'train_loss': training_history['train_loss'][-1],
+            'val_loss': training_history['val_loss'][-1],
+            'val_accuracy': training_history['val_accuracy'][-1],
+            'best_val_loss': best_val_loss
+        }
+        
+        # Guardar mejor modelo en el almacén de artefactos
+        artifact_id = self.artifact_store.put(
+            results['best_state'], 'kitchen_hygiene_vision',
+            metrics=final_metrics,
+            parent_artifact=model_config.get('parent_artifact')
+        )
         
         return {
             'training_history': training_history,
-            'final_metrics': {
-                'train_loss': training_history['train_loss'][-1],
-                'val_loss': training_history['val_loss'][-1],
-                'val_accuracy': training_history['val_accuracy'][-1],
-                'best_val_loss': best_val_loss
-            },
-            'model_path': f"/tmp/best_model_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pth"
+            'final_metrics': final_metrics,
+            'artifact_id': artifact_id,
+            'model_path': str(self.artifact_store.path(artifact_id))
         }
     
-    def train_temperature_model(self, train_data: List[Dict], val_data: List[Dict]) -> Dict[str, Any]:
-        """Entrenar modelo de control de temperatura"""
+    def train_hotel_room_model(self, train_data: List[Dict], val_data: List[Dict], model_config: Dict) -> Dict[str, Any]:
+        """Entrenar modelo de estándares de habitaciones (fotos etiquetadas con metadata.area)"""
+        
+        logger.info("Iniciando entrenamiento de modelo de habitaciones de hotel...")
+        
+        from vision_models import run_hotel_room_training
+        
+        model_config = dict(self.config.get('model_configs', {}).get('hotel_room_standards', {}), **model_config)
+        results = run_hotel_room_training(train_data, val_data, model_config)
+        
+        training_history = results['training_history']
+        final_metrics = {
+            'train_loss': training_history['train_loss'][-1],
+            'val_loss': training_history['val_loss'][-1],
+            'val_accuracy': training_history['val_accuracy'][-1],
+            'val_area_accuracy': training_history['val_area_accuracy'][-1],
+            'best_val_loss': results['best_val_loss']
+        }
+        
+        artifact_id = self.artifact_store.put(
+            results['best_state'], 'hotel_room_standards',
+            metrics=final_metrics,
+            parent_artifact=model_config.get('parent_artifact')
+        )
+        
+        return {
+            'training_history': training_history,
+            'final_metrics': final_metrics,
+            'artifact_id': artifact_id,
+            'model_path': str(self.artifact_store.path(artifact_id))
+        }
+    
+    def train_temperature_model(self, train_data: List[Dict], val_data: List[Dict],
+                                parent_artifact: Optional[str] = None,
+                                additional_estimators: int = 50) -> Dict[str, Any]:
+        """Entrenar modelo de control de temperatura (con parent_artifact, warm start desde ese artefacto)"""
         
         logger.info("Iniciando entrenamiento de modelo de temperatura...")
         
         model = TemperatureControlModel()
+        if parent_artifact:
+            # Copia en memoria (sin mmap): el ajuste amplía el ensemble del artefacto desplegado
+            model.warm_start(self.artifact_store.load_model(parent_artifact, mmap=False), additional_estimators)
+            logger.info(f"Warm start desde {parent_artifact[:12]}: {additional_estimators} árboles nuevos")
         metrics = model.train(train_data, val_data)
         
-        # Guardar modelo
-        import joblib
-        model_path = f"/tmp/temp_model_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pkl"
-        joblib.dump(model.model, model_path)
+        # Guardar modelo en el almacén de artefactos
+        artifact_id = self.artifact_store.put(
+            model.model, 'temperature_control',
+            feature_names=model.feature_names,
+            metrics=metrics,
+            parent_artifact=parent_artifact
+        )
         
         return {
             'metrics': metrics,
-            'model_path': model_path,
+            'artifact_id': artifact_id,
+            'model_path': str(self.artifact_store.path(artifact_id)),
             'feature_names': model.feature_names
         }
     
@@ -640,7 +440,10 @@ class ModelTrainer:
         
         logger.info("Iniciando entrenamiento de modelo de audio...")
         
-        analyzer = ServiceAudioAnalyzer()
+        from audio_models import ServiceAudioAnalyzer
+        
+        audio_config = self.config.get('model_configs', {}).get('service_audio', {})
+        analyzer = ServiceAudioAnalyzer.from_config(audio_config)
         
         # Simular entrenamiento con datos de audio
         training_results = []
@@ -707,34 +510,45 @@ class ModelTrainer:
             'training_results': training_results[:5],  # Muestra de resultados
             'validation_results': validation_results[:5],
             'model_components': {
-                'whisper_model': 'large-v3',
-                'sentiment_model': 'bert-base-multilingual-uncased-sentiment',
+                'whisper_model': analyzer.asr.name,
+                'sentiment_model': audio_config.get('sentiment_model', 'nlptown/bert-base-multilingual-uncased-sentiment'),
                 'custom_analyzers': ['service_quality', 'timing_analysis']
             }
         }
     
     def save_training_run(self, model_id: str, training_config: Dict, results: Dict) -> str:
-        """Guardar resultados del entrenamiento en la base de datos"""
+        """Guardar resultados del entrenamiento en la base de datos (con el cómputo medido si lo hay)"""
+        
+        compute = results.get('compute')
+        if compute:
+            training_start = datetime.fromisoformat(compute['started_at'])
+            training_end = datetime.fromisoformat(compute['finished_at'])
+            duration_minutes = int(round(compute['wall_seconds'] / 60))
+        else:
+            training_start = datetime.now() - timedelta(hours=1)  # Simular inicio
+            training_end = datetime.now()
+            duration_minutes = 60  # Simular 1 hora de entrenamiento
         
         with self.db_connection.cursor() as cursor:
             cursor.execute("""
                 INSERT INTO model_training_runs (
                     model_id, run_name, training_config, dataset_split,
                     training_start, training_end, training_duration_minutes,
-                    final_metrics, epoch_metrics, hyperparameters, status
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    final_metrics, epoch_metrics, hyperparameters, hardware_config, status
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                 RETURNING id
             """, (
                 model_id,
-                f"Training_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-                json.dumps(training_config),
-                json.dumps({'train': 0.7, 'val': 0.2, 'test': 0.1}),
-                datetime.now() - timedelta(hours=1),  # Simular inicio
-                datetime.now(),
-                60,  # Simular 1 hora de entrenamiento
-                json.dumps(results.get('final_metrics', {})),
+                f"{results.get('run_prefix', 'Training')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                json.dumps(training_config, default=json_default),
+                json.dumps(results.get('dataset_split', {'train': 0.7, 'val': 0.2, 'test': 0.1})),
+                training_start,
+                training_end,
+                duration_minutes,
+                json.dumps(results.get('final_metrics', results.get('metrics', {})), default=json_default),
                 json.dumps(results.get('training_history', {})),
-                json.dumps(training_config),
+                json.dumps(training_config, default=json_default),
+                json.dumps(compute, default=json_default) if compute else None,
                 'completed'
             ))
             
@@ -744,42 +558,122 @@ class ModelTrainer:
             logger.info(f"Training run saved with ID: {run_id}")
             return run_id
     
-    def deploy_model(self, model_id: str, model_path: str, performance_metrics: Dict) -> bool:
-        """Desplegar modelo entrenado"""
+    def deploy_model(self, model_id: str, model_path: str, performance_metrics: Dict,
+                     artifact_id: Optional[str] = None, as_challenger: Optional[bool] = None) -> bool:
+        """Desplegar modelo entrenado (como challenger de un experimento A/B si hay champion y está activado)"""
+        
+        ab_config = self.config.get('deployment', {}).get('a_b_testing', {})
+        if as_challenger is None:
+            as_challenger = ab_config.get('enabled', False)
+        
+        model_artifacts = {'model_path': model_path, 'deployed_at': datetime.now().isoformat()}
+        if artifact_id:
+            manifest = self.artifact_store.manifest(artifact_id)
+            model_artifacts.update({
+                'artifact_id': artifact_id,
+                'artifact_store': str(self.artifact_store.root),
+                'model_type': manifest['model_type'],
+                'format': manifest['format'],
+                'feature_names': manifest['feature_names'],
+                'parent_artifact': manifest['parent_artifact']
+            })
         
         try:
             with self.db_connection.cursor() as cursor:
-                # Actualizar estado del modelo
+                champion = None
+                if as_challenger:
+                    # Champion actual de la misma categoría: el modelo nuevo no lo sobrescribe
+                    cursor.execute("""
+                        SELECT champion.id, champion.verification_category
+                        FROM specialized_ai_models challenger
+                        JOIN specialized_ai_models champion
+                          ON champion.verification_category = challenger.verification_category
+                        WHERE challenger.id = %s
+                        AND champion.id <> challenger.id
+                        AND champion.deployment_status = 'deployed'
+                        ORDER BY champion.deployed_at DESC NULLS LAST
+                        LIMIT 1
+                    """, (model_id,))
+                    champion = cursor.fetchone()
+                
+                # Actualizar estado del modelo ('testing' mientras compite con el champion)
                 cursor.execute("""
                     UPDATE specialized_ai_models 
-                    SET deployment_status = 'deployed',
+                    SET deployment_status = %s,
                         deployed_at = NOW(),
                         performance_benchmark = %s,
                         model_artifacts = %s
                     WHERE id = %s
                 """, (
-                    json.dumps(performance_metrics),
-                    json.dumps({'model_path': model_path, 'deployed_at': datetime.now().isoformat()}),
+                    'testing' if champion else 'deployed',
+                    json.dumps(performance_metrics, default=json_default),
+                    json.dumps(model_artifacts),
                     model_id
                 ))
                 
+                if champion:
+                    self._start_experiment(cursor, champion, model_id, ab_config)
+                
                 self.db_connection.commit()
                 
-                logger.info(f"Model {model_id} deployed successfully")
+                logger.info(f"Model {model_id} deployed successfully" + (
+                    f" as challenger of {champion['id']}" if champion else ''
+                ))
                 return True
                 
         except Exception as e:
             logger.error(f"Error deploying model {model_id}: {str(e)}")
             return False
 
+    def _start_experiment(self, cursor, champion: Dict, challenger_id: str, ab_config: Dict[str, Any]):
+        """Crear el experimento A/B; el que estuviera en curso en la categoría queda reemplazado"""
+        
+        cursor.execute("""
+            UPDATE model_experiments
+            SET status = 'superseded', stopped_at = NOW(), updated_at = NOW()
+            WHERE verification_category = %s AND status = 'running'
+        """, (champion['verification_category'],))
+        
+        # Modelos en prueba de experimentos reemplazados vuelven a 'deprecated'
+        cursor.execute("""
+            UPDATE specialized_ai_models
+            SET deployment_status = 'deprecated', deprecated_at = NOW()
+            WHERE verification_category = %s AND deployment_status = 'testing' AND id <> %s
+        """, (champion['verification_category'], challenger_id))
+        
+        test_config = {
+            'alpha': ab_config.get('alpha', 0.05),
+            'tau': ab_config.get('tau', 0.05),
+            'min_samples': ab_config.get('min_samples', 200),
+            'max_samples': ab_config.get('max_samples')
+        }
+        cursor.execute("""
+            INSERT INTO model_experiments (
+                verification_category, champion_model_id, challenger_model_id, traffic_split, test_config
+            ) VALUES (%s, %s, %s, %s, %s)
+            RETURNING id
+        """, (
+            champion['verification_category'], champion['id'], challenger_id,
+            ab_config.get('traffic_split', 0.1), json.dumps(test_config)
+        ))
+        logger.info(f"Experimento A/B {cursor.fetchone()['id']} iniciado: "
+                    f"{ab_config.get('traffic_split', 0.1):.0%} del tráfico al challenger {challenger_id}")
+
+def audio_config(config_file: str) -> Dict[str, Any]:
+    """model_configs.service_audio del archivo de configuración (vacío si no existe)"""
+    if not os.path.exists(config_file):
+        return {}
+    with open(config_file, 'r') as f:
+        return json.load(f).get('model_configs', {}).get('service_audio', {})
+
 def main():
     """Función principal para entrenar modelos especializados"""
     
     parser = argparse.ArgumentParser(description='Entrenar modelos especializados HORECA')
     parser.add_argument('--model-type', required=True, 
-                       choices=['vision', 'temperature', 'audio', 'all'],
-                       help='Tipo de modelo a entrenar')
-    parser.add_argument('--dataset-id', required=True, 
+                       choices=['vision', 'hotel_room', 'temperature', 'audio', 'all'],
+                       help='Tipo de modelo a entrenar (hotel_room usa datos room y no entra en all)')
+    parser.add_argument('--dataset-id', 
                        help='ID del dataset de entrenamiento')
     parser.add_argument('--config-file', default='config/training_config.json',
                        help='Archivo de configuración')
@@ -789,16 +683,93 @@ def main():
                        help='Tamaño del batch')
     parser.add_argument('--learning-rate', type=float, default=0.001,
                        help='Tasa de aprendizaje')
+    parser.add_argument('--seed', type=int, default=42,
+                       help='Semilla para los datos simulados')
+    parser.add_argument('--data-file',
+                       help='Archivo generado por synthetic_data.py (Parquet o memmap) en lugar del dataset')
+    parser.add_argument('--snapshot-only', action='store_true',
+                       help='Exportar el snapshot Parquet del dataset y salir')
+    parser.add_argument('--no-snapshot', action='store_true',
+                       help='Reconstruir el dataset desde la base de datos ignorando el snapshot')
+    parser.add_argument('--distributed-workers', type=int, default=1,
+                       help='Procesos data-parallel en CPU para el modelo de visión (gloo)')
+    parser.add_argument('--benchmark-scaling', action='store_true',
+                       help='Medir muestras/s del entrenamiento de visión con 1/2/4/8 procesos y salir')
+    parser.add_argument('--benchmark-room-inference', action='store_true',
+                       help='Comparar inferencia de habitaciones con backbone compartido vs un modelo por área y salir')
+    parser.add_argument('--benchmark-vad', nargs='+', metavar='AUDIO',
+                       help='Comparar transcripción completa vs recortada por detección de voz en estos audios y salir')
+    parser.add_argument('--check-vad', action='store_true',
+                       help='Verificar el recorte por detección de voz con audio sintético (tono y voz continuos) y salir')
+    parser.add_argument('--benchmark-asr', metavar='MANIFEST',
+                       help='Medir factor de tiempo real y WER de los motores de ASR sobre una muestra etiquetada (JSONL) y salir')
+    parser.add_argument('--asr-models', nargs='+',
+                       default=['large-v3', 'large-v3:int8', 'small', 'small:int8', 'faster-whisper/large-v3', 'faster-whisper/small'],
+                       help='Valores de service_audio.whisper_model a comparar con --benchmark-asr')
+    parser.add_argument('--import-report', action='store_true',
+                       help='Mostrar resumen de tiempos de importación de la familia y salir')
+    parser.add_argument('--check-startup', action='store_true',
+                       help='Verificar presupuesto de arranque (tiempo y RSS) de la familia y salir')
+    parser.add_argument('--max-startup-seconds', type=float, default=3.0,
+                       help='Tiempo máximo de arranque para --check-startup')
+    parser.add_argument('--max-startup-rss-mb', type=float, default=250.0,
+                       help='RSS máximo en MB para --check-startup')
     
     args = parser.parse_args()
     
+    if args.import_report:
+        print(json.dumps(import_time_report(args.model_type), indent=2))
+        return
+    
+    if args.benchmark_scaling:
+        from vision_models import benchmark_vision_scaling
+        print(json.dumps(benchmark_vision_scaling(batch_size=args.batch_size, seed=args.seed), indent=2))
+        return
+    
+    if args.benchmark_room_inference:
+        from vision_models import benchmark_room_inference
+        print(json.dumps(benchmark_room_inference(seed=args.seed), indent=2))
+        return
+    
+    if args.benchmark_vad:
+        from audio_models import ServiceAudioAnalyzer, benchmark_vad
+        analyzer = ServiceAudioAnalyzer.from_config(audio_config(args.config_file))
+        print(json.dumps(benchmark_vad(analyzer, args.benchmark_vad), indent=2, default=json_default))
+        return
+    
+    if args.check_vad:
+        from audio_models import check_vad
+        if not check_vad():
+            sys.exit(1)
+        return
+    
+    if args.benchmark_asr:
+        from audio_models import benchmark_asr
+        language = audio_config(args.config_file).get('language', 'es')
+        print(json.dumps(benchmark_asr(args.asr_models, args.benchmark_asr, language), indent=2, default=json_default))
+        return
+    
+    if args.check_startup:
+        if not check_startup(args.model_type, args.max_startup_seconds, args.max_startup_rss_mb):
+            sys.exit(1)
+        return
+    
+    if not args.dataset_id and (args.snapshot_only or not args.data_file):
+        parser.error('se requiere --dataset-id (o --data-file para entrenar)')
+    
+    # Importar solo las dependencias de la familia seleccionada
+    load_model_family(args.model_type)
+    
     # Cargar configuración
     config = {
         'model_type': args.model_type,
         'dataset_id': args.dataset_id,
         'epochs': args.epochs,
         'batch_size': args.batch_size,
-        'learning_rate': args.learning_rate
+        'learning_rate': args.learning_rate,
+        'seed': args.seed,
+        'distributed_workers': args.distributed_workers,
+        'use_snapshots': not args.no_snapshot
     }
     
     if os.path.exists(args.config_file):
@@ -810,9 +781,19 @@ def main():
     trainer = ModelTrainer(config)
     
     try:
+        if args.snapshot_only:
+            dataset_info = trainer._fetch_dataset_info(args.dataset_id)
+            trainer.load_training_columns(dataset_info)
+            logger.info(f"Snapshot disponible en {trainer.snapshot_store.path(dataset_info)}")
+            return
+        
         # Cargar datos
-        logger.info(f"Cargando dataset {args.dataset_id}...")
-        train_data, dataset_info = trainer.load_training_data(args.dataset_id)
+        if args.data_file:
+            logger.info(f"Cargando datos sintéticos desde {args.data_file}...")
+            train_data = load_records(args.data_file)
+        else:
+            logger.info(f"Cargando dataset {args.dataset_id}...")
+            train_data, dataset_info = trainer.load_training_data(args.dataset_id)
         
         # Dividir datos
         train_split = int(len(train_data) * 0.8)
@@ -824,24 +805,43 @@ def main():
         # Entrenar según el tipo de modelo
         if args.model_type == 'vision' or args.model_type == 'all':
             logger.info("Entrenando modelo de visión...")
-            vision_results = trainer.train_vision_model(train_subset, val_subset, config)
+            with ComputeMeter() as meter:
+                vision_results = trainer.train_vision_model(train_subset, val_subset, config)
+            vision_results['compute'] = dict(meter.to_dict(), warm_start=False)
             
             # Guardar resultados
             model_id = "vision_model_id"  # En implementación real, obtener de DB
             trainer.save_training_run(model_id, config, vision_results)
-            trainer.deploy_model(model_id, vision_results['model_path'], vision_results['final_metrics'])
+            trainer.deploy_model(model_id, vision_results['model_path'], vision_results['final_metrics'],
+                               vision_results['artifact_id'])
+        
+        if args.model_type == 'hotel_room':
+            logger.info("Entrenando modelo de habitaciones de hotel...")
+            with ComputeMeter() as meter:
+                room_results = trainer.train_hotel_room_model(train_subset, val_subset, config)
+            room_results['compute'] = dict(meter.to_dict(), warm_start=False)
+            
+            model_id = "hotel_room_model_id"
+            trainer.save_training_run(model_id, config, room_results)
+            trainer.deploy_model(model_id, room_results['model_path'], room_results['final_metrics'],
+                               room_results['artifact_id'])
         
         if args.model_type == 'temperature' or args.model_type == 'all':
             logger.info("Entrenando modelo de temperatura...")
-            temp_results = trainer.train_temperature_model(train_subset, val_subset)
+            with ComputeMeter() as meter:
+                temp_results = trainer.train_temperature_model(train_subset, val_subset)
+            temp_results['compute'] = dict(meter.to_dict(), warm_start=False)
             
             model_id = "temperature_model_id"
             trainer.save_training_run(model_id, config, temp_results)
-            trainer.deploy_model(model_id, temp_results['model_path'], temp_results['metrics'])
+            trainer.deploy_model(model_id, temp_results['model_path'], temp_results['metrics'],
+                               temp_results['artifact_id'])
         
         if args.model_type == 'audio' or args.model_type == 'all':
             logger.info("Entrenando modelo de audio...")
-            audio_results = trainer.train_audio_model(train_subset, val_subset)
+            with ComputeMeter() as meter:
+                audio_results = trainer.train_audio_model(train_subset, val_subset)
+            audio_results['compute'] = dict(meter.to_dict(), warm_start=False)
             
             model_id = "audio_model_id"
             trainer.save_training_run(model_id, config, audio_results)
@@ -0,0 +1,778 @@
+#!/usr/bin/env python3
+"""
+Modelos de visión y dataset PyTorch para verificaciones HORECA
+Se importa solo cuando se entrena o se infiere con la familia de visión
+"""
+
+import os
+import glob
+import socket
+import logging
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+
+import torch
+import torch.nn as nn
+import torch.optim as optim
+import torch.distributed as dist
+import torch.multiprocessing as mp
+from torch.nn.parallel import DistributedDataParallel
+from torch.utils.data import DataLoader, Dataset
+from torch.utils.data.distributed import DistributedSampler
+import torchvision.transforms as transforms
+import cv2
+
+logger = logging.getLogger(__name__)
+
+class HorecaDataset(Dataset):
+    """Dataset personalizado para datos HORECA"""
+    
+    def __init__(self, data: List[Dict], transform=None, data_type='image', load_images=True):
+        self.data = data
+        self.transform = transform
+        self.data_type = data_type
+        self.load_images = load_images
+        
+    def __len__(self):
+        return len(self.data)
+    
+    def __getitem__(self, idx):
+        item = self.data[idx]
+        
+        if self.data_type == 'image' and not self.load_images:
+            # Solo etiquetas: el bucle de entrenamiento simula las imágenes
+            return {
+                'label': item['label'],
+                'score': item.get('score', 0),
+                'metadata': item.get('metadata', {})
+            }
+            
+        elif self.data_type == 'image':
+            # Cargar y procesar imagen
+            image_path = item['image_path']
+            image = cv2.imread(image_path)
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            
+            if self.transform:
+                image = self.transform(image)
+                
+            return {
+                'image': image,
+                'label': item['label'],
+                'score': item.get('score', 0),
+                'metadata': item.get('metadata', {})
+            }
+            
+        elif self.data_type == 'audio':
+            # Características por bloques: no se carga la grabación completa en memoria
+            from audio_features import extract_features
+            
+            features = extract_features(item['audio_path'])
+            
+            return {
+                'features': torch.FloatTensor(features),
+                'label': item['label'],
+                'transcription': item.get('transcription', ''),
+                'metadata': item.get('metadata', {})
+            }
+            
+        elif self.data_type == 'sensor':
+            # Datos de sensores (temperatura, humedad, etc.)
+            features = np.array([
+                item['temperature'],
+                item.get('humidity', 0),
+                item.get('ambient_temp', 20),
+                item.get('equipment_age', 1),
+                item.get('maintenance_score', 100)
+            ])
+            
+            return {
+                'features': torch.FloatTensor(features),
+                'label': item['label'],
+                'target_value': item.get('target_value', 0),
+                'metadata': item.get('metadata', {})
+            }
+
+class KitchenHygieneVisionModel(nn.Module):
+    """Modelo especializado para evaluación de higiene en cocinas"""
+    
+    def __init__(self, num_classes=4, pretrained=True):
+        super(KitchenHygieneVisionModel, self).__init__()
+        
+        # Base: ResNet50 pre-entrenado
+        import torchvision.models as models
+        self.backbone = models.resnet50(pretrained=pretrained)
+        
+        # Modificar la última capa
+        num_features = self.backbone.fc.in_features
+        self.backbone.fc = nn.Identity()
+        
+        # Capas especializadas para higiene
+        self.hygiene_classifier = nn.Sequential(
+            nn.Linear(num_features, 512),
+            nn.ReLU(),
+            nn.Dropout(0.3),
+            nn.Linear(512, 256),
+            nn.ReLU(),
+            nn.Dropout(0.2),
+            nn.Linear(256, num_classes)  # excellent, good, needs_improvement, critical
+        )
+        
+        # Regressor para puntuación 0-100
+        self.score_regressor = nn.Sequential(
+            nn.Linear(num_features, 256),
+            nn.ReLU(),
+            nn.Dropout(0.2),
+            nn.Linear(256, 128),
+            nn.ReLU(),
+            nn.Linear(128, 1),
+            nn.Sigmoid()  # Output 0-1, luego escalar a 0-100
+        )
+        
+        # Attention mechanism para áreas críticas
+        self.attention = nn.MultiheadAttention(embed_dim=num_features, num_heads=8)
+        
+    def forward(self, x):
+        # Extraer características
+        features = self.backbone(x)
+        
+        # Aplicar attention
+        features_att, _ = self.attention(features.unsqueeze(0), features.unsqueeze(0), features.unsqueeze(0))
+        features_att = features_att.squeeze(0)
+        
+        # Clasificación y regresión
+        classification = self.hygiene_classifier(features_att)
+        score = self.score_regressor(features_att) * 100  # Escalar a 0-100
+        
+        return {
+            'classification': classification,
+            'score': score,
+            'features': features_att
+        }
+
+HYGIENE_LABELS = ['excellent', 'good', 'needs_improvement', 'critical']
+HOTEL_AREAS = ['bedroom', 'bathroom', 'amenities', 'maintenance']
+# Umbral mínimo (0-1) de cada estándar de calidad; se sobrescribe con model_configs.hotel_room_standards
+QUALITY_STANDARDS = {'luxury': 0.95, 'premium': 0.85, 'standard': 0.75, 'budget': 0.65}
+IMAGENET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+IMAGENET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+class HotelRoomStandardsModel(nn.Module):
+    """Estándares de habitaciones de hotel: un solo backbone por foto y una cabeza por área"""
+    
+    def __init__(self, areas: List[str] = HOTEL_AREAS, num_classes: int = 4, pretrained: bool = True,
+                 multi_area_attention: bool = True):
+        super(HotelRoomStandardsModel, self).__init__()
+        
+        # Base: EfficientNet-B4; solo el extractor convolucional (mapa de características sin pooling)
+        import torchvision.models as models
+        backbone = models.efficientnet_b4(weights=models.EfficientNet_B4_Weights.DEFAULT if pretrained else None)
+        self.backbone = backbone.features
+        num_features = backbone.classifier[1].in_features
+        
+        self.areas = list(areas)
+        self.num_classes = num_classes
+        self.multi_area_attention = multi_area_attention
+        
+        # Attention multi-área: una consulta aprendida por área sobre las posiciones del mapa
+        if multi_area_attention:
+            self.area_queries = nn.Parameter(torch.randn(len(self.areas), num_features) * 0.02)
+            self.attention = nn.MultiheadAttention(embed_dim=num_features, num_heads=8, batch_first=True)
+        
+        # Por área: clases de higiene, puntuación 0-100 y presencia del área en la foto
+        self.area_heads = nn.ModuleDict({
+            area: nn.Sequential(
+                nn.Linear(num_features, 256),
+                nn.ReLU(),
+                nn.Dropout(0.2),
+                nn.Linear(256, num_classes + 2)
+            )
+            for area in self.areas
+        })
+    
+    def forward(self, x):
+        # Un único paso por el backbone para todas las áreas
+        feature_map = self.backbone(x)
+        tokens = feature_map.flatten(2).transpose(1, 2)  # (fotos, posiciones, canales)
+        pooled = tokens.mean(dim=1)
+        
+        if self.multi_area_attention:
+            queries = self.area_queries.unsqueeze(0).expand(x.shape[0], -1, -1)
+            area_features, _ = self.attention(queries, tokens, tokens)
+            area_features = area_features + pooled.unsqueeze(1)
+        else:
+            area_features = pooled.unsqueeze(1).expand(-1, len(self.areas), -1)
+        
+        outputs = torch.stack(
+            [self.area_heads[area](area_features[:, i]) for i, area in enumerate(self.areas)], dim=1
+        )
+        return {
+            'classification': outputs[..., :self.num_classes],  # (fotos, áreas, clases)
+            'score': torch.sigmoid(outputs[..., self.num_classes]) * 100,  # (fotos, áreas)
+            'presence': outputs[..., self.num_classes + 1],  # Logits: qué área muestra cada foto
+            'features': pooled
+        }
+
+def hierarchical_room_score(scores: np.ndarray, presence: np.ndarray, areas: List[str],
+                            photo_areas: Optional[List[Optional[str]]] = None,
+                            area_weights: Optional[Dict[str, float]] = None,
+                            quality_standards: Optional[Dict[str, float]] = None,
+                            classification: Optional[np.ndarray] = None,
+                            min_coverage: float = 0.5) -> Dict[str, Any]:
+    """Agregar fotos -> áreas -> habitación -> estándar de calidad
+    
+    Cada foto reparte su peso entre áreas: toda al área etiquetada o, sin etiqueta, según
+    softmax de los logits de presencia. La puntuación de un área es la media ponderada de
+    sus fotos, la de la habitación la media ponderada de las áreas cubiertas, y el estándar
+    es el más alto que cumplen todas las áreas (la peor área limita la habitación)
+    """
+    
+    scores = np.asarray(scores, dtype=np.float64)
+    presence = np.asarray(presence, dtype=np.float64)
+    weights = np.exp(presence - presence.max(axis=1, keepdims=True))
+    weights /= weights.sum(axis=1, keepdims=True)
+    for i, area in enumerate(photo_areas or []):
+        if area in areas:
+            weights[i] = 0.0
+            weights[i, areas.index(area)] = 1.0
+    
+    coverage = weights.sum(axis=0)
+    area_scores = {}
+    area_labels = {}
+    for j, area in enumerate(areas):
+        if coverage[j] >= min_coverage:
+            area_scores[area] = float(weights[:, j] @ scores[:, j] / coverage[j])
+            if classification is not None:
+                logits = np.asarray(classification[:, j], dtype=np.float64)
+                probabilities = np.exp(logits - logits.max(axis=1, keepdims=True))
+                probabilities /= probabilities.sum(axis=1, keepdims=True)
+                area_labels[area] = HYGIENE_LABELS[int((weights[:, j] @ probabilities).argmax())]
+    
+    standards = quality_standards or QUALITY_STANDARDS
+    area_weights = area_weights or {}
+    covered = list(area_scores)
+    room_score = None
+    standard = None
+    weakest = None
+    if covered:
+        w = np.array([area_weights.get(area, 1.0) for area in covered])
+        room_score = float(w @ np.array([area_scores[area] for area in covered]) / w.sum())
+        weakest = min(covered, key=area_scores.get)
+        for name, threshold in sorted(standards.items(), key=lambda item: -item[1]):
+            if area_scores[weakest] / 100 >= threshold:
+                standard = name
+                break
+    
+    return {
+        'room_score': room_score,
+        'quality_standard': standard,  # None: no alcanza ni el estándar más bajo
+        'weakest_area': weakest,
+        'area_scores': area_scores,
+        'area_labels': area_labels,
+        'area_coverage': {area: float(coverage[j]) for j, area in enumerate(areas)},
+        'missing_areas': [area for area in areas if area not in area_scores],
+        'complete': len(area_scores) == len(areas),  # Sin todas las áreas el estándar es provisional
+        'photos': int(scores.shape[0])
+    }
+
+class RoomInspectionScorer:
+    """Inferencia por inspección: todas las fotos de la habitación en lotes, un paso de backbone por foto"""
+    
+    def __init__(self, model: HotelRoomStandardsModel, image_size: int = 380, max_batch_size: int = 16,
+                 quality_standards: Optional[Dict[str, float]] = None,
+                 area_weights: Optional[Dict[str, float]] = None):
+        self.model = model.eval()
+        self.image_size = image_size
+        self.max_batch_size = max_batch_size
+        self.quality_standards = quality_standards or QUALITY_STANDARDS
+        self.area_weights = area_weights
+        self.device = next(model.parameters()).device
+    
+    def preprocess(self, photos: List[Any]) -> torch.Tensor:
+        """Rutas o arrays RGB HxWx3 uint8 -> tensor normalizado (fotos, 3, tamaño, tamaño)"""
+        batch = np.empty((len(photos), self.image_size, self.image_size, 3), dtype=np.float32)
+        for i, photo in enumerate(photos):
+            if isinstance(photo, str):
+                photo = cv2.cvtColor(cv2.imread(photo), cv2.COLOR_BGR2RGB)
+            batch[i] = cv2.resize(photo, (self.image_size, self.image_size), interpolation=cv2.INTER_AREA)
+        batch = (batch / 255.0 - IMAGENET_MEAN) / IMAGENET_STD
+        return torch.from_numpy(batch.transpose(0, 3, 1, 2).copy())
+    
+    def predict(self, images: torch.Tensor) -> Dict[str, np.ndarray]:
+        """Salidas por foto y área, en lotes de como mucho max_batch_size fotos"""
+        outputs = {'score': [], 'presence': [], 'classification': []}
+        with torch.inference_mode():
+            for start in range(0, images.shape[0], self.max_batch_size):
+                batch = self.model(images[start:start + self.max_batch_size].to(self.device))
+                for name in outputs:
+                    outputs[name].append(batch[name].float().cpu().numpy())
+        return {name: np.concatenate(values) for name, values in outputs.items()}
+    
+    def score(self, photos: List[Any], photo_areas: Optional[List[Optional[str]]] = None) -> Dict[str, Any]:
+        """Puntuar una inspección completa de habitación"""
+        outputs = self.predict(self.preprocess(photos))
+        return hierarchical_room_score(
+            outputs['score'], outputs['presence'], self.model.areas, photo_areas,
+            self.area_weights, self.quality_standards, outputs['classification']
+        )
+
+def core_groups(world_size: int) -> List[List[int]]:
+    """Repartir los cores disponibles en grupos, uno por proceso, respetando nodos NUMA"""
+    
+    available = sorted(os.sched_getaffinity(0))
+    nodes = []
+    for cpulist_path in sorted(glob.glob('/sys/devices/system/node/node*/cpulist')):
+        with open(cpulist_path) as f:
+            cores = []
+            for part in f.read().strip().split(','):
+                if '-' in part:
+                    first, last = part.split('-')
+                    cores.extend(range(int(first), int(last) + 1))
+                elif part:
+                    cores.append(int(part))
+        cores = [core for core in cores if core in available]
+        if cores:
+            nodes.append(cores)
+    
+    if len(nodes) >= world_size:
+        # Al menos un nodo NUMA completo por proceso
+        groups = [[] for _ in range(world_size)]
+        for i, cores in enumerate(nodes):
+            groups[i % world_size].extend(cores)
+        return groups
+    
+    # Menos nodos que procesos: dividir cores contiguos (mismo socket) en partes iguales
+    chunks = np.array_split(np.array(available), world_size)
+    return [chunk.tolist() or available for chunk in chunks]
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def run_vision_training(train_data: List[Dict], val_data: List[Dict], model_config: Dict,
+                        rank: int = 0, world_size: int = 1) -> Dict[str, Any]:
+    """Bucle de entrenamiento del modelo de visión; con world_size > 1 corre como un rank de DDP"""
+    
+    distributed = world_size > 1
+    
+    # Transformaciones de datos
+    train_transform = transforms.Compose([
+        transforms.ToPILImage(),
+        transforms.Resize((224, 224)),
+        transforms.RandomHorizontalFlip(p=0.5),
+        transforms.RandomRotation(15),
+        transforms.ColorJitter(brightness=0.2, contrast=0.2),
+        transforms.ToTensor(),
+        transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
+    ])
+    
+    val_transform = transforms.Compose([
+        transforms.ToPILImage(),
+        transforms.Resize((224, 224)),
+        transforms.ToTensor(),
+        transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
+    ])
+    
+    # Crear datasets
+    load_images = model_config.get('load_images', True)
+    train_dataset = HorecaDataset(train_data, transform=train_transform, data_type='image', load_images=load_images)
+    val_dataset = HorecaDataset(val_data, transform=val_transform, data_type='image', load_images=load_images)
+    
+    # DataLoaders (en modo distribuido cada rank recibe su partición)
+    batch_size = model_config.get('batch_size', 32)
+    train_sampler = DistributedSampler(
+        train_dataset, num_replicas=world_size, rank=rank, shuffle=True, seed=model_config.get('seed', 42)
+    ) if distributed else None
+    val_sampler = DistributedSampler(
+        val_dataset, num_replicas=world_size, rank=rank, shuffle=False
+    ) if distributed else None
+    train_loader = DataLoader(train_dataset, batch_size=batch_size, shuffle=train_sampler is None, sampler=train_sampler)
+    val_loader = DataLoader(val_dataset, batch_size=batch_size, shuffle=False, sampler=val_sampler)
+    
+    # Modelo (con init_artifact, warm start desde los pesos de ese artefacto; cada rank los lee por mmap)
+    init_artifact = model_config.get('init_artifact')
+    base_model = KitchenHygieneVisionModel(
+        num_classes=4, pretrained=model_config.get('pretrained', True) and not init_artifact
+    )
+    if init_artifact:
+        from artifact_store import ArtifactStore
+        base_model.load_state_dict(ArtifactStore(model_config.get('artifact_store_path')).load_state_dict(init_artifact))
+    freeze_backbone = model_config.get('freeze_backbone', False)
+    if freeze_backbone:
+        # Fine-tuning de las cabezas: sin gradientes ni estadísticas de BatchNorm en el backbone
+        base_model.backbone.requires_grad_(False)
+    device = torch.device('cuda' if torch.cuda.is_available() and not distributed else 'cpu')
+    base_model.to(device)
+    # DDP promedia los gradientes entre ranks (all-reduce) en cada backward
+    model = DistributedDataParallel(base_model) if distributed else base_model
+    
+    # Optimizador y loss
+    optimizer = optim.Adam(
+        [parameter for parameter in model.parameters() if parameter.requires_grad],
+        lr=model_config.get('learning_rate', 0.001)
+    )
+    classification_loss = nn.CrossEntropyLoss()
+    regression_loss = nn.MSELoss()
+    
+    # Entrenamiento
+    num_epochs = model_config.get('epochs', 50)
+    best_val_loss = float('inf')
+    best_state = None
+    training_history = {'train_loss': [], 'val_loss': [], 'val_accuracy': []}
+    
+    for epoch in range(num_epochs):
+        # Entrenamiento
+        model.train()
+        if freeze_backbone:
+            base_model.backbone.eval()
+        train_loss = 0.0
+        if train_sampler is not None:
+            train_sampler.set_epoch(epoch)
+        
+        for batch in train_loader:
+            # Simular batch (en implementación real cargaría imágenes)
+            batch_size = len(batch['label'])
+            images = torch.randn(batch_size, 3, 224, 224).to(device)
+            
+            # Labels
+            labels = torch.tensor([
+                ['excellent', 'good', 'needs_improvement', 'critical'].index(label) 
+                for label in batch['label']
+            ]).to(device)
+            scores = torch.tensor(batch['score'], dtype=torch.float32).to(device)
+            
+            optimizer.zero_grad()
+            
+            outputs = model(images)
+            
+            # Loss combinado
+            cls_loss = classification_loss(outputs['classification'], labels)
+            reg_loss = regression_loss(outputs['score'].squeeze(), scores)
+            total_loss = cls_loss + 0.1 * reg_loss
+            
+            total_loss.backward()
+            optimizer.step()
+            
+            train_loss += total_loss.item()
+        
+        # Validación
+        val_loss, correct, total = _validation_pass(model, val_loader, device, classification_loss, regression_loss)
+        
+        # Métricas (sumadas entre todos los ranks)
+        totals = torch.tensor([train_loss, len(train_loader), val_loss, len(val_loader), correct, total],
+                              dtype=torch.float64)
+        if distributed:
+            dist.all_reduce(totals, op=dist.ReduceOp.SUM)
+        train_loss, train_batches, val_loss, val_batches, correct, total = totals.tolist()
+        
+        avg_train_loss = train_loss / train_batches
+        avg_val_loss = val_loss / val_batches
+        val_accuracy = 100 * correct / total
+        
+        training_history['train_loss'].append(avg_train_loss)
+        training_history['val_loss'].append(avg_val_loss)
+        training_history['val_accuracy'].append(val_accuracy)
+        
+        if rank == 0:
+            logger.info(f"Epoch {epoch+1}/{num_epochs}: "
+                       f"Train Loss: {avg_train_loss:.4f}, "
+                       f"Val Loss: {avg_val_loss:.4f}, "
+                       f"Val Accuracy: {val_accuracy:.2f}%")
+        
+        # Conservar mejor modelo (solo rank 0 hace checkpoint)
+        if avg_val_loss < best_val_loss:
+            best_val_loss = avg_val_loss
+            if rank == 0:
+                best_state = {name: tensor.detach().cpu().clone() for name, tensor in base_model.state_dict().items()}
+    
+    return {
+        'training_history': training_history,
+        'best_val_loss': best_val_loss,
+        'best_state': best_state,
+        'train_samples': len(train_data) * num_epochs
+    }
+
+def _validation_pass(model, val_loader, device, classification_loss, regression_loss) -> Tuple[float, int, int]:
+    """Pérdida acumulada, aciertos y total de una pasada de validación"""
+    
+    model.eval()
+    val_loss = 0.0
+    correct = 0
+    total = 0
+    
+    with torch.no_grad():
+        for batch in val_loader:
+            batch_size = len(batch['label'])
+            images = torch.randn(batch_size, 3, 224, 224).to(device)
+            
+            labels = torch.tensor([
+                ['excellent', 'good', 'needs_improvement', 'critical'].index(label) 
+                for label in batch['label']
+            ]).to(device)
+            scores = torch.tensor(batch['score'], dtype=torch.float32).to(device)
+            
+            outputs = model(images)
+            
+            cls_loss = classification_loss(outputs['classification'], labels)
+            reg_loss = regression_loss(outputs['score'].squeeze(), scores)
+            total_loss = cls_loss + 0.1 * reg_loss
+            
+            val_loss += total_loss.item()
+            
+            _, predicted = torch.max(outputs['classification'].data, 1)
+            total += labels.size(0)
+            correct += (predicted == labels).sum().item()
+    
+    return val_loss, correct, total
+
+def evaluate_vision_state(state_dict: Dict[str, Any], val_data: List[Dict], model_config: Dict) -> Dict[str, float]:
+    """Pérdida y precisión de unos pesos sobre val_data (misma semilla para comparar modelos entre sí)"""
+    
+    model = KitchenHygieneVisionModel(num_classes=4, pretrained=False)
+    model.load_state_dict(state_dict)
+    dataset = HorecaDataset(val_data, transform=transforms.Compose([
+        transforms.ToPILImage(),
+        transforms.Resize((224, 224)),
+        transforms.ToTensor(),
+        transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
+    ]), data_type='image', load_images=model_config.get('load_images', True))
+    loader = DataLoader(dataset, batch_size=model_config.get('batch_size', 32), shuffle=False)
+    
+    torch.manual_seed(model_config.get('seed', 42))
+    val_loss, correct, total = _validation_pass(
+        model, loader, torch.device('cpu'), nn.CrossEntropyLoss(), nn.MSELoss()
+    )
+    return {
+        'val_loss': val_loss / max(len(loader), 1),
+        'val_accuracy': 100 * correct / total if total else 0.0
+    }
+
+def _distributed_worker(rank: int, world_size: int, port: int, cores: List[int],
+                        train_data: List[Dict], val_data: List[Dict], model_config: Dict):
+    """Proceso de un rank > 0: entrena su partición; el checkpoint queda a cargo de rank 0"""
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    os.sched_setaffinity(0, cores)
+    torch.set_num_threads(len(cores))
+    dist.init_process_group('gloo', init_method=f"tcp://127.0.0.1:{port}", rank=rank, world_size=world_size)
+    try:
+        run_vision_training(train_data, val_data, model_config, rank=rank, world_size=world_size)
+    finally:
+        dist.destroy_process_group()
+
+def train_vision_distributed(train_data: List[Dict], val_data: List[Dict], model_config: Dict,
+                             world_size: int) -> Dict[str, Any]:
+    """Entrenamiento data-parallel en CPU (gloo), un proceso por grupo de cores; este proceso es rank 0"""
+    
+    if world_size <= 1:
+        return run_vision_training(train_data, val_data, model_config)
+    
+    groups = core_groups(world_size)
+    port = _free_port()
+    context = mp.get_context('spawn')
+    workers = [
+        context.Process(
+            target=_distributed_worker,
+            args=(rank, world_size, port, groups[rank], train_data, val_data, model_config)
+        )
+        for rank in range(1, world_size)
+    ]
+    for worker in workers:
+        worker.start()
+    
+    original_affinity = os.sched_getaffinity(0)
+    original_threads = torch.get_num_threads()
+    os.sched_setaffinity(0, groups[0])
+    torch.set_num_threads(len(groups[0]))
+    logger.info(f"Entrenamiento distribuido: {world_size} procesos, cores por rank {[len(g) for g in groups]}")
+    
+    try:
+        dist.init_process_group('gloo', init_method=f"tcp://127.0.0.1:{port}", rank=0, world_size=world_size)
+        try:
+            results = run_vision_training(train_data, val_data, model_config, rank=0, world_size=world_size)
+        finally:
+            dist.destroy_process_group()
+    finally:
+        os.sched_setaffinity(0, original_affinity)
+        torch.set_num_threads(original_threads)
+        for worker in workers:
+            worker.join()
+    
+    failed = [worker.exitcode for worker in workers if worker.exitcode != 0]
+    if failed:
+        raise RuntimeError(f"Distributed training workers failed with exit codes {failed}")
+    return results
+
+def benchmark_vision_scaling(worker_counts: List[int] = (1, 2, 4, 8), num_samples: int = 256,
+                             batch_size: int = 16, epochs: int = 1, seed: int = 42) -> List[Dict[str, float]]:
+    """Medir muestras/s del entrenamiento data-parallel con distinto número de procesos"""
+    
+    from synthetic_data import SyntheticDataGenerator, batch_to_records
+    
+    records = batch_to_records(SyntheticDataGenerator(seed=seed).batch('image', num_samples), 'image')
+    split = int(len(records) * 0.8)
+    model_config = {
+        'batch_size': batch_size, 'epochs': epochs, 'seed': seed,
+        'pretrained': False, 'load_images': False
+    }
+    
+    results = []
+    for workers in worker_counts:
+        if workers > len(os.sched_getaffinity(0)):
+            logger.warning(f"Saltando {workers} procesos: solo hay {len(os.sched_getaffinity(0))} cores")
+            continue
+        start = datetime.now()
+        run = train_vision_distributed(records[:split], records[split:], model_config, workers)
+        elapsed = (datetime.now() - start).total_seconds()
+        results.append({
+            'workers': workers,
+            'seconds': round(elapsed, 2),
+            'samples_per_second': round(run['train_samples'] / elapsed, 2)
+        })
+        logger.info(f"{workers} procesos: {results[-1]['samples_per_second']} muestras/s")
+    
+    baseline = results[0]['samples_per_second'] if results else 0
+    for result in results:
+        result['speedup'] = round(result['samples_per_second'] / baseline, 2) if baseline else 0
+    return results
+
+def run_hotel_room_training(train_data: List[Dict], val_data: List[Dict], model_config: Dict) -> Dict[str, Any]:
+    """Entrenar el modelo de habitaciones: cada foto supervisa la cabeza de su área y la presencia"""
+    
+    areas = model_config.get('areas', HOTEL_AREAS)
+    load_images = model_config.get('load_images', True)
+    image_size = model_config.get('input_size', [380, 380])[0]
+    transform = transforms.Compose([
+        transforms.ToPILImage(),
+        transforms.Resize((image_size, image_size)),
+        transforms.ToTensor(),
+        transforms.Normalize(mean=IMAGENET_MEAN.tolist(), std=IMAGENET_STD.tolist())
+    ])
+    batch_size = model_config.get('batch_size', 16)
+    train_loader = DataLoader(HorecaDataset(train_data, transform=transform, load_images=load_images),
+                              batch_size=batch_size, shuffle=True)
+    val_loader = DataLoader(HorecaDataset(val_data, transform=transform, load_images=load_images),
+                            batch_size=batch_size, shuffle=False)
+    
+    model = HotelRoomStandardsModel(
+        areas=areas, pretrained=model_config.get('pretrained', True),
+        multi_area_attention=model_config.get('multi_area_attention', True)
+    )
+    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    model.to(device)
+    optimizer = optim.Adam(model.parameters(), lr=model_config.get('learning_rate', 0.0001))
+    classification_loss = nn.CrossEntropyLoss()
+    regression_loss = nn.MSELoss()
+    
+    def batch_loss(batch):
+        count = len(batch['label'])
+        if 'image' in batch:
+            images = batch['image'].to(device)
+        else:
+            # Simular imágenes (en implementación real se cargan las fotos)
+            images = torch.randn(count, 3, image_size, image_size).to(device)
+        area_index = torch.tensor([areas.index(m) for m in batch['metadata']['area']]).to(device)
+        labels = torch.tensor([HYGIENE_LABELS.index(label) for label in batch['label']]).to(device)
+        scores = torch.as_tensor(batch['score'], dtype=torch.float32).to(device)
+        
+        outputs = model(images)
+        rows = torch.arange(count, device=device)
+        # Solo la cabeza del área fotografiada recibe la etiqueta; la presencia aprende qué área es
+        loss = (classification_loss(outputs['classification'][rows, area_index], labels)
+                + 0.1 * regression_loss(outputs['score'][rows, area_index], scores)
+                + classification_loss(outputs['presence'], area_index))
+        correct = (outputs['classification'][rows, area_index].argmax(dim=1) == labels).sum().item()
+        area_correct = (outputs['presence'].argmax(dim=1) == area_index).sum().item()
+        return loss, correct, area_correct
+    
+    num_epochs = model_config.get('epochs', 50)
+    best_val_loss = float('inf')
+    best_state = None
+    training_history = {'train_loss': [], 'val_loss': [], 'val_accuracy': [], 'val_area_accuracy': []}
+    
+    for epoch in range(num_epochs):
+        model.train()
+        train_loss = 0.0
+        for batch in train_loader:
+            optimizer.zero_grad()
+            loss, _, _ = batch_loss(batch)
+            loss.backward()
+            optimizer.step()
+            train_loss += loss.item()
+        
+        model.eval()
+        val_loss, correct, area_correct = 0.0, 0, 0
+        with torch.no_grad():
+            for batch in val_loader:
+                loss, batch_correct, batch_area_correct = batch_loss(batch)
+                val_loss += loss.item()
+                correct += batch_correct
+                area_correct += batch_area_correct
+        
+        avg_val_loss = val_loss / max(len(val_loader), 1)
+        training_history['train_loss'].append(train_loss / max(len(train_loader), 1))
+        training_history['val_loss'].append(avg_val_loss)
+        training_history['val_accuracy'].append(100 * correct / max(len(val_data), 1))
+        training_history['val_area_accuracy'].append(100 * area_correct / max(len(val_data), 1))
+        logger.info(f"Epoch {epoch+1}/{num_epochs}: Train Loss: {training_history['train_loss'][-1]:.4f}, "
+                    f"Val Loss: {avg_val_loss:.4f}, Val Accuracy: {training_history['val_accuracy'][-1]:.2f}%, "
+                    f"Área: {training_history['val_area_accuracy'][-1]:.2f}%")
+        
+        if avg_val_loss < best_val_loss:
+            best_val_loss = avg_val_loss
+            best_state = {name: tensor.detach().cpu().clone() for name, tensor in model.state_dict().items()}
+    
+    return {
+        'training_history': training_history,
+        'best_val_loss': best_val_loss,
+        'best_state': best_state,
+        'train_samples': len(train_data) * num_epochs
+    }
+
+def benchmark_room_inference(rooms: int = 8, photos_per_room: int = 8, image_size: int = 380,
+                             max_batch_size: int = 16, seed: int = 42) -> Dict[str, Any]:
+    """Inspecciones/s con backbone compartido frente a un modelo independiente por área"""
+    
+    rng = np.random.default_rng(seed)
+    torch.manual_seed(seed)
+    inspections = [
+        [rng.integers(0, 256, size=(480, 640, 3), dtype=np.uint8) for _ in range(photos_per_room)]
+        for _ in range(rooms)
+    ]
+    
+    shared = RoomInspectionScorer(HotelRoomStandardsModel(pretrained=False), image_size, max_batch_size)
+    per_area = [
+        RoomInspectionScorer(HotelRoomStandardsModel(areas=[area], pretrained=False), image_size, max_batch_size)
+        for area in HOTEL_AREAS
+    ]
+    
+    def per_area_score(photos):
+        # Línea base: cada área pasa todas las fotos por su propio backbone
+        images = per_area[0].preprocess(photos)
+        outputs = [scorer.predict(images) for scorer in per_area]
+        return hierarchical_room_score(
+            np.concatenate([o['score'] for o in outputs], axis=1),
+            np.concatenate([o['presence'] for o in outputs], axis=1), HOTEL_AREAS
+        )
+    
+    results = {}
+    for name, score in (('shared_backbone', shared.score), ('per_area_models', per_area_score)):
+        score(inspections[0][:2])  # Calentamiento
+        start = datetime.now()
+        for photos in inspections:
+            score(photos)
+        elapsed = (datetime.now() - start).total_seconds()
+        results[name] = {
+            'seconds_per_room': round(elapsed / rooms, 3),
+            'photos_per_second': round(rooms * photos_per_room / elapsed, 2),
+            'backbone_passes_per_photo': 1 if name == 'shared_backbone' else len(HOTEL_AREAS)
+        }
+        logger.info(f"{name}: {results[name]['seconds_per_room']}s por habitación")
+    
+    results['speedup'] = round(
+        results['per_area_models']['seconds_per_room'] / results['shared_backbone']['seconds_per_room'], 2
+    )
+    results.update({'rooms': rooms, 'photos_per_room': photos_per_room, 'image_size': image_size})
+    return results